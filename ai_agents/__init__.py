@@ -1,15 +1,45 @@
-from .guardrail_agent import guardrail_agent, idea_guardrail
-from .requirements_agent import create_requirements_gathering_agent
-from .research_agents import search_agent, analysis_agent, reports_agent
-from .orchestrator_agents import orchestrator_agent, planner_agent
+import importlib
+import types
+
+# Lazy registry: each agent is built, with its model client and tool schemas, when first used
+_registry = {
+    'guardrail_agent': '.guardrail_agent',
+    'idea_guardrail': '.guardrail_agent',
+    'create_requirements_gathering_agent': '.requirements_agent',
+    'search_agent': '.research_agents',
+    'analysis_agent': '.research_agents',
+    'reports_agent': '.research_agents',
+    'orchestrator_agent': '.orchestrator_agents',
+    'planner_agent': '.orchestrator_agents',
+    'structured_planner_agent': '.orchestrator_agents',
+    'research_task_agents': '.orchestrator_agents',
+    'context_summarizer_agent': '.summarizer_agent',
+}
+
+def __getattr__(name):
+    if name not in _registry:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_registry[name], __name__), name)
+    # Importing a submodule binds it on the package; drop those that shadow a registry name
+    for other in _registry:
+        if isinstance(globals().get(other), types.ModuleType):
+            del globals()[other]
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_registry))
 
 __all__ = [
     'guardrail_agent',
     'idea_guardrail',
     'create_requirements_gathering_agent',
     'search_agent',
-    'analysis_agent', 
+    'analysis_agent',
     'reports_agent',
     'orchestrator_agent',
-    'planner_agent'
+    'planner_agent',
+    'structured_planner_agent',
+    'research_task_agents',
+    'context_summarizer_agent'
 ]
@@ -1,12 +1,20 @@
+import functools
+import os
 from agents import Agent, GuardrailFunctionOutput, input_guardrail, RunContextWrapper, Runner
 from models import GuardrailOutput
-from utils import get_model_lite
+from utils import get_model_lite, DiskCache
 from agents import ModelSettings
+from config import CACHE_DIR, GUARDRAIL_VERDICT_TTL_SECONDS, GUARDRAIL_VERDICT_MAX_ENTRIES
+from .guardrail_classifier import classify_idea, guardrail_input_text, normalize_guardrail_input
 
-guardrail_agent = Agent(
-    name="guard_rail_agent",
-    model=get_model_lite(),
-    instructions="""You are a guardrail agent that validates business ideas. 
+@functools.cache
+def get_guardrail_agent():
+    """Build the guardrail agent on first use; most inputs are decided without it"""
+    return Agent(
+        name="guard_rail_agent",
+        # Low temperature and a fixed prompt make its responses safe to reuse
+        model=get_model_lite(cache=True),
+        instructions="""You are a guardrail agent that validates business ideas. 
 
 IMPORTANT: You must respond with ONLY valid JSON in the exact format:
 {
@@ -20,19 +28,50 @@ Validation rules:
 - If the input is a valid business idea, set tripwire_triggered to false
 - If the input is NOT a valid business idea (greetings, questions, etc.), set tripwire_triggered to true
 - Always provide a clear output_info message explaining your decision""",
-    tools=[],   
-    output_type=GuardrailOutput,
-    model_settings=ModelSettings(
-        temperature=0.1,  # Low temperature for consistent JSON output
+        tools=[],   
+        output_type=GuardrailOutput,
+        model_settings=ModelSettings(
+            temperature=0.1,  # Low temperature for consistent JSON output
+        )
     )
+
+def __getattr__(name):
+    if name == "guardrail_agent":
+        return get_guardrail_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Guardrail agent verdicts keyed by normalized input
+guardrail_verdicts = DiskCache(
+    path=os.path.join(CACHE_DIR, "guardrail_verdicts.sqlite3"),
+    ttl_seconds=GUARDRAIL_VERDICT_TTL_SECONDS,
+    max_entries=GUARDRAIL_VERDICT_MAX_ENTRIES,
 )
 
+async def check_idea(input, follow_up=False):
+    """Return whether the tripwire should trigger, asking the guardrail agent only for ambiguous inputs"""
+    text = guardrail_input_text(input)
+    tripwire_triggered, reason = classify_idea(text, follow_up=follow_up)
+    if tripwire_triggered is not None:
+        print(f"Guardrail (local): {reason}")
+        return tripwire_triggered
+
+    key = DiskCache.make_key(normalize_guardrail_input(text))
+    cached = await guardrail_verdicts.get(key)
+    if cached is not None:
+        print(f"Guardrail (cached): {cached['output_info']}")
+        return cached["tripwire_triggered"]
+
+    result = await Runner.run(get_guardrail_agent(), input)   
+    print(result.final_output)
+    await guardrail_verdicts.set(key, result.final_output.model_dump())
+    return result.final_output.tripwire_triggered
+
 @input_guardrail
 async def idea_guardrail(ctx: RunContextWrapper, agent, input: str) -> GuardrailFunctionOutput:
     """Guardrail function to validate business idea inputs"""
-    result = await Runner.run(guardrail_agent, input)   
-    print(result.final_output)
-    if result.final_output.tripwire_triggered:
+    # Only the requirements loop marks its follow-up turns, once the idea itself has passed
+    follow_up = getattr(ctx.context, "idea_validated", False)
+    if await check_idea(input, follow_up=follow_up):
         return GuardrailFunctionOutput(
             output_info="Failed",
             tripwire_triggered=True
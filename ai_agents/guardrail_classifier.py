@@ -0,0 +1,91 @@
+import re
+
+# Follow-up turns the requirements loop sends after the idea itself has been validated;
+# only trusted when the run context says the loop is past its first turn
+FOLLOW_UP_PATTERN = re.compile(r"^current question number: \d+\. user response: ", re.IGNORECASE)
+
+GREETINGS = {
+    "hi", "hello", "hey", "hiya", "yo", "thanks", "thank you", "good morning", "good afternoon",
+    "good evening", "ok", "okay", "test", "testing", "help",
+}
+
+# Weighted unigram and bigram features of a business idea; negative weights mark small talk
+FEATURE_WEIGHTS = {
+    "app": 1.0, "platform": 1.0, "startup": 1.5, "business": 1.5, "company": 1.0, "service": 1.0,
+    "product": 1.0, "customers": 1.5, "customer": 1.0, "users": 1.0, "market": 1.5, "marketplace": 1.5,
+    "subscription": 1.5, "revenue": 1.5, "saas": 1.5, "b2b": 1.5, "b2c": 1.5, "monetize": 1.5,
+    "sell": 1.0, "selling": 1.0, "delivery": 0.5, "ai": 0.5, "automate": 1.0, "automation": 1.0,
+    "idea": 0.5, "launch": 1.0, "brand": 1.0, "store": 0.5, "shop": 0.5, "franchise": 1.5,
+    "clients": 1.0, "pricing": 1.0, "businesses": 1.5, "tool": 0.5, "software": 1.0,
+    "personalized": 0.5, "professionals": 1.0, "consumers": 1.5, "freelancers": 1.0, "owners": 0.5,
+    "that creates": 1.0, "that connects": 1.5, "on demand": 1.0, "per month": 1.0,
+    "target market": 2.0, "business model": 2.0, "an app": 1.0, "a platform": 1.0, "that helps": 1.5,
+    "that allows": 1.5, "that lets": 1.5, "for small": 1.0, "i want to build": 1.5, "want to start": 1.5,
+    "how are": -2.0, "are you": -2.0, "your name": -3.0, "tell me a joke": -3.0, "weather": -2.0,
+    "who are": -2.0, "what is": -1.0, "what's": -1.0, "capital of": -3.0,
+}
+
+PASS_THRESHOLD = 3.0
+# Only clear small talk, with no sign of an idea at all, fails without asking the guardrail agent
+FAIL_THRESHOLD = -3.0
+
+
+def guardrail_input_text(input):
+    """Return the user's text from a guardrail input given as a string or as input items"""
+    if isinstance(input, str):
+        return input
+    for item in reversed(input or []):
+        if isinstance(item, dict) and item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            return " ".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+    return ""
+
+
+def normalize_guardrail_input(text):
+    """Lowercase and collapse whitespace so trivially different inputs share a verdict"""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def business_idea_features(text):
+    """Return the weights of the FEATURE_WEIGHTS n-grams found in text"""
+    words = re.findall(r"[\w']+", text)
+    grams = words + [" ".join(pair) for pair in zip(words, words[1:])]
+    joined = " ".join(words)
+    weights = [FEATURE_WEIGHTS[gram] for gram in grams if gram in FEATURE_WEIGHTS]
+    # Longer phrases are matched on the joined text
+    weights += [weight for phrase, weight in FEATURE_WEIGHTS.items() if phrase.count(" ") > 1 and phrase in joined]
+    return weights
+
+
+def score_business_idea(text):
+    """Score how much text reads like a business idea using weighted word n-grams"""
+    return sum(business_idea_features(text))
+
+
+def classify_idea(text, follow_up=False):
+    """Decide obvious cases locally
+
+    Returns (tripwire_triggered, reason), with tripwire_triggered set to None when the
+    input is ambiguous and should be escalated to the guardrail agent. Set follow_up only
+    for turns of a requirements loop whose idea already passed the guardrail.
+    """
+    normalized = normalize_guardrail_input(text)
+    if follow_up and FOLLOW_UP_PATTERN.match(normalized):
+        return False, "Answer to a requirements question"
+    if not normalized:
+        return True, "Empty input"
+    stripped = normalized.strip(" .!?,")
+    if stripped in GREETINGS:
+        return True, "Greeting, not a business idea"
+
+    words = normalized.split()
+    features = business_idea_features(normalized)
+    score = sum(features)
+    if len(words) >= 6 and score >= PASS_THRESHOLD:
+        return False, f"Business idea (local score {score:.1f})"
+    # A single small-talk n-gram such as "weather" or "what is" also appears in real ideas
+    if score <= FAIL_THRESHOLD and all(weight < 0 for weight in features):
+        return True, f"Not a business idea (local score {score:.1f})"
+    return None, f"Ambiguous (local score {score:.1f})"
@@ -2,6 +2,7 @@ from agents import Agent, ModelSettings, handoff
 from agents.extensions import handoff_filters
 from utils import get_model
 from tools import get_today_date
+from models import ResearchPlan
 from .research_agents import search_agent, analysis_agent, reports_agent
 
 # Orchestrator Agent
@@ -89,3 +90,45 @@ planner_agent = Agent(
         temperature=0.3,
     ),
 )
+
+# Structured Planner Agent: emits a task DAG that services.PlanExecutor runs without an orchestrator loop
+structured_planner_agent = Agent(
+    name="structured_planner_agent",
+    model=get_model(),
+    instructions="""
+    You are a Strategic Research Planner Agent. Turn the business idea and requirements into a
+    research plan made of tasks that can run in parallel wherever they do not depend on each other.
+
+    Each task has:
+    - id: a short unique snake_case identifier
+    - description: precise instructions for the agent doing the task
+    - agent: one of
+        - search_agent: gathers information (web, academic papers, market reports, competitors, financial data)
+        - analysis_agent: analyzes gathered data and calculates metrics
+        - reports_agent: writes reports
+    - depends_on: ids of the tasks whose results this task needs
+
+    Plan rules:
+    - Split research into several independent search_agent tasks (e.g. market size, competitors,
+      financials, customer behaviour) with no dependencies so they run concurrently
+    - Give each analysis_agent task the search tasks it needs as dependencies
+    - End with exactly one reports_agent task that depends on the analysis tasks and writes the final
+      report: executive summary, market and competitive analysis, financial viability, success
+      probability and risks, recommendations, and citations
+    - Never create dependency cycles
+    - Keep the plan practical: 4 to 8 tasks
+
+    Also summarize the overall approach in research_plan.
+    """,
+    output_type=ResearchPlan,
+    model_settings=ModelSettings(
+        temperature=0.3,
+    ),
+)
+
+# Agents that can be assigned to ResearchPlan tasks
+research_task_agents = {
+    "search_agent": search_agent,
+    "analysis_agent": analysis_agent,
+    "reports_agent": reports_agent,
+}
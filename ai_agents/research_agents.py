@@ -5,7 +5,9 @@ from tools import (
     search_academic_papers,
     search_market_reports,
     search_competitors,
-    search_financial_data
+    search_financial_data,
+    search_batch,
+    search_local_corpus
 )
 
 # Search Agent
@@ -22,11 +24,19 @@ search_agent = Agent(
         5. PROVIDE well-sourced research findings
         
         You have access to specialized search tools:
+        - Local corpus search over results gathered by earlier research runs (instant, no remote call)
         - General web search for broad information
         - Academic paper search for scholarly research
         - Market reports search for industry analysis
         - Competitor search for competitive intelligence
         - Financial data search for investment information
+        - Batch search to run several remote searches concurrently in a single call
+        
+        Always start with search_local_corpus. Only use the remote search tools for topics it does not
+        cover or when it reports that its results are stale.
+        
+        Whenever you need more than one search, send them together through search_batch
+        instead of calling the single search tools one after another.
         
         Always:
         - Use multiple sources to validate information
@@ -38,11 +48,13 @@ search_agent = Agent(
         Your research should be thorough, accurate, and provide the foundation for analysis.
         """,
     tools=[
+        search_local_corpus,
         search_web,
         search_academic_papers,
         search_market_reports,
         search_competitors,
         search_financial_data,
+        search_batch,
     ],
 )
 
@@ -0,0 +1,22 @@
+from agents import Agent, ModelSettings
+from utils import get_model_lite
+
+# Context Summarizer Agent
+context_summarizer_agent = Agent(
+    name="context_summarizer_agent",
+    model=get_model_lite(),
+    instructions="""
+    You compress the earlier part of a research conversation so it fits a smaller context.
+    
+    Write a dense summary that keeps:
+    - Every finding, figure, date and name exactly as stated
+    - Which tools or agents were used and what each returned
+    - Decisions taken and work still outstanding
+    
+    Drop greetings, repetition and formatting. Do not add new information or opinions.
+    Output only the summary.
+    """,
+    model_settings=ModelSettings(
+        temperature=0.1,
+    ),
+)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Deep Research AI System - Headless Batch Entry Point
+
+Researches every idea in a JSONL file without prompts, several at a time.
+Each line is a JSON object:
+
+    {"id": "meal-kits", "idea": "A meal kit subscription for ...", "answers": ["Busy parents", "..."]}
+
+- idea: the business idea (required unless requirements is given)
+- answers: optional replies to the requirements questions, in order. Questions
+  without an answer are auto-answered unless --no-auto-answer is set.
+- requirements: optional finished requirements; the questions are skipped
+- id: optional name for the report file, defaults to the line number
+
+One report per idea and a summary.json with timings and token usage are written
+to the output folder.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from models import UserPreference
+import ai_agents
+from services import ResearchService
+from services.research_service import scripted_answers
+from config import DEFAULT_USER_NAME, DEFAULT_MAX_URLS, RESEARCHES_DIR, BATCH_CONCURRENCY, BATCH_AUTO_ANSWER, RUN_REUSE_ENABLED
+from utils import close_clients
+
+def load_batch(path):
+    """Read batch items from a JSONL file, giving each a unique id"""
+    items = []
+    ids = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not item.get("idea") and not item.get("requirements"):
+                raise ValueError(f"Line {line_number}: an idea or requirements is required")
+            item_id = re.sub(r"[^\w.-]+", "_", str(item.get("id") or f"idea_{line_number}"))
+            if item_id in ids:
+                item_id = f"{item_id}_{line_number}"
+            ids.add(item_id)
+            item["id"] = item_id
+            items.append(item)
+    return items
+
+async def research_item(item, output_dir, semaphore, dag=False, auto_answer=BATCH_AUTO_ANSWER, reuse=RUN_REUSE_ENABLED):
+    """Run one idea through requirements gathering and research, returning its summary row"""
+    async with semaphore:
+        research_service = ResearchService()
+        user_preferences = UserPreference(
+            name=item.get("user") or DEFAULT_USER_NAME,
+            max_urls=DEFAULT_MAX_URLS
+        )
+        report_path = output_dir / f"{item['id']}.md"
+        summary = {"id": item["id"], "status": "ok", "report": None}
+        started = time.perf_counter()
+        print(f"▶️ [{item['id']}] started")
+
+        try:
+            research_requirements = item.get("requirements")
+            if not research_requirements:
+                research_requirements = await research_service.gather_requirements(
+                    ai_agents.create_requirements_gathering_agent(),
+                    idea=item["idea"],
+                    answer_provider=scripted_answers(item.get("answers"), auto_answer)
+                )
+            summary["requirements_seconds"] = round(time.perf_counter() - started, 1)
+
+            if not research_requirements:
+                summary["status"] = "no_requirements"
+            else:
+                await research_service.run_research(
+                    research_requirements,
+                    user_preferences,
+                    mode="dag" if dag else "plan",
+                    reuse=reuse,
+                    report_path=report_path
+                )
+                summary["report"] = str(report_path)
+                summary["reused_from"] = research_service.reused_from
+        except Exception as e:
+            print(f"❌ [{item['id']}] failed: {e}")
+            summary["status"] = "failed"
+            summary["error"] = str(e)
+
+        usage = research_service.usage
+        summary["seconds"] = round(time.perf_counter() - started, 1)
+        summary["requests"] = usage.requests
+        summary["input_tokens"] = usage.input_tokens
+        summary["output_tokens"] = usage.output_tokens
+        summary["total_tokens"] = usage.total_tokens
+        print(f"⏹️ [{item['id']}] {summary['status']} in {summary['seconds']}s, {usage.total_tokens} tokens")
+        return summary
+
+async def run_batch(path, concurrency=BATCH_CONCURRENCY, dag=False, auto_answer=BATCH_AUTO_ANSWER, output_dir=None, reuse=RUN_REUSE_ENABLED):
+    """Research every idea in a JSONL file, at most concurrency at a time, and write the summary"""
+    items = load_batch(path)
+    output_dir = Path(output_dir or Path(RESEARCHES_DIR) / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    print(f"🚀 Researching {len(items)} ideas, {concurrency} at a time, into {output_dir}")
+
+    started = time.perf_counter()
+    try:
+        rows = await asyncio.gather(*(
+            research_item(item, output_dir, semaphore, dag=dag, auto_answer=auto_answer, reuse=reuse) for item in items
+        ))
+    finally:
+        await close_clients()
+
+    totals = {
+        "ideas": len(rows),
+        "ok": sum(row["status"] == "ok" for row in rows),
+        "reused": sum(bool(row.get("reused_from")) for row in rows),
+        "wall_seconds": round(time.perf_counter() - started, 1),
+        "run_seconds": round(sum(row["seconds"] for row in rows), 1),
+        "requests": sum(row["requests"] for row in rows),
+        "input_tokens": sum(row["input_tokens"] for row in rows),
+        "output_tokens": sum(row["output_tokens"] for row in rows),
+        "total_tokens": sum(row["total_tokens"] for row in rows),
+    }
+    summary_path = output_dir / "summary.json"
+    summary_path.write_text(json.dumps({"totals": totals, "ideas": rows}, indent=2), encoding="utf-8")
+
+    print("-" * 80)
+    for row in rows:
+        print(f"{row['id']:<30} {row['status']:<16} {row['seconds']:>8.1f}s {row['total_tokens']:>10} tokens")
+    print("-" * 80)
+    print(f"✅ {totals['ok']}/{totals['ideas']} ideas researched ({totals['reused']} reused) in {totals['wall_seconds']}s "
+          f"({totals['run_seconds']}s of research), {totals['total_tokens']} tokens")
+    print(f"📊 Summary saved to: {summary_path}")
+    return totals
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deep Research AI System - headless batch research")
+    parser.add_argument("ideas", help="JSONL file with one idea per line")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Ideas researched at the same time")
+    parser.add_argument("--dag", action="store_true", help="Plan each research as a task DAG and run independent tasks concurrently")
+    parser.add_argument("--no-auto-answer", action="store_true", help="End the questions when the pre-answered replies run out instead of auto-answering")
+    parser.add_argument("--no-reuse", action="store_true", help="Always run fresh research instead of reusing recent reports for the same requirements")
+    parser.add_argument("--output-dir", help="Folder for the reports and summary.json (default: researches/batch_<timestamp>)")
+    args = parser.parse_args()
+
+    asyncio.run(run_batch(
+        args.ideas,
+        concurrency=args.concurrency,
+        dag=args.dag,
+        auto_answer="" if args.no_auto_answer else BATCH_AUTO_ANSWER,
+        output_dir=args.output_dir,
+        reuse=RUN_REUSE_ENABLED and not args.no_reuse
+    ))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the Deep Research AI system.
+
+Imports main.py in fresh interpreters under `python -X importtime` and reports the
+median total import cost and the slowest project modules. Results can be saved as a
+local baseline and later runs compared against it:
+
+    python benchmark_startup.py --save      # record .cache/startup_baseline.json
+    python benchmark_startup.py --compare   # fail if startup regressed past the tolerance
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from config import CACHE_DIR
+
+PROJECT_PACKAGES = ("main", "config", "models", "tools", "ai_agents", "services", "utils")
+BASELINE_PATH = Path(CACHE_DIR) / "startup_baseline.json"
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(target):
+    """Import target in a fresh interpreter and return its per-module import times"""
+    env = dict(os.environ)
+    # Clients must never be built at import time, so placeholder keys are enough
+    for key in ("GEMINI_API_KEY", "OPENAI_API_KEY", "TAVILY_API_KEY"):
+        env.setdefault(key, "benchmark")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=Path(__file__).parent,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def run_benchmark(target, runs):
+    """Return the median total import time and the median cumulative time of project modules, in ms"""
+    totals = []
+    per_module = {}
+    for _ in range(runs):
+        modules = measure(target)
+        totals.append(modules[target][1] / 1000)
+        for name, (_, cumulative_us) in modules.items():
+            if name.split(".")[0] in PROJECT_PACKAGES:
+                per_module.setdefault(name, []).append(cumulative_us / 1000)
+    return {
+        "target": target,
+        "runs": runs,
+        "total_ms": statistics.median(totals),
+        "modules_ms": {name: statistics.median(times) for name, times in per_module.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import cost of main.py with python -X importtime")
+    parser.add_argument("--target", default="main", help="Module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest project modules to list")
+    parser.add_argument("--save", action="store_true", help=f"Save the result as the baseline in {BASELINE_PATH}")
+    parser.add_argument("--compare", action="store_true", help="Compare against the saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline (default: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.target, args.runs)
+    print(f"⏱️ import {result['target']}: {result['total_ms']:.0f} ms (median of {result['runs']} runs)")
+    slowest = sorted(result["modules_ms"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, ms in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.save:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"💾 Baseline saved to {BASELINE_PATH}")
+
+    if args.compare:
+        if not BASELINE_PATH.exists():
+            print(f"❌ No baseline at {BASELINE_PATH}, run with --save first")
+            return 1
+        baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+        change = result["total_ms"] / baseline["total_ms"] - 1
+        print(f"📊 Baseline {baseline['total_ms']:.0f} ms, change {change:+.0%}")
+        if change > args.tolerance:
+            print(f"❌ Startup regressed by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
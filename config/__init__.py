@@ -6,9 +6,81 @@ __all__ = [
     'OPENAI_API_KEY',
     'MODEL_LITE',
     'MODEL',
+    'GEMINI_BASE_URL',
+    'LLM_MAX_CONNECTIONS',
+    'LLM_MAX_KEEPALIVE_CONNECTIONS',
+    'LLM_KEEPALIVE_EXPIRY_SECONDS',
+    'LLM_HTTP2',
+    'LLM_TIMEOUT_SECONDS',
+    'LLM_CONNECT_TIMEOUT_SECONDS',
     'DEFAULT_USER_NAME',
     'DEFAULT_MAX_URLS',
     'DEFAULT_SEARCH_DEPTH',
     'MAX_QUESTIONS',
-    'RESEARCHES_DIR'
+    'PLAN_MAX_CONCURRENCY',
+    'REPORT_STALE_DAYS',
+    'RUN_REUSE_ENABLED',
+    'RUN_REUSE_SIMILARITY',
+    'RUN_REUSE_MAX_AGE_DAYS',
+    'BATCH_CONCURRENCY',
+    'BATCH_AUTO_ANSWER',
+    'CONTEXT_COMPACTION_ENABLED',
+    'CONTEXT_TOKEN_BUDGETS',
+    'CONTEXT_DEFAULT_TOKEN_BUDGET',
+    'RESEARCHES_DIR',
+    'CACHE_DIR',
+    'RUNS_DIR',
+    'RUN_JOURNAL_TTL_SECONDS',
+    'SESSION_POOL_SIZE',
+    'SESSION_TTL_SECONDS',
+    'SESSION_MAX_ITEMS',
+    'SESSION_COMPRESS',
+    'SESSION_COMPRESS_MIN_BYTES',
+    'SERVER_HOST',
+    'SERVER_PORT',
+    'SERVER_WORKERS',
+    'JOBS_DB',
+    'JOB_POLL_SECONDS',
+    'SERVER_PROCESSES',
+    'JOB_LEASE_SECONDS',
+    'JOB_HEARTBEAT_SECONDS',
+    'JOB_MAX_ATTEMPTS',
+    'JOBS_DB_WAL',
+    'JOB_PRIORITIES',
+    'DEFAULT_JOB_PRIORITY',
+    'INTERACTIVE_RESERVED_SLOTS',
+    'USER_WEIGHTS',
+    'USER_MAX_LLM_CALLS',
+    'USER_MAX_SEARCH_CALLS',
+    'SEARCH_CACHE_ENABLED',
+    'SEARCH_CACHE_TTL_SECONDS',
+    'SEARCH_CACHE_MAX_ENTRIES',
+    'LOCAL_CORPUS_ENABLED',
+    'LOCAL_CORPUS_MAX_RESULTS',
+    'LOCAL_CORPUS_FRESH_DAYS',
+    'SEARCH_BATCH_CONCURRENCY',
+    'SEARCH_BATCH_MAX_QUERIES',
+    'SEARCH_RESULT_MAX_TOKENS',
+    'SEARCH_CALL_MAX_TOKENS',
+    'LLM_HEDGING_ENABLED',
+    'LLM_HEDGE_PERCENTILE',
+    'LLM_HEDGE_MIN_SAMPLES',
+    'LLM_HEDGE_WINDOW',
+    'LLM_HEDGE_MAX_PER_RUN',
+    'LLM_CACHE_ENABLED',
+    'LLM_CACHE_TTL_SECONDS',
+    'LLM_CACHE_MAX_ENTRIES',
+    'GUARDRAIL_VERDICT_TTL_SECONDS',
+    'GUARDRAIL_VERDICT_MAX_ENTRIES',
+    'CASSETTE_MODE',
+    'CASSETTE_PATH',
+    'CASSETTE_REPLAY_LATENCY',
+    'CASSETTE_ORDERED_FALLBACK',
+    'TAVILY_RATE_LIMIT_RPS',
+    'TAVILY_RATE_LIMIT_BURST',
+    'TAVILY_MAX_RETRIES',
+    'TAVILY_RETRY_BASE_DELAY',
+    'TAVILY_RETRY_MAX_DELAY',
+    'TAVILY_BREAKER_FAILURE_THRESHOLD',
+    'TAVILY_BREAKER_RESET_SECONDS'
 ]
@@ -1,9 +1,18 @@
+import json
 import os
 from dotenv import load_dotenv, find_dotenv
 
 # Load environment variables
 load_dotenv()
 
+
+def _env_bool(name, default):
+    """Read a boolean flag from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
 # API Keys
 GEMINI_KEY = os.getenv("GEMINI_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
@@ -12,6 +21,15 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # Model configurations
 MODEL_LITE = "gemini-2.5-flash-lite"
 MODEL = "gemini-2.5-flash"
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+
+# Shared LLM connection pool
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", 60))
+LLM_HTTP2 = _env_bool("LLM_HTTP2", False)
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 600))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", 5))
 
 # Default user preferences
 DEFAULT_USER_NAME = "Mehdi"
@@ -20,6 +38,117 @@ DEFAULT_MAX_URLS = 1
 # Research settings
 DEFAULT_SEARCH_DEPTH = "basic"
 MAX_QUESTIONS = 3
+# Per-agent prompt token budgets enforced by summarizing older turns
+CONTEXT_COMPACTION_ENABLED = _env_bool("CONTEXT_COMPACTION_ENABLED", True)
+CONTEXT_TOKEN_BUDGETS = {
+    "orchestrator_agent": 24000,
+    "strategic_planner_agent": 8000,
+}
+CONTEXT_DEFAULT_TOKEN_BUDGET = int(os.getenv("CONTEXT_DEFAULT_TOKEN_BUDGET", 32000))
+# Research plan tasks that may run at the same time
+PLAN_MAX_CONCURRENCY = int(os.getenv("PLAN_MAX_CONCURRENCY", 4))
+# Report sections whose searches are older than this are checked again on refresh
+REPORT_STALE_DAYS = float(os.getenv("REPORT_STALE_DAYS", 30))
+# Run-level reuse: identical concurrent runs are shared, and a recent report whose requirements
+# are at least this similar (estimated Jaccard over words) is served instead of a new run
+RUN_REUSE_ENABLED = _env_bool("RUN_REUSE_ENABLED", True)
+RUN_REUSE_SIMILARITY = float(os.getenv("RUN_REUSE_SIMILARITY", 0.8))
+RUN_REUSE_MAX_AGE_DAYS = float(os.getenv("RUN_REUSE_MAX_AGE_DAYS", 7))
+# Headless batch runs: ideas researched at the same time, and the reply to questions with no pre-answer
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 3))
+BATCH_AUTO_ANSWER = os.getenv(
+    "BATCH_AUTO_ANSWER",
+    "No further details are available. Make reasonable assumptions and confirm the requirements.",
+)
 
 # File paths
 RESEARCHES_DIR = "researches"
+CACHE_DIR = os.getenv("DEEP_RESEARCH_CACHE_DIR", ".cache")
+# Journals of research runs, used to resume a run that was interrupted
+RUNS_DIR = os.getenv("DEEP_RESEARCH_RUNS_DIR", os.path.join(CACHE_DIR, "runs"))
+# Journals not written to for this long are deleted; 0 keeps them forever
+RUN_JOURNAL_TTL_SECONDS = int(os.getenv("RUN_JOURNAL_TTL_SECONDS", 7 * 24 * 60 * 60))
+
+# Per-run agent sessions, stored in one shared database
+SESSION_POOL_SIZE = int(os.getenv("SESSION_POOL_SIZE", 4))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 24 * 60 * 60))
+SESSION_MAX_ITEMS = int(os.getenv("SESSION_MAX_ITEMS", 200))
+SESSION_COMPRESS = _env_bool("SESSION_COMPRESS", True)
+SESSION_COMPRESS_MIN_BYTES = int(os.getenv("SESSION_COMPRESS_MIN_BYTES", 512))
+
+# Research job server
+SERVER_HOST = os.getenv("DEEP_RESEARCH_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("DEEP_RESEARCH_PORT", 8000))
+SERVER_WORKERS = int(os.getenv("DEEP_RESEARCH_WORKERS", 4))
+JOBS_DB = os.getenv("DEEP_RESEARCH_JOBS_DB", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOB_POLL_SECONDS = 1.0
+# Worker processes started by the server; 0 runs the workers inside the server process
+SERVER_PROCESSES = int(os.getenv("DEEP_RESEARCH_PROCESSES", 0))
+# A job whose worker misses heartbeats for JOB_LEASE_SECONDS is given to another worker
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 60))
+JOB_HEARTBEAT_SECONDS = 10
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# Turn off when the job database is on a network filesystem shared by several machines
+JOBS_DB_WAL = _env_bool("DEEP_RESEARCH_JOBS_DB_WAL", True)
+
+# Scheduling across users: priority classes, most urgent first, and fair-share weights
+JOB_PRIORITIES = ("interactive", "batch")
+DEFAULT_JOB_PRIORITY = "interactive"
+# Worker slots per process that only take interactive jobs, so they never queue behind bulk work
+INTERACTIVE_RESERVED_SLOTS = int(os.getenv("INTERACTIVE_RESERVED_SLOTS", 1))
+# Relative share of the workers per user, e.g. {"alice": 2}; unlisted users weigh 1
+USER_WEIGHTS = json.loads(os.getenv("DEEP_RESEARCH_USER_WEIGHTS", "{}"))
+# Calls each user may have in flight per process; 0 turns the cap off
+USER_MAX_LLM_CALLS = int(os.getenv("USER_MAX_LLM_CALLS", 8))
+USER_MAX_SEARCH_CALLS = int(os.getenv("USER_MAX_SEARCH_CALLS", 4))
+
+# Search result cache
+SEARCH_CACHE_ENABLED = _env_bool("SEARCH_CACHE_ENABLED", True)
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", 24 * 60 * 60))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 5000))
+
+# Local full-text corpus of past search results
+LOCAL_CORPUS_ENABLED = _env_bool("LOCAL_CORPUS_ENABLED", True)
+LOCAL_CORPUS_MAX_RESULTS = 5
+LOCAL_CORPUS_FRESH_DAYS = int(os.getenv("LOCAL_CORPUS_FRESH_DAYS", 30))
+
+# Batched search fan-out
+SEARCH_BATCH_CONCURRENCY = int(os.getenv("SEARCH_BATCH_CONCURRENCY", 4))
+SEARCH_BATCH_MAX_QUERIES = 10
+
+# Token budgets for search results returned to the model
+SEARCH_RESULT_MAX_TOKENS = int(os.getenv("SEARCH_RESULT_MAX_TOKENS", 250))
+SEARCH_CALL_MAX_TOKENS = int(os.getenv("SEARCH_CALL_MAX_TOKENS", 1200))
+
+# Hedged LLM requests against tail latency
+LLM_HEDGING_ENABLED = _env_bool("LLM_HEDGING_ENABLED", True)
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", 95))
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_HEDGE_WINDOW = 200
+LLM_HEDGE_MAX_PER_RUN = int(os.getenv("LLM_HEDGE_MAX_PER_RUN", 3))
+
+# LLM response cache for agents that opt in
+LLM_CACHE_ENABLED = _env_bool("LLM_CACHE_ENABLED", True)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000))
+
+# Guardrail verdicts of the guardrail agent, reused for identical inputs
+GUARDRAIL_VERDICT_TTL_SECONDS = int(os.getenv("GUARDRAIL_VERDICT_TTL_SECONDS", 30 * 24 * 60 * 60))
+GUARDRAIL_VERDICT_MAX_ENTRIES = 10000
+
+# Record/replay of Tavily and LLM calls: "off", "record" or "replay"
+CASSETTE_MODE = os.getenv("DEEP_RESEARCH_CASSETTE_MODE", "off")
+CASSETTE_PATH = os.getenv("DEEP_RESEARCH_CASSETTE", os.path.join(CACHE_DIR, "cassette.jsonl"))
+# "original" replays recorded latencies, "zero" answers immediately
+CASSETTE_REPLAY_LATENCY = os.getenv("DEEP_RESEARCH_CASSETTE_LATENCY", "original")
+# Replay a request with no exact recording from the next unused one of its kind instead of failing
+CASSETTE_ORDERED_FALLBACK = _env_bool("DEEP_RESEARCH_CASSETTE_ORDERED_FALLBACK", False)
+
+# Tavily admission control
+TAVILY_RATE_LIMIT_RPS = float(os.getenv("TAVILY_RATE_LIMIT_RPS", 5))
+TAVILY_RATE_LIMIT_BURST = int(os.getenv("TAVILY_RATE_LIMIT_BURST", 10))
+TAVILY_MAX_RETRIES = int(os.getenv("TAVILY_MAX_RETRIES", 3))
+TAVILY_RETRY_BASE_DELAY = 0.5
+TAVILY_RETRY_MAX_DELAY = 8.0
+TAVILY_BREAKER_FAILURE_THRESHOLD = 5
+TAVILY_BREAKER_RESET_SECONDS = 30
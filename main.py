@@ -14,18 +14,40 @@ Structure:
 - utils/: Utility functions
 """
 
+import argparse
 import asyncio
+from datetime import datetime
 from models import UserPreference
-from ai_agents import create_requirements_gathering_agent, planner_agent
-from services import ResearchService
-from config import DEFAULT_USER_NAME, DEFAULT_MAX_URLS
+import ai_agents
+from services import ResearchService, report_store
+from config import DEFAULT_USER_NAME, DEFAULT_MAX_URLS, REPORT_STALE_DAYS, RUN_REUSE_ENABLED
+from utils import close_clients
 
-async def main():
+async def list_reports(query=""):
+    """Print the latest reports, or the reports matching query"""
+    reports = await report_store.search(query) if query else await report_store.list()
+    for report in reports:
+        created = datetime.fromtimestamp(report["created_at"]).strftime("%Y-%m-%d %H:%M")
+        print(f"{report['id']}  {created}  {report['path']}\n    {report['requirements'][:100]}")
+    if not reports:
+        print("No reports found.")
+
+async def main(stream=False, dag=False, resume=None, refresh=None, max_age_days=REPORT_STALE_DAYS, reuse=RUN_REUSE_ENABLED):
     """Main entry point for the Deep Research AI system"""
     
     # Initialize the research service
     research_service = ResearchService()
     
+    # Resume an interrupted run from its journal instead of starting a new one
+    if resume:
+        await research_service.resume(resume)
+        return
+    
+    # Refresh the stale sections of an existing report
+    if refresh:
+        await research_service.refresh_report(refresh, max_age_days=max_age_days)
+        return
+    
     # Create user preferences
     user_preferences = UserPreference(
         name=DEFAULT_USER_NAME,
@@ -33,7 +55,7 @@ async def main():
     )
     
     # Create the requirements gathering agent
-    requirements_agent = create_requirements_gathering_agent()
+    requirements_agent = ai_agents.create_requirements_gathering_agent()
     
     # Gather research requirements (uncomment to enable interactive requirements gathering)
     research_requirements = await research_service.gather_requirements(requirements_agent)
@@ -51,14 +73,37 @@ async def main():
         print(f"🎯 Research Topic: {research_requirements[:100]}...")
         print("-" * 80)
         
-        await research_service.execute_research_plan(
-            planner_agent, 
-            research_requirements, 
-            user_preferences
+        mode = "dag" if dag else "stream" if stream else "plan"
+        await research_service.run_research(
+            research_requirements,
+            user_preferences,
+            mode=mode,
+            reuse=reuse
         )
     else:
         print("❌ No research requirements found. Exiting.")
 
+async def run(**options):
+    """Run main() and close the shared model clients once it is done"""
+    try:
+        await main(**options)
+    finally:
+        await close_clients()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deep Research AI System")
+    parser.add_argument("--stream", action="store_true", help="Stream tokens and tool events and write the report as it is generated")
+    parser.add_argument("--dag", action="store_true", help="Plan the research as a task DAG and run independent tasks concurrently")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume an interrupted run, replaying the steps it completed")
+    parser.add_argument("--refresh", metavar="REPORT", help="Refresh an existing report, rewriting only the sections whose sources went stale or changed")
+    parser.add_argument("--max-age-days", type=float, default=REPORT_STALE_DAYS, help="Age after which a report's searches are checked again by --refresh")
+    parser.add_argument("--no-reuse", action="store_true", help="Always run fresh research instead of reusing a recent report for the same requirements")
+    parser.add_argument("--reports", nargs="?", const="", metavar="QUERY", help="List the latest reports, or search them for QUERY, and exit")
+    args = parser.parse_args()
+
+    if args.reports is not None:
+        asyncio.run(list_reports(args.reports))
+        raise SystemExit
+
     # Run the main async function
-    asyncio.run(main())
+    asyncio.run(run(stream=args.stream, dag=args.dag, resume=args.resume, refresh=args.refresh, max_age_days=args.max_age_days, reuse=RUN_REUSE_ENABLED and not args.no_reuse))
@@ -1,13 +1,21 @@
 from .user_models import (
     UserPreference,
+    ResearchContext,
+    RequirementsContext,
     UserQuestioning,
+    ResearchTask,
     ResearchPlan,
+    SearchQuery,
     GuardrailOutput
 )
 
 __all__ = [
     'UserPreference',
+    'ResearchContext',
+    'RequirementsContext',
     'UserQuestioning', 
+    'ResearchTask',
     'ResearchPlan',
+    'SearchQuery',
     'GuardrailOutput'
 ]
@@ -1,11 +1,23 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, Literal
+from utils.dedup import DedupRegistry
 
 class UserPreference(BaseModel):
     """User preferences for research configuration"""
     name: str = Field(default="Mehdi", description="The name of the user")
     max_urls: int = Field(default=1, description="The maximum number of urls to search for")
 
+class ResearchContext(BaseModel):
+    """Run context shared by every agent and tool in one research run"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    preferences: UserPreference = Field(default_factory=UserPreference, description="The user's research preferences")
+    dedup: DedupRegistry = Field(default_factory=DedupRegistry, description="Sources already returned in this run")
+
+class RequirementsContext(BaseModel):
+    """Run context of one requirements gathering loop"""
+    idea_validated: bool = Field(default=False, description="Whether the idea passed the guardrail, so later turns are answers")
+
 class UserQuestioning(BaseModel):
     """Model for requirements gathering questions"""
     question: str = Field(default="", description="The question to ask the user")
@@ -14,9 +26,23 @@ class UserQuestioning(BaseModel):
     max_questions_reached: bool = Field(default=False, description="If the user has reached the maximum number of questions, set this to true")
     requirements_summary: str = Field(default="", description="A summary of the requirements")
 
+class ResearchTask(BaseModel):
+    """Model for one task of a research plan DAG"""
+    id: str = Field(description="Short unique identifier of the task, e.g. 'market_search'")
+    description: str = Field(description="What the agent should do for this task")
+    agent: Literal["search_agent", "analysis_agent", "reports_agent"] = Field(description="The agent that performs the task")
+    depends_on: list[str] = Field(default_factory=list, description="Ids of the tasks whose results this task needs")
+
 class ResearchPlan(BaseModel):
     """Model for research planning output"""
     research_plan: str = Field(default="", description="The research plan")
+    tasks: list[ResearchTask] = Field(default_factory=list, description="The research tasks and their dependencies")
+
+class SearchQuery(BaseModel):
+    """Model for one typed sub-query of a batched search"""
+    kind: Literal["web", "academic", "market", "competitor", "financial"] = Field(description="Which search to run")
+    query: str = Field(description="The query, topic, industry, product name or company name to search for")
+    industry: str = Field(default="", description="The industry, used by competitor and financial searches")
 
 class GuardrailOutput(BaseModel):
     """Model for guardrail validation output"""
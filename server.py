@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Deep Research AI System - Research Job Server
+
+A long-running asyncio service with a small HTTP/JSON API. Submitted ideas are
+stored in a persistent job queue and researched by a pool of workers that share
+the warmed model and Tavily clients, so no request pays process startup.
+
+With --processes N the server only coordinates: it starts N worker processes
+(worker.py) that take jobs from the shared queue, and restarts any that exit.
+
+    POST /jobs               {"idea": "...", "answers": ["..."], "user": "...", "mode": "plan", "priority": "interactive"}
+                             or {"requirements": "..."}; returns {"id": ..., "status": "queued"}.
+                             Use "priority": "batch" for bulk submissions.
+    GET  /jobs               latest jobs; ?user=NAME and ?status=STATE filter them
+    GET  /jobs/<id>          status and result of one job
+    GET  /jobs/<id>/report   the Markdown report of a finished job
+    GET  /stats              job counts per state, each user's backlog, and the throughput and cache counters
+                             of every worker process
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+from services import WorkerPool, open_job_queue
+from services.job_queue import JOB_STATES
+from services.job_workers import read_report
+from config import (
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_WORKERS,
+    SERVER_PROCESSES,
+    JOBS_DB,
+    JOB_POLL_SECONDS,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_LEASE_SECONDS,
+    DEFAULT_JOB_PRIORITY,
+    INTERACTIVE_RESERVED_SLOTS,
+    RUN_REUSE_ENABLED,
+)
+from utils import close_clients
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 1024 * 1024
+JOB_MODES = ("plan", "dag")
+# Longest wait before restarting a worker process that keeps exiting
+MAX_RESTART_DELAY_SECONDS = 60
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class WorkerProcesses:
+    """Coordinator of worker processes sharing the server's job queue
+
+    Each process runs worker.py with its own pool of workers. A process that exits
+    unexpectedly is restarted, and the jobs it was running are claimed again once their
+    leases expire.
+    """
+
+    def __init__(self, count, workers, jobs_db):
+        self.count = count
+        self.command = [
+            sys.executable, str(Path(__file__).with_name("worker.py")),
+            "--workers", str(workers), "--jobs-db", str(jobs_db),
+        ]
+        self.restarts = 0
+        self._processes = [None] * count
+        self._supervisors = []
+
+    async def start(self):
+        self._supervisors = [asyncio.create_task(self._supervise(index)) for index in range(self.count)]
+        print(f"👷 Started {self.count} worker processes")
+
+    async def _supervise(self, index):
+        delay = 1
+        while True:
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(*self.command)
+            self._processes[index] = process
+            returncode = await process.wait()
+            self.restarts += 1
+            if time.monotonic() - started > MAX_RESTART_DELAY_SECONDS:
+                # It ran fine for a while, so this is not a crash loop
+                delay = 1
+            print(f"⚠️ Worker process {process.pid} exited with code {returncode}, restarting in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RESTART_DELAY_SECONDS)
+
+    async def stop(self):
+        """Stop every worker process, letting each hand its running jobs back to the queue"""
+        for task in self._supervisors:
+            task.cancel()
+        await asyncio.gather(*self._supervisors, return_exceptions=True)
+        running = [process for process in self._processes if process is not None and process.returncode is None]
+        for process in running:
+            process.terminate()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(process.wait() for process in running)), JOB_LEASE_SECONDS)
+        except asyncio.TimeoutError:
+            for process in running:
+                if process.returncode is None:
+                    process.kill()
+
+
+class JobServer:
+    """HTTP/JSON front end of a JobQueue and the workers researching its jobs"""
+
+    def __init__(self, queue, pool=None):
+        self.queue = queue
+        # In-process worker pool to wake on submit; worker processes poll the queue instead
+        self.pool = pool
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, target, body = await self._read_request(reader)
+                status, content_type, payload = await self.route(method, target, body)
+            except HTTPError as e:
+                status, content_type, payload = e.status, "application/json", {"error": str(e)}
+            except Exception as e:
+                print(f"❌ Request failed: {e}")
+                status, content_type, payload = HTTPStatus.INTERNAL_SERVER_ERROR, "application/json", {"error": str(e)}
+            if content_type == "application/json":
+                payload = json.dumps(payload, indent=2)
+            data = payload.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request bodies are limited to {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, body
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        if parts == ["jobs"] and method == "POST":
+            return HTTPStatus.ACCEPTED, "application/json", await self.submit(body)
+        if parts == ["jobs"] and method == "GET":
+            status = query.get("status")
+            if status is not None and status not in JOB_STATES:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"status must be one of {', '.join(JOB_STATES)}")
+            try:
+                limit = int(query.get("limit", 20))
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "limit must be a number")
+            return HTTPStatus.OK, "application/json", await self.queue.list(limit=limit, user=query.get("user"), status=status)
+        if len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = await self.queue.get(parts[1])
+            if job is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No job {parts[1]}")
+            if len(parts) == 2:
+                return HTTPStatus.OK, "application/json", job
+            if parts[2] == "report":
+                report = await asyncio.to_thread(read_report, job)
+                if report is None:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f"Job {job['id']} has no report yet (status: {job['status']})")
+                return HTTPStatus.OK, "text/markdown", report
+        if parts == ["stats"] and method == "GET":
+            return HTTPStatus.OK, "application/json", await self.stats()
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+
+    async def submit(self, body):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "The request body must be JSON")
+        if not isinstance(request, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "The request body must be a JSON object")
+        mode = request.get("mode", "plan")
+        if mode not in JOB_MODES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"mode must be one of {', '.join(JOB_MODES)}")
+        try:
+            job_id = await self.queue.submit(
+                idea=request.get("idea"),
+                answers=request.get("answers"),
+                requirements=request.get("requirements"),
+                user=request.get("user"),
+                mode=mode,
+                reuse=request.get("reuse", RUN_REUSE_ENABLED),
+                priority=request.get("priority", DEFAULT_JOB_PRIORITY),
+            )
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        if self.pool is not None:
+            self.pool.notify()
+        return {"id": job_id, "status": "queued"}
+
+    async def stats(self):
+        workers = await self.queue.workers()
+        alive = [worker for worker in workers if worker["alive"]]
+        return {
+            "jobs": await self.queue.counts(),
+            "alive_workers": len(alive),
+            "slots": sum(worker["slots"] for worker in alive),
+            "busy": sum(worker["busy"] for worker in alive),
+            "jobs_per_hour": round(sum(worker["jobs_per_hour"] for worker in alive), 2),
+            "users": await self.queue.backlog(),
+            "workers": workers,
+        }
+
+
+async def serve(host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS, processes=SERVER_PROCESSES, jobs_db=JOBS_DB):
+    """Run the job server until it is interrupted"""
+    queue = open_job_queue(jobs_db)
+    if processes:
+        pool = None
+        runner = WorkerProcesses(processes, workers, jobs_db)
+    else:
+        pool = runner = WorkerPool(
+            queue, workers,
+            poll_seconds=JOB_POLL_SECONDS, heartbeat_seconds=JOB_HEARTBEAT_SECONDS, reserved_slots=INTERACTIVE_RESERVED_SLOTS,
+        )
+    await runner.start()
+    job_server = JobServer(queue, pool)
+    server = await asyncio.start_server(job_server.handle, host, port)
+    print(f"🚀 Research job server on http://{host}:{port} with {processes or 1} x {workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await runner.stop()
+        await close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deep Research AI System - research job server")
+    parser.add_argument("--host", default=SERVER_HOST, help="Address to listen on")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Research jobs run at the same time by each process")
+    parser.add_argument("--processes", type=int, default=SERVER_PROCESSES, help="Worker processes to start; 0 runs the workers in the server process")
+    parser.add_argument("--jobs-db", default=JOBS_DB, help="SQLite database holding the job queue")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(host=args.host, port=args.port, workers=args.workers, processes=args.processes, jobs_db=args.jobs_db))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
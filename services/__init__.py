@@ -1,7 +1,18 @@
 from .system_monitor import SystemMonitor
 from .research_service import ResearchService
+from .session_manager import SessionManager, session_manager
+from .report_store import ReportStore, report_store
+from .job_queue import JobQueue, open_job_queue
+from .job_workers import WorkerPool
 
 __all__ = [
     'SystemMonitor',
-    'ResearchService'
+    'ResearchService',
+    'SessionManager',
+    'session_manager',
+    'ReportStore',
+    'report_store',
+    'JobQueue',
+    'open_job_queue',
+    'WorkerPool'
 ]
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import re
+from agents import Runner
+from agents.run import ModelInputData
+from utils.text import estimate_tokens, truncate_to_tokens
+
+URL_PATTERN = re.compile(r"https?://[^\s)\]'\"<>]+")
+# Sentences stating a figure: money, percentages, multiples, large counts, years
+FIGURE_PATTERN = re.compile(
+    r"[$€£]\s?\d|\d+(\.\d+)?\s?(%|percent|x\b|k\b|m\b|bn\b|million|billion|trillion)|\bcagr\b|\b(19|20)\d{2}\b",
+    re.IGNORECASE,
+)
+
+
+def item_tokens(item):
+    return estimate_tokens(json.dumps(item, default=str))
+
+
+def item_text(item):
+    """Render one input item as plain text for the summarizer"""
+    if not isinstance(item, dict):
+        return str(item)
+    item_type = item.get("type")
+    if item_type == "function_call":
+        return f"[tool call] {item.get('name')}({item.get('arguments', '')})"
+    if item_type == "function_call_output":
+        output = item.get("output")
+        return f"[tool result] {output if isinstance(output, str) else json.dumps(output, default=str)}"
+    content = item.get("content")
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    if content is None:
+        return ""
+    return f"[{item.get('role', item_type or 'item')}] {content}"
+
+
+def extract_citations_and_facts(text, max_tokens):
+    """Collect source URLs and sentences stating figures, verbatim and deduplicated"""
+    kept = []
+    seen = set()
+    for url in URL_PATTERN.findall(text):
+        if url not in seen:
+            seen.add(url)
+            kept.append(f"- {url}")
+    for sentence in re.split(r"(?<=[.!?])\s+|\n+", text):
+        sentence = sentence.strip()
+        if 20 <= len(sentence) <= 400 and FIGURE_PATTERN.search(sentence) and sentence not in seen:
+            seen.add(sentence)
+            kept.append(f"- {sentence}")
+    return truncate_to_tokens("\n".join(kept), max_tokens)
+
+
+def _prefix_hash(items):
+    return hashlib.sha256(json.dumps(items, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ContextCompactor:
+    """call_model_input_filter that keeps each agent's input within a token budget, one per run
+
+    When an agent's input outgrows its budget, older turns are summarized with the lite model.
+    Citations and figures from those turns are kept verbatim. The first item, the original
+    request, is never summarized. Summaries are checkpointed by prefix, so every later turn
+    reuses them and a new summary is only made once the budget is exceeded again.
+    """
+
+    def __init__(self, summarizer_agent, budgets, default_budget, keep_recent_ratio=0.5, facts_ratio=0.2):
+        self.summarizer_agent = summarizer_agent
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.keep_recent_ratio = keep_recent_ratio
+        self.facts_ratio = facts_ratio
+        # (agent name, prefix length) -> (hash of the summarized items, summary item)
+        self._checkpoints = {}
+        self.compactions = 0
+
+    def _apply_checkpoint(self, agent_name, items):
+        """Return (summary_item, end) for the longest stored summary of items[1:end]"""
+        ends = sorted((end for name, end in self._checkpoints if name == agent_name), reverse=True)
+        for end in ends:
+            if end <= len(items):
+                prefix_hash, summary_item = self._checkpoints[(agent_name, end)]
+                if _prefix_hash(items[1:end]) == prefix_hash:
+                    return summary_item, end
+        return None, 1
+
+    def _split_point(self, items, start, keep_tokens):
+        """Index where the recent tail begins, never separating a tool call from its output"""
+        split = len(items) - 1
+        used = item_tokens(items[split])
+        while split - 1 > start and used + item_tokens(items[split - 1]) <= keep_tokens:
+            split -= 1
+            used += item_tokens(items[split])
+        calls = {
+            item.get("call_id"): index for index, item in enumerate(items)
+            if isinstance(item, dict) and item.get("type") == "function_call"
+        }
+        for item in items[split:]:
+            if isinstance(item, dict) and item.get("type") == "function_call_output":
+                split = min(split, calls.get(item.get("call_id"), split))
+        return max(split, start)
+
+    async def _summarize(self, previous_summary, items, facts_tokens):
+        text = "\n".join(item_text(item) for item in items)
+        if previous_summary:
+            text = f"{previous_summary}\n{text}"
+        result = await Runner.run(self.summarizer_agent, text)
+        facts = extract_citations_and_facts(text, facts_tokens)
+        summary = f"[Summary of the earlier conversation]\n{result.final_output}"
+        if facts:
+            summary += f"\n\n[Sources and figures from the earlier conversation, verbatim]\n{facts}"
+        return summary
+
+    async def __call__(self, data):
+        items = list(data.model_data.input)
+        instructions = data.model_data.instructions
+        budget = self.budgets.get(data.agent.name, self.default_budget)
+        fixed_tokens = estimate_tokens(instructions or "")
+        before = fixed_tokens + sum(item_tokens(item) for item in items)
+        if before <= budget or len(items) < 3:
+            return data.model_data
+
+        summary_item, start = self._apply_checkpoint(data.agent.name, items)
+        compacted = [items[0]] + ([summary_item] if summary_item else []) + items[start:]
+        if fixed_tokens + sum(item_tokens(item) for item in compacted) > budget:
+            split = self._split_point(items, start, int(budget * self.keep_recent_ratio))
+            if split > start:
+                previous = summary_item["content"] if summary_item else ""
+                summary = await self._summarize(previous, items[start:split], int(budget * self.facts_ratio))
+                summary_item = {"role": "user", "content": summary}
+                self._checkpoints[(data.agent.name, split)] = (_prefix_hash(items[1:split]), summary_item)
+                self.compactions += 1
+                compacted = [items[0], summary_item] + items[split:]
+
+        after = fixed_tokens + sum(item_tokens(item) for item in compacted)
+        print(f"🗜️ Compacted {data.agent.name} context: {before} -> {after} tokens ({after / before:.0%})")
+        return ModelInputData(input=compacted, instructions=instructions)
@@ -0,0 +1,383 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from config import JOBS_DB, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOBS_DB_WAL, JOB_PRIORITIES, DEFAULT_JOB_PRIORITY, USER_WEIGHTS
+
+# Job states, in the order a job moves through them
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+JOB_STATES = (QUEUED, RUNNING, DONE, FAILED)
+
+
+class JobQueue:
+    """Persistent queue of research jobs in a SQLite database shared by worker processes
+
+    Jobs are claimed by priority class (JOB_PRIORITIES, most urgent first) and, within a
+    class, by weighted fair queuing across users: each job gets a virtual finish tag of
+    1 / weight past its user's previous job, so a user who queued 200 ideas is served
+    alternately with everyone else rather than ahead of them. Claims run inside an
+    immediate transaction, so concurrent workers, in this or other processes, never
+    claim the same job. A claim is a lease of
+    lease_seconds that the worker renews with heartbeats; the job of a worker that
+    crashed is claimed again once its lease expires, up to max_attempts times. Set wal
+    to False when the database lives on a network filesystem, where WAL mode is unsafe.
+    """
+
+    def __init__(self, path, lease_seconds=60, max_attempts=3, wal=True, weights=None):
+        self.path = Path(path)
+        # Fair-share weight per user; unlisted users weigh 1
+        self.weights = weights or {}
+        if any(weight <= 0 for weight in self.weights.values()):
+            raise ValueError("User weights must be positive")
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.wal = wal
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode, so claims can open their own immediate transaction
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+            if self.wal:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    user TEXT,
+                    mode TEXT NOT NULL,
+                    idea TEXT,
+                    answers TEXT NOT NULL DEFAULT '[]',
+                    requirements TEXT,
+                    reuse INTEGER NOT NULL DEFAULT 1,
+                    priority TEXT NOT NULL DEFAULT 'interactive',
+                    virtual_start REAL NOT NULL DEFAULT 0,
+                    virtual_finish REAL NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    lease_expires_at REAL,
+                    report_path TEXT,
+                    reused_from TEXT,
+                    error TEXT,
+                    requests INTEGER,
+                    input_tokens INTEGER,
+                    output_tokens INTEGER,
+                    total_tokens INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+                CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(user, created_at);
+                -- Virtual time of each priority class, and the last finish tag of each user in it
+                CREATE TABLE IF NOT EXISTS virtual_clock (
+                    priority TEXT PRIMARY KEY,
+                    now REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fair_share (
+                    priority TEXT NOT NULL,
+                    user TEXT NOT NULL,
+                    last_finish REAL NOT NULL,
+                    PRIMARY KEY (priority, user)
+                );
+                CREATE TABLE IF NOT EXISTS workers (
+                    id TEXT PRIMARY KEY,
+                    host TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    slots INTEGER NOT NULL,
+                    started_at REAL NOT NULL,
+                    heartbeat_at REAL NOT NULL,
+                    stopped_at REAL,
+                    busy INTEGER NOT NULL DEFAULT 0,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    busy_seconds REAL NOT NULL DEFAULT 0,
+                    process_stats TEXT NOT NULL DEFAULT '{}'
+                );
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            # Queues created before leases and before fair-share scheduling
+            for column, definition in (
+                ("lease_expires_at", "REAL"),
+                ("priority", "TEXT NOT NULL DEFAULT 'interactive'"),
+                ("virtual_start", "REAL NOT NULL DEFAULT 0"),
+                ("virtual_finish", "REAL NOT NULL DEFAULT 0"),
+            ):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+            if "process_stats" not in {row["name"] for row in self._conn.execute("PRAGMA table_info(workers)")}:
+                self._conn.execute("ALTER TABLE workers ADD COLUMN process_stats TEXT NOT NULL DEFAULT '{}'")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_schedule ON jobs(status, priority, virtual_finish)"
+            )
+        return self._conn
+
+    @staticmethod
+    def _row(row):
+        job = dict(row)
+        job["answers"] = json.loads(job["answers"])
+        job["reuse"] = bool(job["reuse"])
+        return job
+
+    def _submit(self, job):
+        user = job["user"] or ""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                clock = conn.execute("SELECT now FROM virtual_clock WHERE priority = ?", (job["priority"],)).fetchone()
+                last = conn.execute(
+                    "SELECT last_finish FROM fair_share WHERE priority = ? AND user = ?", (job["priority"], user)
+                ).fetchone()
+                # A user with nothing queued starts at the current virtual time, not where they left off
+                job["virtual_start"] = max(clock[0] if clock else 0.0, last[0] if last else 0.0)
+                job["virtual_finish"] = job["virtual_start"] + 1 / self.weights.get(user, 1)
+                conn.execute(
+                    """INSERT INTO fair_share (priority, user, last_finish) VALUES (?, ?, ?)
+                       ON CONFLICT(priority, user) DO UPDATE SET last_finish = excluded.last_finish""",
+                    (job["priority"], user, job["virtual_finish"]),
+                )
+                conn.execute(
+                    """INSERT INTO jobs (id, status, user, mode, idea, answers, requirements, reuse, priority,
+                           virtual_start, virtual_finish, created_at)
+                       VALUES (:id, :status, :user, :mode, :idea, :answers, :requirements, :reuse, :priority,
+                           :virtual_start, :virtual_finish, :created_at)""",
+                    job,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job["id"]
+
+    async def submit(self, idea=None, answers=None, requirements=None, user=None, mode="plan", reuse=True,
+                     priority=DEFAULT_JOB_PRIORITY):
+        """Queue a research job for an idea, or for finished requirements, and return its id"""
+        if not idea and not requirements:
+            raise ValueError("An idea or requirements is required")
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(JOB_PRIORITIES)}")
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "user": user,
+            "mode": mode,
+            "idea": idea,
+            "answers": json.dumps(list(answers or [])),
+            "requirements": requirements,
+            "reuse": int(bool(reuse)),
+            "priority": priority,
+            "created_at": time.time(),
+        }
+        return await asyncio.to_thread(self._submit, job)
+
+    def _claim(self, worker, priorities):
+        now = time.time()
+        priorities = [priority for priority in JOB_PRIORITIES if priority in priorities]
+        placeholders = ", ".join("?" for _ in priorities)
+        rank = " ".join(f"WHEN ? THEN {index}" for index in range(len(priorities)))
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose worker stopped heartbeating have used up their attempt
+                conn.execute(
+                    """UPDATE jobs SET status = ?, finished_at = ?, lease_expires_at = NULL,
+                           error = 'Lease expired ' || attempts || ' times; the job keeps losing its worker'
+                       WHERE status = ? AND lease_expires_at < ? AND attempts >= ?""",
+                    (FAILED, now, RUNNING, now, self.max_attempts),
+                )
+                row = conn.execute(
+                    f"""SELECT id, priority, virtual_start FROM jobs
+                        WHERE (status = ? OR (status = ? AND lease_expires_at < ?)) AND priority IN ({placeholders})
+                        ORDER BY CASE priority {rank} END, virtual_finish, created_at LIMIT 1""",
+                    (QUEUED, RUNNING, now, *priorities, *priorities),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    """UPDATE jobs SET status = ?, started_at = ?, worker = ?, attempts = attempts + 1,
+                           lease_expires_at = ?
+                       WHERE id = ?""",
+                    (RUNNING, now, worker, now + self.lease_seconds, row["id"]),
+                )
+                # Virtual time advances to the start tag of the job being served
+                conn.execute(
+                    """INSERT INTO virtual_clock (priority, now) VALUES (?, ?)
+                       ON CONFLICT(priority) DO UPDATE SET now = MAX(now, excluded.now)""",
+                    (row["priority"], row["virtual_start"]),
+                )
+                job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self._row(job)
+
+    async def claim(self, worker, priorities=JOB_PRIORITIES):
+        """Lease the next job in priorities to worker and return it, or None if there is none
+
+        The next job is the most urgent class's queued or abandoned job with the lowest
+        fair-share finish tag.
+        """
+        return await asyncio.to_thread(self._claim, worker, priorities)
+
+    def _update(self, job_id, worker, fields):
+        # Only the worker holding the lease may change a running job
+        assignments = ", ".join(f"{name} = :{name}" for name in fields)
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE jobs SET {assignments} WHERE id = :id AND worker = :worker AND status = :running",
+                {**fields, "id": job_id, "worker": worker, "running": RUNNING},
+            )
+        return cursor.rowcount == 1
+
+    async def renew(self, job_ids, worker):
+        """Extend the leases of worker's running jobs, returning the ids whose lease it lost"""
+        def _renew():
+            expires = time.time() + self.lease_seconds
+            return [
+                job_id for job_id in job_ids
+                if not self._update(job_id, worker, {"lease_expires_at": expires})
+            ]
+        return await asyncio.to_thread(_renew)
+
+    async def complete(self, job_id, worker, result):
+        """Mark a job as done with its result: report_path, reused_from and token usage
+
+        Returns False if worker no longer held the job's lease, in which case nothing changes.
+        """
+        fields = {"status": DONE, "finished_at": time.time(), "lease_expires_at": None, "error": None}
+        fields.update({name: result.get(name) for name in (
+            "report_path", "reused_from", "requests", "input_tokens", "output_tokens", "total_tokens"
+        )})
+        return await asyncio.to_thread(self._update, job_id, worker, fields)
+
+    async def fail(self, job_id, worker, error):
+        return await asyncio.to_thread(
+            self._update, job_id, worker,
+            {"status": FAILED, "finished_at": time.time(), "lease_expires_at": None, "error": str(error)},
+        )
+
+    async def release(self, job_id, worker):
+        """Queue a running job again right away, for example when its worker shuts down"""
+        return await asyncio.to_thread(
+            self._update, job_id, worker, {"status": QUEUED, "lease_expires_at": None}
+        )
+
+    def _heartbeat(self, worker, host, pid, slots, stats, stopped=False):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                """INSERT INTO workers (id, host, pid, slots, started_at, heartbeat_at, stopped_at,
+                       busy, completed, failed, busy_seconds, process_stats)
+                   VALUES (:id, :host, :pid, :slots, :now, :now, :stopped_at, :busy, :completed, :failed, :busy_seconds,
+                       :process_stats)
+                   ON CONFLICT(id) DO UPDATE SET heartbeat_at = :now, stopped_at = :stopped_at, busy = :busy,
+                       completed = :completed, failed = :failed, busy_seconds = :busy_seconds,
+                       process_stats = :process_stats""",
+                {
+                    "id": worker, "host": host, "pid": pid, "slots": slots, "now": now,
+                    "stopped_at": now if stopped else None, **stats,
+                    "process_stats": json.dumps(stats.get("process_stats") or {}),
+                },
+            )
+
+    async def heartbeat(self, worker, host, pid, slots, stats, stopped=False):
+        """Record that a worker process is alive, with its busy, completed, failed and busy_seconds counts
+
+        stats may also hold process_stats: counters of the process's shared caches and clients.
+        """
+        await asyncio.to_thread(self._heartbeat, worker, host, pid, slots, stats, stopped)
+
+    def _workers(self, since):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM workers WHERE heartbeat_at >= ? ORDER BY started_at", (since,)
+            ).fetchall()
+        now = time.time()
+        workers = []
+        for row in rows:
+            worker = dict(row)
+            worker["process_stats"] = json.loads(worker["process_stats"])
+            up = (worker["stopped_at"] or now) - worker["started_at"]
+            worker["alive"] = worker["stopped_at"] is None and now - worker["heartbeat_at"] < self.lease_seconds
+            worker["jobs_per_hour"] = round((worker["completed"] + worker["failed"]) * 3600 / up, 2) if up > 0 else 0.0
+            worker["utilization"] = round(worker["busy_seconds"] / (up * worker["slots"]), 3) if up > 0 else 0.0
+            workers.append(worker)
+        return workers
+
+    async def workers(self, max_age_seconds=24 * 60 * 60):
+        """Return the worker processes seen in the last max_age_seconds, with their throughput"""
+        return await asyncio.to_thread(self._workers, time.time() - max_age_seconds)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    async def get(self, job_id):
+        rows = await asyncio.to_thread(self._query, "SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    async def list(self, limit=20, user=None, status=None):
+        """Return the most recent jobs, optionally only those of one user or in one state"""
+        conditions, params = [], []
+        if user is not None:
+            conditions.append("user = ?")
+            params.append(user)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return await asyncio.to_thread(
+            self._query, f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+        )
+
+    def _counts(self):
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(JOB_STATES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    async def counts(self):
+        """Return the number of jobs in each state"""
+        return await asyncio.to_thread(self._counts)
+
+    def _backlog(self):
+        with self._lock:
+            rows = self._connect().execute(
+                """SELECT IFNULL(user, '') AS user, priority, status, COUNT(*) AS jobs FROM jobs
+                   WHERE status IN (?, ?) GROUP BY 1, 2, 3""",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        backlog = {}
+        for row in rows:
+            user = backlog.setdefault(row["user"], {"weight": self.weights.get(row["user"], 1)})
+            user.setdefault(row["priority"], {})[row["status"]] = row["jobs"]
+        return backlog
+
+    async def backlog(self):
+        """Return the queued and running jobs of each user per priority class, with the user's weight"""
+        return await asyncio.to_thread(self._backlog)
+
+
+def open_job_queue(path=JOBS_DB):
+    """Return the job queue at path, with the lease and fair-share settings every worker process shares"""
+    return JobQueue(
+        path, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS, wal=JOBS_DB_WAL, weights=USER_WEIGHTS
+    )
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import socket
+import time
+from pathlib import Path
+from models import UserPreference
+from config import DEFAULT_USER_NAME, DEFAULT_MAX_URLS, BATCH_AUTO_ANSWER, JOB_PRIORITIES
+import ai_agents
+from utils import get_model, get_model_lite, set_current_user
+from .research_service import ResearchService, scripted_answers, process_stats
+from .report_store import report_store
+
+
+def warm_clients():
+    """Build the shared model clients, Tavily client and agents before the first job arrives"""
+    # Imported here so loading the services does not build the search tools
+    from tools.search_tools import get_tavily_client
+
+    get_model()
+    get_model_lite()
+    get_tavily_client()
+    for name in ("planner_agent", "structured_planner_agent", "research_task_agents"):
+        getattr(ai_agents, name)
+
+
+async def run_job(job):
+    """Research one queued job and return its result for JobQueue.complete()"""
+    research_service = ResearchService()
+    user_preferences = UserPreference(name=job["user"] or DEFAULT_USER_NAME, max_urls=DEFAULT_MAX_URLS)
+    set_current_user(user_preferences.name)
+    research_requirements = job["requirements"]
+    if not research_requirements:
+        research_requirements = await research_service.gather_requirements(
+            ai_agents.create_requirements_gathering_agent(),
+            idea=job["idea"],
+            answer_provider=scripted_answers(job["answers"], BATCH_AUTO_ANSWER)
+        )
+    if not research_requirements:
+        raise ValueError("No research requirements were gathered")
+
+    report_path = report_store.new_report_path()
+    await research_service.run_research(
+        research_requirements,
+        user_preferences,
+        mode=job["mode"],
+        reuse=job["reuse"],
+        report_path=report_path
+    )
+    if not report_path.exists():
+        raise RuntimeError("The research finished without a report")
+
+    usage = research_service.usage
+    return {
+        "report_path": str(report_path),
+        "reused_from": research_service.reused_from,
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+class WorkerPool:
+    """Research workers in one event loop, taking jobs from a JobQueue
+
+    Workers share the process-wide model and Tavily clients. An idle worker waits for
+    notify() or polls the queue every poll_seconds, so jobs queued by another process
+    are picked up too. Every heartbeat_seconds the pool renews the leases of its running
+    jobs and records its throughput in the queue; a job whose lease was lost to another
+    worker is cancelled here. The first reserved_slots workers only take jobs of the most
+    urgent priority class, so interactive requests never wait behind bulk jobs; at least
+    one worker always takes every class.
+    """
+
+    def __init__(self, queue, size, poll_seconds=1.0, heartbeat_seconds=10.0, name=None, reserved_slots=0):
+        self.queue = queue
+        self.size = size
+        self.reserved_slots = max(0, min(reserved_slots, size - 1))
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+        # Running job id -> (worker name, task running the job, start time)
+        self._running = {}
+
+    @property
+    def busy(self):
+        return len(self._running)
+
+    def notify(self):
+        """Wake idle workers, for example right after a job was submitted"""
+        self._wakeup.set()
+
+    async def start(self):
+        await asyncio.to_thread(warm_clients)
+        await self._heartbeat()
+        self._tasks = [
+            asyncio.create_task(self._work(
+                f"{self.name}/{index}", JOB_PRIORITIES[:1] if index < self.reserved_slots else JOB_PRIORITIES
+            ))
+            for index in range(self.size)
+        ]
+        self._tasks.append(asyncio.create_task(self._heartbeats()))
+        print(f"👷 Worker {self.name} started with {self.size} slots, {self.reserved_slots} reserved for {JOB_PRIORITIES[0]} jobs")
+
+    async def stop(self):
+        """Stop the workers and queue their running jobs again for other workers"""
+        running = dict(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job_id, (worker, _, _) in running.items():
+            await self.queue.release(job_id, worker)
+        await self._heartbeat(stopped=True)
+
+    async def _heartbeat(self, stopped=False):
+        now = time.perf_counter()
+        busy_seconds = self.busy_seconds + sum(now - started for _, _, started in self._running.values())
+        await self.queue.heartbeat(
+            self.name, socket.gethostname(), os.getpid(), self.size,
+            {
+                "busy": self.busy, "completed": self.completed, "failed": self.failed, "busy_seconds": busy_seconds,
+                "process_stats": await asyncio.to_thread(process_stats),
+            },
+            stopped=stopped,
+        )
+
+    async def _heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                for worker, job_ids in self._jobs_by_worker().items():
+                    for job_id in await self.queue.renew(job_ids, worker):
+                        print(f"⚠️ [{worker}] lost the lease of job {job_id}, cancelling it")
+                        self._running[job_id][1].cancel()
+                await self._heartbeat()
+            except Exception as e:
+                # A missed heartbeat is retried; leases outlive several of them
+                print(f"⚠️ Heartbeat of {self.name} failed: {e}")
+
+    def _jobs_by_worker(self):
+        jobs = {}
+        for job_id, (worker, _, _) in self._running.items():
+            jobs.setdefault(worker, []).append(job_id)
+        return jobs
+
+    async def _next_job(self, worker, priorities):
+        while True:
+            job = await self.queue.claim(worker, priorities)
+            if job is not None:
+                return job
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self, worker, priorities):
+        while True:
+            job = await self._next_job(worker, priorities)
+            started = time.perf_counter()
+            task = asyncio.create_task(run_job(job))
+            self._running[job["id"]] = (worker, task, started)
+            print(f"▶️ [{worker}] {job['priority']} job {job['id']} of {job['user'] or 'anonymous'} started (attempt {job['attempts']})")
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    task.cancel()
+                    raise
+                # The job's lease went to another worker, which now owns it
+                continue
+            except Exception as e:
+                print(f"❌ [{worker}] job {job['id']} failed: {e}")
+                if await self.queue.fail(job["id"], worker, e):
+                    self.failed += 1
+            else:
+                if await self.queue.complete(job["id"], worker, result):
+                    self.completed += 1
+                    print(f"⏹️ [{worker}] job {job['id']} done in {time.perf_counter() - started:.1f}s: {result['report_path']}")
+                else:
+                    print(f"⚠️ [{worker}] job {job['id']} finished after its lease was lost; its result was dropped")
+            finally:
+                self.busy_seconds += time.perf_counter() - started
+                self._running.pop(job["id"], None)
+
+    def stats(self):
+        return {
+            "worker": self.name,
+            "slots": self.size,
+            "reserved_slots": self.reserved_slots,
+            "busy": self.busy,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 1),
+        }
+
+
+def read_report(job):
+    """Return the report text of a finished job, or None"""
+    if job is None or not job.get("report_path"):
+        return None
+    path = Path(job["report_path"])
+    return path.read_text(encoding="utf-8") if path.exists() else None
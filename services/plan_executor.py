@@ -0,0 +1,137 @@
+import asyncio
+import time
+from agents import Runner, Usage
+from models import ResearchPlan, ResearchTask
+from utils import start_search_log
+
+# Output recorded for a task that raised, so its dependents can still run
+TASK_FAILED_PREFIX = "Task failed: "
+
+def default_research_plan(research_requirements):
+    """Fallback plan used when the planner's DAG cannot be executed"""
+    return ResearchPlan(
+        research_plan=f"Search, analyze and report on: {research_requirements}",
+        tasks=[
+            ResearchTask(id="search", agent="search_agent", description="Gather market, competitor, financial and academic information about the business idea"),
+            ResearchTask(id="analysis", agent="analysis_agent", description="Analyze the gathered data: market size, competition, financial viability and success probability", depends_on=["search"]),
+            ResearchTask(id="report", agent="reports_agent", description="Write the final research report with citations", depends_on=["analysis"]),
+        ],
+    )
+
+
+def failed_tasks(outputs):
+    """Return the ids of the tasks whose output records a failure"""
+    return [task_id for task_id, output in outputs.items() if str(output).startswith(TASK_FAILED_PREFIX)]
+
+
+def validate_plan(plan, agents):
+    """Check task ids, agents and dependencies, raising ValueError if the plan is not a runnable DAG"""
+    if not plan.tasks:
+        raise ValueError("The plan has no tasks")
+    ids = [task.id for task in plan.tasks]
+    if len(ids) != len(set(ids)):
+        raise ValueError("The plan has duplicate task ids")
+    for task in plan.tasks:
+        if task.agent not in agents:
+            raise ValueError(f"Task '{task.id}' uses unknown agent '{task.agent}'")
+        unknown = set(task.depends_on) - set(ids)
+        if unknown:
+            raise ValueError(f"Task '{task.id}' depends on unknown tasks {sorted(unknown)}")
+
+    # Kahn's algorithm: a plan that cannot be fully ordered contains a cycle
+    remaining = {task.id: set(task.depends_on) for task in plan.tasks}
+    while remaining:
+        ready = [task_id for task_id, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"The plan has a dependency cycle between {sorted(remaining)}")
+        for task_id in ready:
+            del remaining[task_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+class PlanExecutor:
+    """Run a ResearchPlan DAG locally, starting every task as soon as its dependencies finish"""
+
+    def __init__(self, agents, max_concurrency, max_turns=10, hooks=None, run_config=None):
+        self.agents = agents
+        self.max_concurrency = max_concurrency
+        self.max_turns = max_turns
+        self.hooks = hooks
+        self.run_config = run_config
+        self.timings = {}
+        self.usage = Usage()
+        # Provenance of each task that ran: its searches and when it finished
+        self.search_logs = {}
+        self.completed_at = {}
+
+    def _task_input(self, task, research_requirements, tasks_by_id, outputs):
+        parts = [f"Research requirements:\n{research_requirements}", f"Your task:\n{task.description}"]
+        if task.depends_on:
+            parts.append("Results of the tasks this task depends on:")
+            for dependency in task.depends_on:
+                parts.append(f"### {dependency}: {tasks_by_id[dependency].description}\n{outputs[dependency]}")
+        return "\n\n".join(parts)
+
+    async def _run_task(self, task, task_input, context, semaphore):
+        async with semaphore:
+            print(f"▶️ Task {task.id} started on {task.agent}")
+            started = time.perf_counter()
+            self.search_logs[task.id] = start_search_log()
+            try:
+                result = await Runner.run(
+                    self.agents[task.agent],
+                    task_input,
+                    context=context,
+                    max_turns=self.max_turns,
+                    hooks=self.hooks,
+                    run_config=self.run_config,
+                )
+                self.usage.add(result.context_wrapper.usage)
+                output = str(result.final_output)
+            except Exception as e:
+                # Dependents still run and can work around a missing input
+                print(f"❌ Task {task.id} failed: {e}")
+                output = f"{TASK_FAILED_PREFIX}{e}"
+            self.timings[task.id] = time.perf_counter() - started
+            self.completed_at[task.id] = time.time()
+            print(f"⏹️ Task {task.id} finished in {self.timings[task.id]:.1f}s")
+            return output
+
+    async def run(self, plan, research_requirements, context, outputs=None):
+        """Execute every task of plan and return the outputs keyed by task id
+
+        Tasks already in outputs are not run again; their outputs are passed to their dependents.
+        """
+        validate_plan(plan, self.agents)
+        tasks_by_id = {task.id: task for task in plan.tasks}
+        outputs = dict(outputs or {})
+        running = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        try:
+            while len(outputs) < len(tasks_by_id):
+                for task in plan.tasks:
+                    if task.id in outputs or task.id in running:
+                        continue
+                    if all(dependency in outputs for dependency in task.depends_on):
+                        task_input = self._task_input(task, research_requirements, tasks_by_id, outputs)
+                        running[task.id] = asyncio.ensure_future(self._run_task(task, task_input, context, semaphore))
+                done, _ = await asyncio.wait(running.values(), return_when=asyncio.FIRST_COMPLETED)
+                for task_id, future in list(running.items()):
+                    if future in done:
+                        outputs[task_id] = future.result()
+                        del running[task_id]
+        finally:
+            for future in running.values():
+                future.cancel()
+        return outputs
+
+    @staticmethod
+    def final_output(plan, outputs):
+        """Combine the outputs of the tasks nothing else depends on"""
+        dependencies = {dependency for task in plan.tasks for dependency in task.depends_on}
+        sinks = [task.id for task in plan.tasks if task.id not in dependencies]
+        if len(sinks) == 1:
+            return outputs[sinks[0]]
+        return "\n\n".join(f"## {task_id}\n\n{outputs[task_id]}" for task_id in sinks)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from utils import results_fingerprint
+
+# Section name of reports that were not written as a task DAG
+WHOLE_REPORT_SECTION = "report"
+
+
+def provenance_path(report_path):
+    """Return the provenance sidecar file of a report"""
+    report_path = Path(report_path)
+    return report_path.with_name(f"{report_path.stem}.provenance.json")
+
+
+def build_provenance(mode, research_requirements, user_preferences, plan, outputs, search_logs, completed_at):
+    """Describe each section of a report: its output, the searches it used and when it was written"""
+    return {
+        "mode": mode,
+        "requirements": research_requirements,
+        "preferences": user_preferences.model_dump(),
+        "plan": plan.model_dump() if plan is not None else None,
+        "created_at": time.time(),
+        "refreshed_at": None,
+        "sections": {
+            section_id: {
+                "output": str(output),
+                "completed_at": completed_at[section_id],
+                "searches": search_logs[section_id].searches if section_id in search_logs else [],
+            }
+            for section_id, output in outputs.items()
+        },
+    }
+
+
+async def save_provenance(report_path, provenance):
+    """Write the provenance sidecar of a report atomically, off the event loop"""
+    path = provenance_path(report_path)
+
+    def _write():
+        partial = path.with_name(path.name + ".partial")
+        partial.write_text(json.dumps(provenance, indent=2, default=str), encoding="utf-8")
+        os.replace(partial, path)
+    await asyncio.to_thread(_write)
+
+
+def load_provenance(report_path):
+    path = provenance_path(report_path)
+    if not path.exists():
+        raise FileNotFoundError(f"No provenance for {report_path}; only reports written with provenance can be refreshed")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+async def refresh_stale_searches(provenance, max_age_seconds):
+    """Re-run every search older than max_age_seconds, bypassing the cache
+
+    Returns the ids of the sections whose search results changed, and the number of
+    searches that were re-run. Searches whose results did not change are marked fresh.
+    """
+    # Imported here so loading the services does not build the search tools
+    from tools.search_tools import cached_search
+
+    now = time.time()
+    stale = [
+        (section_id, search)
+        for section_id, section in provenance["sections"].items()
+        for search in section["searches"]
+        if now - search["fetched_at"] > max_age_seconds
+    ]
+
+    async def refresh(section_id, search):
+        params = search["params"]
+        response = await cached_search(
+            params["query"],
+            params["search_depth"],
+            params["max_results"],
+            include_domains=params.get("include_domains"),
+            use_cache=False,
+        )
+        fingerprint = results_fingerprint(response)
+        changed = fingerprint != search["results"]
+        search["fetched_at"] = time.time()
+        search["results"] = fingerprint
+        return section_id, changed
+
+    results = await asyncio.gather(*(refresh(section_id, search) for section_id, search in stale), return_exceptions=True)
+    changed = set()
+    for outcome, (section_id, search) in zip(results, stale):
+        if isinstance(outcome, Exception):
+            # A search that cannot be checked is treated as changed
+            print(f"⚠️ Could not refresh search '{search['params']['query']}': {outcome}")
+            changed.add(section_id)
+        elif outcome[1]:
+            changed.add(section_id)
+    return changed, len(stale)
+
+
+def sections_to_rerun(provenance, changed, max_age_seconds):
+    """Sections to write again: changed or stale ones with no searches, and everything depending on them"""
+    now = time.time()
+    rerun = set(changed)
+    for section_id, section in provenance["sections"].items():
+        if not section["searches"] and section_id not in rerun:
+            dependencies = []
+            if provenance["plan"] is not None:
+                dependencies = next(task["depends_on"] for task in provenance["plan"]["tasks"] if task["id"] == section_id)
+            # Sections built only from other sections are rewritten when those change
+            if not dependencies and now - section["completed_at"] > max_age_seconds:
+                rerun.add(section_id)
+
+    if provenance["plan"] is not None:
+        grew = True
+        while grew:
+            grew = False
+            for task in provenance["plan"]["tasks"]:
+                if task["id"] not in rerun and rerun.intersection(task["depends_on"]):
+                    rerun.add(task["id"])
+                    grew = True
+    return rerun
@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from config import RESEARCHES_DIR
+from utils.dedup import minhash, minhash_similarity
+
+# Requirements are compared on single words: rewording moves word pairs far more than words
+REQUIREMENTS_SHINGLE_SIZE = 1
+
+
+def requirements_hash(research_requirements):
+    """Hash requirements after normalizing case and whitespace, so resubmissions share a hash"""
+    normalized = re.sub(r"\s+", " ", (research_requirements or "").strip().lower())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def new_report_id():
+    """Return a sortable report id that cannot collide, even for reports finished in the same second"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def _write_atomic(path, content):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "w", encoding="utf-8") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+class ReportStore:
+    """Research reports on disk plus a SQLite index of their metadata
+
+    Reports are written atomically off the event loop. The index holds requirements,
+    requirements hash, user, mode, timings, token counts and sources, and a full-text
+    index of requirements and report text, so lookups stay fast as reports accumulate.
+    """
+
+    def __init__(self, root, index_path=None):
+        self.root = Path(root)
+        self.index_path = Path(index_path) if index_path else self.root / "index.sqlite3"
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    requirements TEXT NOT NULL,
+                    requirements_hash TEXT NOT NULL,
+                    user TEXT,
+                    mode TEXT,
+                    seconds REAL,
+                    input_tokens INTEGER,
+                    output_tokens INTEGER,
+                    total_tokens INTEGER,
+                    sources TEXT NOT NULL DEFAULT '[]',
+                    requirements_minhash TEXT,
+                    incomplete INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_reports_requirements_hash ON reports(requirements_hash);
+                CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports(created_at);
+                CREATE INDEX IF NOT EXISTS idx_reports_user ON reports(user, created_at);
+                CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(id UNINDEXED, requirements, content);
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(reports)")}
+            if "requirements_minhash" not in columns:
+                # Indexes created before near-match lookups
+                self._conn.execute("ALTER TABLE reports ADD COLUMN requirements_minhash TEXT")
+            if "incomplete" not in columns:
+                # Indexes created before failed tasks were recorded
+                self._conn.execute("ALTER TABLE reports ADD COLUMN incomplete INTEGER NOT NULL DEFAULT 0")
+            self._conn.commit()
+        return self._conn
+
+    def new_report_path(self):
+        """Return the path for a new report"""
+        return self.root / f"research_{new_report_id()}.md"
+
+    def _index_sync(self, path, content, metadata):
+        now = time.time()
+        usage = metadata.get("usage")
+        row = {
+            "id": metadata.get("id") or Path(path).stem.removeprefix("research_"),
+            "path": str(path),
+            "requirements": metadata["requirements"],
+            "requirements_hash": requirements_hash(metadata["requirements"]),
+            "user": metadata.get("user"),
+            "mode": metadata.get("mode"),
+            "seconds": metadata.get("seconds"),
+            "input_tokens": usage.input_tokens if usage else None,
+            "output_tokens": usage.output_tokens if usage else None,
+            "total_tokens": usage.total_tokens if usage else None,
+            "sources": json.dumps(metadata.get("sources") or []),
+            "requirements_minhash": json.dumps(minhash(metadata["requirements"], shingle_size=REQUIREMENTS_SHINGLE_SIZE)),
+            "incomplete": int(bool(metadata.get("incomplete"))),
+        }
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                existing = conn.execute("SELECT id FROM reports WHERE path = ?", (row["path"],)).fetchone()
+                if existing is not None:
+                    # Rewritten in place, for example by a refresh: keep its id
+                    row["id"] = existing["id"]
+                elif conn.execute("SELECT 1 FROM reports WHERE id = ?", (row["id"],)).fetchone():
+                    row["id"] = new_report_id()
+                conn.execute(
+                    """INSERT INTO reports (id, path, created_at, updated_at, requirements, requirements_hash,
+                           user, mode, seconds, input_tokens, output_tokens, total_tokens, sources, requirements_minhash, incomplete)
+                       VALUES (:id, :path, :now, :now, :requirements, :requirements_hash,
+                           :user, :mode, :seconds, :input_tokens, :output_tokens, :total_tokens, :sources,
+                           :requirements_minhash, :incomplete)
+                       ON CONFLICT(path) DO UPDATE SET
+                           updated_at = :now, requirements = :requirements, requirements_hash = :requirements_hash,
+                           user = :user, mode = :mode, seconds = :seconds, input_tokens = :input_tokens,
+                           output_tokens = :output_tokens, total_tokens = :total_tokens, sources = :sources,
+                           requirements_minhash = :requirements_minhash, incomplete = :incomplete""",
+                    {**row, "now": now},
+                )
+                conn.execute("DELETE FROM reports_fts WHERE id = ?", (row["id"],))
+                conn.execute(
+                    "INSERT INTO reports_fts (id, requirements, content) VALUES (?, ?, ?)",
+                    (row["id"], row["requirements"], content),
+                )
+        return row["id"]
+
+    async def save(self, path, content, metadata):
+        """Write a report atomically and index it, returning its id"""
+        def _save():
+            _write_atomic(path, content)
+            return self._index_sync(path, content, metadata)
+        return await asyncio.to_thread(_save)
+
+    async def index(self, path, metadata):
+        """Index a report that was already written, such as a streamed one"""
+        def _index():
+            content = Path(path).read_text(encoding="utf-8")
+            return self._index_sync(path, content, metadata)
+        return await asyncio.to_thread(_index)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [self._row(row) for row in rows]
+
+    @staticmethod
+    def _row(row):
+        report = dict(row)
+        report["sources"] = json.loads(report["sources"])
+        report.pop("requirements_minhash", None)
+        return report
+
+    async def get(self, report_id):
+        rows = await asyncio.to_thread(self._query, "SELECT * FROM reports WHERE id = ?", (report_id,))
+        return rows[0] if rows else None
+
+    async def list(self, limit=20, user=None):
+        """Return the most recent reports, optionally only those of one user"""
+        if user is None:
+            return await asyncio.to_thread(
+                self._query, "SELECT * FROM reports ORDER BY created_at DESC LIMIT ?", (limit,)
+            )
+        return await asyncio.to_thread(
+            self._query, "SELECT * FROM reports WHERE user = ? ORDER BY created_at DESC LIMIT ?", (user, limit)
+        )
+
+    async def search(self, query, limit=20):
+        """Full-text search over report requirements and text, best matches first"""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        return await asyncio.to_thread(
+            self._query,
+            """SELECT reports.* FROM reports_fts JOIN reports ON reports.id = reports_fts.id
+               WHERE reports_fts MATCH ? ORDER BY bm25(reports_fts) LIMIT ?""",
+            (match, limit),
+        )
+
+    async def find_by_requirements(self, research_requirements, limit=5):
+        """Return earlier reports with the same normalized requirements, newest first"""
+        return await asyncio.to_thread(
+            self._query,
+            "SELECT * FROM reports WHERE requirements_hash = ? ORDER BY created_at DESC LIMIT ?",
+            (requirements_hash(research_requirements), limit),
+        )
+
+    def _find_similar_sync(self, research_requirements, threshold, max_age_days, max_candidates):
+        cutoff = time.time() - max_age_days * 24 * 60 * 60
+        with self._lock:
+            conn = self._connect()
+            # Identical normalized requirements: an indexed lookup
+            rows = conn.execute(
+                """SELECT * FROM reports WHERE requirements_hash = ? AND created_at >= ? AND IFNULL(mode, '') != 'reused' AND NOT incomplete
+                   ORDER BY created_at DESC""",
+                (requirements_hash(research_requirements), cutoff),
+            ).fetchall()
+            matches = [(1.0, row) for row in rows]
+            if not matches:
+                signature = minhash(research_requirements, shingle_size=REQUIREMENTS_SHINGLE_SIZE)
+                candidates = conn.execute(
+                    """SELECT * FROM reports WHERE created_at >= ? AND IFNULL(mode, '') != 'reused' AND NOT incomplete
+                       AND requirements_minhash IS NOT NULL
+                       ORDER BY created_at DESC LIMIT ?""",
+                    (cutoff, max_candidates),
+                ).fetchall()
+                matches = sorted(
+                    ((minhash_similarity(signature, json.loads(row["requirements_minhash"])), row) for row in candidates),
+                    key=lambda match: match[0],
+                    reverse=True,
+                )
+        for similarity, row in matches:
+            if similarity < threshold:
+                break
+            if Path(row["path"]).exists():
+                report = self._row(row)
+                report["similarity"] = similarity
+                return report
+        return None
+
+    async def find_similar(self, research_requirements, threshold, max_age_days, max_candidates=1000):
+        """Return the most similar recent report whose requirements match at least threshold, or None
+
+        Identical normalized requirements are found through the hash index; otherwise the
+        MinHash signatures of the newest max_candidates reports are compared. Reused and
+        incomplete reports are never returned.
+        """
+        return await asyncio.to_thread(
+            self._find_similar_sync, research_requirements, threshold, max_age_days, max_candidates
+        )
+
+
+# Every report written by the research service
+report_store = ReportStore(RESEARCHES_DIR)
@@ -0,0 +1,81 @@
+import asyncio
+import os
+from pathlib import Path
+
+
+class IncrementalReportWriter:
+    """Write a report to disk piece by piece as it streams in
+
+    Text goes to a `.partial` file that is flushed in chunks off the event loop and renamed
+    into place on close; an aborted report stays in the `.partial` file. Text written since
+    the last mark() can be rolled back, which drops commentary the model produced before
+    deciding to call a tool.
+    """
+
+    def __init__(self, path, flush_bytes=1024):
+        self.path = Path(path)
+        self.partial_path = self.path.with_name(self.path.name + ".partial")
+        self.flush_bytes = flush_bytes
+        self._buffer = []
+        self._buffered = 0
+        self._mark = 0
+        self._written = 0
+        self._file = None
+
+    async def open(self, header):
+        def _open():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.partial_path, "w", encoding="utf-8", newline="")
+        await asyncio.to_thread(_open)
+        await self.append(header)
+        await self.flush()
+        self.mark()
+
+    async def append(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text.encode("utf-8"))
+        if self._buffered >= self.flush_bytes:
+            await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+
+        def _write():
+            self._file.write(data)
+            self._file.flush()
+            return self._file.tell()
+        self._written = await asyncio.to_thread(_write)
+
+    def mark(self):
+        """Remember the current end of the report as a rollback point"""
+        self._mark = self._written + self._buffered
+
+    async def rollback(self):
+        """Discard everything appended since the last mark()"""
+        await self.flush()
+
+        def _truncate():
+            self._file.truncate(self._mark)
+            self._file.seek(self._mark)
+            return self._file.tell()
+        self._written = await asyncio.to_thread(_truncate)
+
+    async def close(self, footer=""):
+        """Append the footer and move the finished report into place"""
+        await self.append(footer)
+        await self.flush()
+
+        def _close():
+            self._file.close()
+            os.replace(self.partial_path, self.path)
+        await asyncio.to_thread(_close)
+
+    async def abort(self, reason):
+        """Mark the report as incomplete and close it, leaving it in the `.partial` file"""
+        await self.append(f"\n\n---\n\n**INCOMPLETE:** the research stopped before the report was finished ({reason})\n")
+        await self.flush()
+        await asyncio.to_thread(self._file.close)
@@ -1,25 +1,302 @@
 import asyncio
+import time
 from datetime import datetime
 from pathlib import Path
-from agents import Runner, InputGuardrailTripwireTriggered, SQLiteSession
-from models import UserPreference
-from config import MAX_QUESTIONS, RESEARCHES_DIR
+from agents import Runner, InputGuardrailTripwireTriggered, RunConfig, Usage
+from openai.types.responses import ResponseTextDeltaEvent
+from models import UserPreference, ResearchContext, ResearchPlan, RequirementsContext
+from config import (
+    MAX_QUESTIONS,
+    RUNS_DIR,
+    RUN_JOURNAL_TTL_SECONDS,
+    LLM_HEDGE_MAX_PER_RUN,
+    PLAN_MAX_CONCURRENCY,
+    REPORT_STALE_DAYS,
+    RUN_REUSE_ENABLED,
+    RUN_REUSE_SIMILARITY,
+    RUN_REUSE_MAX_AGE_DAYS,
+    CONTEXT_COMPACTION_ENABLED,
+    CONTEXT_TOKEN_BUDGETS,
+    CONTEXT_DEFAULT_TOKEN_BUDGET,
+)
+import ai_agents
+from utils import start_hedge_budget, start_run_journal, new_run_id, maybe_prune_run_journals, RunJournal, start_search_log, SingleFlight, DiskCache, set_current_user, llm_cache_stats, hedging_stats, llm_user_limit_stats
 from .system_monitor import SystemMonitor
+from .report_writer import IncrementalReportWriter
+from .plan_executor import PlanExecutor, default_research_plan, validate_plan, failed_tasks
+from .context_compactor import ContextCompactor
+from .session_manager import session_manager
+from .report_store import report_store, requirements_hash
+from .report_provenance import (
+    WHOLE_REPORT_SECTION,
+    build_provenance,
+    save_provenance,
+    load_provenance,
+    refresh_stale_searches,
+    sections_to_rerun,
+)
+
+def process_stats():
+    """Counters shared by every run in this process: searches, LLM response cache hits and misses,
+    hedged LLM calls, the per-user caps of LLM and search calls in flight, and the run sessions"""
+    # Imported here so loading the services does not build the search tools
+    from tools.search_tools import search_stats, tavily_user_limits
+
+    return {
+        "search": search_stats(),
+        "llm_cache": llm_cache_stats(),
+        "hedging": hedging_stats(),
+        "user_limits": {"llm": llm_user_limit_stats(), "search": tavily_user_limits.stats()},
+        "sessions": session_manager.stats(),
+    }
+
+
+# Identical research runs in flight at the same time share one execution
+research_flights = SingleFlight()
+
+def scripted_answers(answers, auto_answer):
+    """Answer provider replying with the pre-answered requirements, then with auto_answer"""
+    remaining = list(answers or [])
+
+    def answer(question_number, question):
+        if remaining:
+            return remaining.pop(0)
+        return auto_answer
+    return answer
 
 class ResearchService:
     """Service for handling research workflows and agent interactions"""
     
     def __init__(self):
         self.system_monitor = SystemMonitor()
+        # Token usage of every run this service made, including agents called as tools
+        self.usage = Usage()
+        # Report the last run_research() call was served from instead of running, if any
+        self.reused_from = None
+
+    def _run_config(self):
+        """Run configuration for one research run, with a fresh context compactor"""
+        if not CONTEXT_COMPACTION_ENABLED:
+            return RunConfig()
+        compactor = ContextCompactor(
+            ai_agents.context_summarizer_agent,
+            budgets=CONTEXT_TOKEN_BUDGETS,
+            default_budget=CONTEXT_DEFAULT_TOKEN_BUDGET,
+        )
+        return RunConfig(call_model_input_filter=compactor)
     
-    async def gather_requirements(self, requirements_agent):
-        """Gather research requirements from the user"""
+    async def run_research(self, research_requirements, user_preferences, mode="plan", reuse=RUN_REUSE_ENABLED, report_path=None):
+        """Research requirements in the given mode ("plan", "dag" or "stream"), reusing earlier work
+
+        A recent report for the same or near-identical requirements is served instead of a
+        new run, and a submission identical to a run in progress waits for that run. Both
+        write a report marked with where it was reused from. Pass reuse=False for a fresh run.
+        """
+        self.reused_from = None
+        # Model and search calls of this run count against the user's concurrency caps
+        set_current_user(user_preferences.name)
+        report_path = Path(report_path) if report_path else self._new_report_path()
+        if not reuse:
+            return await self._run_mode(mode, research_requirements, user_preferences, report_path)
+
+        match = await report_store.find_similar(research_requirements, RUN_REUSE_SIMILARITY, RUN_REUSE_MAX_AGE_DAYS)
+        if match is not None:
+            created = datetime.fromtimestamp(match["created_at"]).strftime("%B %d, %Y at %I:%M %p")
+            note = f"report {match['id']} ({match['path']}), generated {created}, requirements similarity {match['similarity']:.0%}"
+            return await self._write_reused_report(match["path"], note, research_requirements, user_preferences, report_path)
+
+        leader = False
+
+        async def run():
+            nonlocal leader
+            leader = True
+            final_output = await self._run_mode(mode, research_requirements, user_preferences, report_path)
+            return final_output, report_path
+
+        key = DiskCache.make_key(mode, requirements_hash(research_requirements))
+        final_output, shared_path = await research_flights.do(key, run)
+        if leader:
+            return final_output
+        if not Path(shared_path).exists():
+            # The shared run ended without a report, for example when its guardrail tripped
+            return await self._run_mode(mode, research_requirements, user_preferences, report_path)
+        print(f"♻️ Joined an identical research run already in progress ({shared_path})")
+        return await self._write_reused_report(shared_path, f"a concurrent identical run ({shared_path})", research_requirements, user_preferences, report_path)
+
+    async def _run_mode(self, mode, research_requirements, user_preferences, report_path):
+        if mode == "dag":
+            return await self.execute_structured_plan(
+                ai_agents.structured_planner_agent, ai_agents.research_task_agents, research_requirements,
+                user_preferences, report_path=report_path
+            )
+        if mode == "stream":
+            return await self.stream_research_plan(
+                ai_agents.planner_agent, research_requirements, user_preferences, report_path=report_path
+            )
+        return await self.execute_research_plan(
+            ai_agents.planner_agent, research_requirements, user_preferences, report_path=report_path
+        )
+
+    async def _write_reused_report(self, source_path, note, research_requirements, user_preferences, report_path):
+        """Write a copy of an earlier report, marked with where it was reused from"""
+        source_path = Path(source_path)
+        content = await asyncio.to_thread(source_path.read_text, encoding="utf-8")
+        marker = f"> ♻️ **Reused from** {note}. No new research was run; rerun with `--no-reuse` for a fresh report.\n\n"
+        # The marker goes right under the report title
+        title, _, body = content.partition("\n")
+        await report_store.save(report_path, f"{title}\n\n{marker}{body.lstrip()}", {
+            "requirements": research_requirements,
+            "user": user_preferences.name,
+            "mode": "reused",
+            "seconds": 0.0,
+            "sources": [],
+        })
+        self.reused_from = str(source_path)
+        print(f"♻️ Reused {note}")
+        print(f"✅ Research saved to: {report_path}")
+        return body
+
+    async def _start_journal(self, mode, research_requirements, user_preferences, report_path, run_id=None):
+        """Open the run journal that checkpoints every completed step of this run"""
+        await asyncio.to_thread(maybe_prune_run_journals, RUNS_DIR, RUN_JOURNAL_TTL_SECONDS)
+        journal = start_run_journal(Path(RUNS_DIR) / f"{run_id or new_run_id()}.jsonl")
+        await journal.start({
+            "mode": mode,
+            "requirements": research_requirements,
+            "preferences": user_preferences.model_dump(),
+            "report_path": str(report_path),
+        })
+        print(f"🧾 Run {journal.run_id} (resume with: python main.py --resume {journal.run_id})")
+        return journal
+
+    async def _finish_journal(self, journal, final_output, report_path):
+        await journal.finish({"final_output": str(final_output), "report_path": str(report_path) if report_path else None})
+        print(f"🧾 Run journal: {journal.stats()}")
+
+    async def resume(self, run_id):
+        """Resume an interrupted run from its journal
+
+        Completed model calls and searches are replayed from the journal, so only the
+        steps that never finished are run again.
+        """
+        path = Path(RUNS_DIR) / f"{run_id}.jsonl"
+        if not path.exists():
+            raise FileNotFoundError(f"No journal for run {run_id} in {RUNS_DIR}")
+        journal = RunJournal(path)
+        if journal.meta is None:
+            raise ValueError(f"The journal of run {run_id} has no run record")
+        if journal.outcome is not None:
+            print(f"✅ Run {run_id} already finished, report: {journal.outcome['report_path']}")
+            return journal.outcome["final_output"]
+
+        meta = journal.meta
+        print(f"⏯️ Resuming run {run_id} ({meta['mode']}): {len(journal.steps)} steps completed earlier")
+        user_preferences = UserPreference(**meta["preferences"])
+        if meta["mode"] == "dag":
+            return await self.execute_structured_plan(
+                ai_agents.structured_planner_agent, ai_agents.research_task_agents, meta["requirements"],
+                user_preferences, report_path=meta["report_path"], run_id=run_id
+            )
+        if meta["mode"] == "stream":
+            return await self.stream_research_plan(
+                ai_agents.planner_agent, meta["requirements"], user_preferences,
+                report_path=meta["report_path"], run_id=run_id
+            )
+        return await self.execute_research_plan(
+            ai_agents.planner_agent, meta["requirements"], user_preferences,
+            report_path=meta["report_path"], run_id=run_id
+        )
+
+    async def refresh_report(self, report_path, max_age_days=REPORT_STALE_DAYS):
+        """Bring an existing report up to date, rewriting only what went stale
+
+        Searches older than max_age_days are re-run without the cache. Sections whose search
+        results changed, and the sections depending on them, are written again; the rest of
+        the report is reused as is.
+        """
+        provenance = load_provenance(report_path)
+        max_age_seconds = max_age_days * 24 * 60 * 60
+        changed, rechecked = await refresh_stale_searches(provenance, max_age_seconds)
+        rerun = sections_to_rerun(provenance, changed, max_age_seconds)
+        print(f"🔄 Rechecked {rechecked} searches: {len(changed)} sections have new results, "
+              f"{len(rerun)} of {len(provenance['sections'])} sections will be rewritten")
+
+        if not rerun:
+            provenance["refreshed_at"] = time.time()
+            await save_provenance(report_path, provenance)
+            print(f"✅ {report_path} is up to date")
+            return None
+
+        user_preferences = UserPreference(**provenance["preferences"])
+        research_requirements = provenance["requirements"]
+        if provenance["plan"] is None:
+            # Reports not written as a task DAG are a single section
+            if provenance["mode"] == "stream":
+                return await self.stream_research_plan(
+                    ai_agents.planner_agent, research_requirements, user_preferences, report_path=report_path
+                )
+            return await self.execute_research_plan(
+                ai_agents.planner_agent, research_requirements, user_preferences, report_path=report_path
+            )
+
+        started = time.perf_counter()
+        plan = ResearchPlan(**provenance["plan"])
+        research_context = ResearchContext(preferences=user_preferences)
+        start_hedge_budget(LLM_HEDGE_MAX_PER_RUN)
+        executor = PlanExecutor(
+            ai_agents.research_task_agents,
+            max_concurrency=PLAN_MAX_CONCURRENCY,
+            hooks=self.system_monitor,
+            run_config=self._run_config()
+        )
+        kept = {
+            section_id: section["output"]
+            for section_id, section in provenance["sections"].items()
+            if section_id not in rerun
+        }
+        outputs = await executor.run(plan, research_requirements, research_context, outputs=kept)
+        final_output = executor.final_output(plan, outputs)
+        self.usage.add(executor.usage)
+        print(f"⏱️ Task timings: { {task_id: round(seconds, 1) for task_id, seconds in executor.timings.items()} }")
+
+        saved_path = await self.save_research_to_markdown(
+            final_output, research_requirements, report_path,
+            self._report_metadata(
+                "refresh", research_requirements, user_preferences, started, research_context,
+                incomplete=bool(failed_tasks(outputs))
+            )
+        )
+        if saved_path:
+            for section_id in executor.completed_at:
+                provenance["sections"][section_id] = {
+                    "output": str(outputs[section_id]),
+                    "completed_at": executor.completed_at[section_id],
+                    "searches": executor.search_logs[section_id].searches,
+                }
+            provenance["refreshed_at"] = time.time()
+            await save_provenance(saved_path, provenance)
+        return final_output
+
+    async def gather_requirements(self, requirements_agent, idea=None, answer_provider=None):
+        """Gather research requirements from the user
+
+        Without an idea, the user is prompted for one. answer_provider(question_number, question)
+        returns the reply to each question, and defaults to prompting the user. An empty reply
+        ends the questions.
+        """
         print("\nCALLING AGENT ASYNC\n")
-        session = SQLiteSession(session_id="requirements_gathering")
-        idea_given = input("Idea: ").strip()
+        session = session_manager.new_session("requirements")
+        start_hedge_budget(LLM_HEDGE_MAX_PER_RUN)
+        idea_given = idea.strip() if idea is not None else input("Idea: ").strip()
+        if answer_provider is None:
+            answer_provider = lambda question_number, question: input("Your response: ").strip()
         
+        requirements_context = RequirementsContext()
         try:
-            result = await Runner.run(requirements_agent, idea_given, session=session)
+            result = await Runner.run(requirements_agent, idea_given, session=session, context=requirements_context)
+            self.usage.add(result.context_wrapper.usage)
+            # The idea passed the guardrail; the next turns are answers to its questions
+            requirements_context.idea_validated = True
             question_count = 0
             
             while True:
@@ -33,13 +310,14 @@ class ResearchService:
                     print("\nRequirements gathering completed!")
                     break
                     
-                user_response = input("Your response: ").strip()
+                user_response = answer_provider(question_count, result.final_output.question)
                 if not user_response:
                     break
                     
                 # Pass the current question count to the agent
-                context = f"Current question number: {question_count}. User response: {user_response}"
-                result = await Runner.run(requirements_agent, context, session=session)
+                answer = f"Current question number: {question_count}. User response: {user_response}"
+                result = await Runner.run(requirements_agent, answer, session=session, context=requirements_context)
+                self.usage.add(result.context_wrapper.usage)
                 
                 # Additional safety check for max questions
                 if question_count > MAX_QUESTIONS:
@@ -57,43 +335,206 @@ class ResearchService:
             print(f"❌ Error: {e}")
             return None
     
-    async def execute_research_plan(self, planner_agent, research_requirements, user_preferences):
+    async def execute_research_plan(self, planner_agent, research_requirements, user_preferences, report_path=None, run_id=None):
         """Execute the research plan using the planner agent"""
         print("\nCALLING AGENT ASYNC\n")
-        session = SQLiteSession(session_id="planner")
+        session = session_manager.new_session("planner")
+        research_context = ResearchContext(preferences=user_preferences)
+        hedge_budget = start_hedge_budget(LLM_HEDGE_MAX_PER_RUN)
+        started = time.perf_counter()
+        report_path = report_path or self._new_report_path()
+        journal = await self._start_journal("plan", research_requirements, user_preferences, report_path, run_id)
         print("Research requirements: ", research_requirements)
         print("-Research planner started-")
+        search_log = start_search_log()
         
         result = await Runner.run(
             planner_agent, 
             research_requirements, 
             session=session, 
             max_turns=20, 
-            context=user_preferences, 
-            hooks=self.system_monitor
+            context=research_context, 
+            hooks=self.system_monitor,
+            run_config=self._run_config()
         )
         
+        self.usage.add(result.context_wrapper.usage)
+        
         print("\nFinal result:", result.final_output) 
+        await self._print_run_stats(research_context, hedge_budget)
         
         # Save the research output as a markdown file
-        await self.save_research_to_markdown(result.final_output, research_requirements)
+        saved_path = await self.save_research_to_markdown(
+            result.final_output, research_requirements, report_path,
+            self._report_metadata("plan", research_requirements, user_preferences, started, research_context)
+        )
+        if saved_path:
+            await save_provenance(saved_path, build_provenance(
+                "plan", research_requirements, user_preferences, None,
+                {WHOLE_REPORT_SECTION: result.final_output},
+                {WHOLE_REPORT_SECTION: search_log}, {WHOLE_REPORT_SECTION: time.time()}
+            ))
+        await self._finish_journal(journal, result.final_output, saved_path)
         
         return result.final_output
     
-    async def save_research_to_markdown(self, final_output, research_requirements):
-        """Save the research output as a formatted markdown file"""
-        
-        # Create researches folder if it doesn't exist
-        researches_dir = Path(RESEARCHES_DIR)
-        researches_dir.mkdir(exist_ok=True)
-        
-        # Generate timestamped filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"research_{timestamp}.md"
-        filepath = researches_dir / filename
-        
-        # Create formatted markdown content
-        markdown_content = f"""# Business Research Report
+    async def execute_structured_plan(self, planner_agent, task_agents, research_requirements, user_preferences, report_path=None, run_id=None):
+        """Execute research as a DAG: the planner emits a ResearchPlan and independent tasks run concurrently"""
+        print("\nCALLING AGENT ASYNC\n")
+        research_context = ResearchContext(preferences=user_preferences)
+        hedge_budget = start_hedge_budget(LLM_HEDGE_MAX_PER_RUN)
+        started = time.perf_counter()
+        report_path = report_path or self._new_report_path()
+        journal = await self._start_journal("dag", research_requirements, user_preferences, report_path, run_id)
+        print("Research requirements: ", research_requirements)
+        print("-Structured research planner started-")
+
+        result = await Runner.run(
+            planner_agent,
+            research_requirements,
+            context=research_context,
+            hooks=self.system_monitor
+        )
+        self.usage.add(result.context_wrapper.usage)
+        plan = result.final_output
+
+        executor = PlanExecutor(
+            task_agents,
+            max_concurrency=PLAN_MAX_CONCURRENCY,
+            hooks=self.system_monitor,
+            run_config=self._run_config()
+        )
+        try:
+            validate_plan(plan, task_agents)
+        except ValueError as e:
+            print(f"⚠️ Planner returned an unusable plan ({e}), falling back to the default plan")
+            plan = default_research_plan(research_requirements)
+
+        print(f"📋 Research plan: {plan.research_plan}")
+        for task in plan.tasks:
+            depends = f" after {', '.join(task.depends_on)}" if task.depends_on else ""
+            print(f"   - {task.id} [{task.agent}]{depends}: {task.description}")
+
+        outputs = await executor.run(plan, research_requirements, research_context)
+        final_output = executor.final_output(plan, outputs)
+        self.usage.add(executor.usage)
+
+        print("\nFinal result:", final_output)
+        print(f"⏱️ Task timings: { {task_id: round(seconds, 1) for task_id, seconds in executor.timings.items()} }")
+        await self._print_run_stats(research_context, hedge_budget)
+
+        saved_path = await self.save_research_to_markdown(
+            final_output, research_requirements, report_path,
+            self._report_metadata(
+                "dag", research_requirements, user_preferences, started, research_context,
+                incomplete=bool(failed_tasks(outputs))
+            )
+        )
+        if saved_path:
+            await save_provenance(saved_path, build_provenance(
+                "dag", research_requirements, user_preferences, plan, outputs,
+                executor.search_logs, executor.completed_at
+            ))
+        await self._finish_journal(journal, final_output, saved_path)
+
+        return final_output
+
+    async def stream_research_plan(self, planner_agent, research_requirements, user_preferences, report_agent_name="orchestrator_agent", report_path=None, run_id=None):
+        """Execute the research plan with streaming, writing the report as it is generated
+
+        Tokens and tool events are printed as they arrive, and the final output of
+        report_agent_name is appended to the report file incrementally.
+        """
+        print("\nCALLING AGENT STREAMED\n")
+        session = session_manager.new_session("planner")
+        research_context = ResearchContext(preferences=user_preferences)
+        hedge_budget = start_hedge_budget(LLM_HEDGE_MAX_PER_RUN)
+        started = time.perf_counter()
+        report_path = report_path or self._new_report_path()
+        # Streamed turns are not journaled; agents called as tools and searches are
+        journal = await self._start_journal("stream", research_requirements, user_preferences, report_path, run_id)
+        print("Research requirements: ", research_requirements)
+        print("-Research planner started-")
+
+        search_log = start_search_log()
+        writer = IncrementalReportWriter(report_path)
+        await writer.open(self._report_header(research_requirements))
+        print(f"📝 Writing report to: {writer.partial_path}")
+
+        result = Runner.run_streamed(
+            planner_agent,
+            research_requirements,
+            session=session,
+            max_turns=20,
+            context=research_context,
+            hooks=self.system_monitor,
+            run_config=self._run_config()
+        )
+        current_agent = planner_agent.name
+        try:
+            async for event in result.stream_events():
+                if event.type == "agent_updated_stream_event":
+                    current_agent = event.new_agent.name
+                    print(f"\n--- {current_agent} ---")
+                elif event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                    print(event.data.delta, end="", flush=True)
+                    if current_agent == report_agent_name:
+                        await writer.append(event.data.delta)
+                elif event.type == "run_item_stream_event":
+                    if event.name == "tool_called":
+                        print(f"\n🔨 {current_agent} called {getattr(event.item.raw_item, 'name', 'a tool')}")
+                        if current_agent == report_agent_name:
+                            # Text before a tool call is commentary, not the final report
+                            await writer.rollback()
+                    elif event.name == "tool_output":
+                        print(f"✅ {current_agent} received a tool result")
+                        writer.mark()
+        except Exception as e:
+            # An unfinished report must not look finished, so it is neither moved into place nor indexed
+            await writer.abort(e)
+            print(f"\n❌ Streamed research failed, incomplete report left at: {writer.partial_path}")
+            raise
+
+        await writer.close(self._report_footer())
+        self.usage.add(result.context_wrapper.usage)
+        await report_store.index(
+            writer.path, self._report_metadata("stream", research_requirements, user_preferences, started, research_context)
+        )
+        await save_provenance(writer.path, build_provenance(
+            "stream", research_requirements, user_preferences, None,
+            {WHOLE_REPORT_SECTION: result.final_output},
+            {WHOLE_REPORT_SECTION: search_log}, {WHOLE_REPORT_SECTION: time.time()}
+        ))
+        await self._finish_journal(journal, result.final_output, writer.path)
+        print(f"\n\n✅ Research saved to: {writer.path}")
+        await self._print_run_stats(research_context, hedge_budget)
+        return result.final_output
+
+    async def _print_run_stats(self, research_context, hedge_budget):
+        print(f"📚 Sources: {research_context.dedup.stats()}")
+        print(f"⏱️ Hedged requests: {hedge_budget.stats()}")
+        # The session stats query SQLite, so they are read off the event loop
+        for name, stats in (await asyncio.to_thread(process_stats)).items():
+            print(f"📊 {name}: {stats}")
+
+    def _new_report_path(self):
+        """Return a collision-free report path inside the researches folder"""
+        return report_store.new_report_path()
+
+    def _report_metadata(self, mode, research_requirements, user_preferences, started, research_context, incomplete=False):
+        """Index metadata of a finished report; incomplete reports, with failed tasks, are never reused"""
+        return {
+            "requirements": research_requirements,
+            "user": user_preferences.name,
+            "mode": mode,
+            "seconds": round(time.perf_counter() - started, 1),
+            "usage": self.usage,
+            "sources": research_context.dedup.urls(),
+            "incomplete": incomplete,
+        }
+
+    def _report_header(self, research_requirements):
+        return f"""# Business Research Report
 
 **Generated:** {datetime.now().strftime("%B %d, %Y at %I:%M %p")}  
 **Research Topic:** {research_requirements}
@@ -102,18 +543,31 @@ class ResearchService:
 
 ## Executive Summary
 
-{final_output}
+"""
+
+    def _report_footer(self):
+        return """
 
 ---
 
 *This report was generated by the Deep Research AI system using comprehensive web research, market analysis, and competitive intelligence.*
 
 """
+
+    async def save_research_to_markdown(self, final_output, research_requirements, report_path=None, metadata=None):
+        """Save the research output as a formatted markdown file in the report store and return its path"""
         
-        # Write to file
+        # Generate a new report path unless the caller chose one
+        filepath = Path(report_path) if report_path else self._new_report_path()
+        
+        # Create formatted markdown content
+        markdown_content = f"{self._report_header(research_requirements)}{final_output}{self._report_footer()}"
+        
+        # Write atomically and index, off the event loop
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            print(f"\n✅ Research saved to: {filepath}")
+            report_id = await report_store.save(filepath, markdown_content, metadata or {"requirements": research_requirements})
+            print(f"\n✅ Research saved to: {filepath} (report {report_id})")
+            return filepath
         except Exception as e:
             print(f"\n❌ Error saving research file: {e}")
+            return None
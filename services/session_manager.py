@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from agents.memory import SessionABC
+from config import (
+    CACHE_DIR,
+    SESSION_POOL_SIZE,
+    SESSION_TTL_SECONDS,
+    SESSION_MAX_ITEMS,
+    SESSION_COMPRESS,
+    SESSION_COMPRESS_MIN_BYTES,
+)
+
+# Expired sessions are pruned at most this often
+PRUNE_INTERVAL_SECONDS = 300
+
+
+class PooledSession(SessionABC):
+    """Conversation history of one run, stored through a SessionManager"""
+
+    def __init__(self, manager, session_id):
+        self.manager = manager
+        self.session_id = session_id
+        self.session_settings = None
+
+    async def get_items(self, limit=None):
+        return await asyncio.to_thread(self.manager._get_items, self.session_id, limit)
+
+    async def add_items(self, items):
+        if items:
+            await asyncio.to_thread(self.manager._add_items, self.session_id, items)
+
+    async def pop_item(self):
+        return await asyncio.to_thread(self.manager._pop_item, self.session_id)
+
+    async def clear_session(self):
+        await asyncio.to_thread(self.manager._clear_session, self.session_id)
+
+
+class SessionManager:
+    """Issues a unique session per run, stored in one WAL-mode SQLite database
+
+    Connections are pooled and shared by every run. Sessions idle for longer than
+    ttl_seconds are pruned, each session keeps at most its max_items latest items, and
+    large items are zlib-compressed when compress is set.
+    """
+
+    def __init__(self, path, pool_size, ttl_seconds, max_items, compress=True, compress_min_bytes=512):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+        self.pruned = 0
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue()
+        # Connections opened so far and currently borrowed, for stats()
+        self._opened = 0
+        self._in_use = 0
+        self._usage_lock = threading.Lock()
+        self._slots = threading.Semaphore(pool_size)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._last_prune = 0.0
+
+    def _new_connection(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS sessions (
+                        session_id TEXT PRIMARY KEY,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    );
+                    CREATE TABLE IF NOT EXISTS session_items (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        session_id TEXT NOT NULL,
+                        data BLOB NOT NULL,
+                        compressed INTEGER NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_session_items_session ON session_items(session_id, id);
+                    CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at);
+                    """
+                )
+                self._schema_ready = True
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection, opening one if the pool has a free slot"""
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                conn = self._new_connection()
+                with self._usage_lock:
+                    self._opened += 1
+            with self._usage_lock:
+                self._in_use += 1
+            try:
+                yield conn
+            finally:
+                with self._usage_lock:
+                    self._in_use -= 1
+                self._pool.put(conn)
+        finally:
+            self._slots.release()
+
+    def new_session(self, kind):
+        """Return a session with a unique id for one run"""
+        return PooledSession(self, f"{kind}-{uuid.uuid4().hex}")
+
+    def get_session(self, session_id):
+        """Return the session with the given id, for example to continue an earlier run"""
+        return PooledSession(self, session_id)
+
+    def _encode(self, item):
+        data = json.dumps(item, default=str).encode("utf-8")
+        if self.compress and len(data) >= self.compress_min_bytes:
+            return zlib.compress(data), 1
+        return data, 0
+
+    @staticmethod
+    def _decode(data, compressed):
+        if compressed:
+            data = zlib.decompress(data)
+        return json.loads(data)
+
+    def _get_items(self, session_id, limit=None):
+        with self._connection() as conn:
+            if limit is None:
+                rows = conn.execute(
+                    "SELECT data, compressed FROM session_items WHERE session_id = ? ORDER BY id",
+                    (session_id,),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT data, compressed FROM session_items WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                    (session_id, limit),
+                ).fetchall()[::-1]
+        return [self._decode(data, compressed) for data, compressed in rows]
+
+    def _add_items(self, session_id, items):
+        self._maybe_prune()
+        now = time.time()
+        rows = [(session_id, *self._encode(item)) for item in items]
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    "INSERT INTO sessions (session_id, created_at, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+                    (session_id, now, now),
+                )
+                conn.executemany("INSERT INTO session_items (session_id, data, compressed) VALUES (?, ?, ?)", rows)
+                if self.max_items:
+                    self._trim(conn, session_id)
+
+    def _trim(self, conn, session_id):
+        """Drop the oldest items beyond max_items, never leaving a tool output without its call"""
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM session_items WHERE session_id = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+            (session_id, self.max_items),
+        )]
+        if not ids:
+            return
+        cutoff = ids[0]
+        for item_id, data, compressed in conn.execute(
+            "SELECT id, data, compressed FROM session_items WHERE session_id = ? AND id > ? ORDER BY id",
+            (session_id, cutoff),
+        ).fetchall():
+            item = self._decode(data, compressed)
+            if not isinstance(item, dict) or item.get("type") != "function_call_output":
+                break
+            cutoff = item_id
+        conn.execute("DELETE FROM session_items WHERE session_id = ? AND id <= ?", (session_id, cutoff))
+
+    def _pop_item(self, session_id):
+        with self._connection() as conn:
+            with conn:
+                row = conn.execute(
+                    "SELECT id, data, compressed FROM session_items WHERE session_id = ? ORDER BY id DESC LIMIT 1",
+                    (session_id,),
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("DELETE FROM session_items WHERE id = ?", (row[0],))
+        return self._decode(row[1], row[2])
+
+    def _clear_session(self, session_id):
+        with self._connection() as conn:
+            with conn:
+                conn.execute("DELETE FROM session_items WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def _maybe_prune(self):
+        if self.ttl_seconds and time.time() - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+            self._last_prune = time.time()
+            self.prune()
+
+    def prune(self):
+        """Delete sessions idle for longer than the TTL and return how many were removed"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._connection() as conn:
+            with conn:
+                expired = [row[0] for row in conn.execute("SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,))]
+                conn.executemany("DELETE FROM session_items WHERE session_id = ?", [(session_id,) for session_id in expired])
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(session_id,) for session_id in expired])
+        self.pruned += len(expired)
+        if expired:
+            print(f"🧹 Pruned {len(expired)} expired sessions")
+        return len(expired)
+
+    def stats(self):
+        """Return the stored sessions and items, how many items are compressed, the sessions
+        pruned and the connection pool's size, open connections and connections in use"""
+        # Read before borrowing a connection, so the pool usage leaves out this call
+        with self._usage_lock:
+            pool = {"size": self.pool_size, "open": self._opened, "in_use": self._in_use}
+        with self._connection() as conn:
+            sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            items, compressed = conn.execute("SELECT COUNT(*), IFNULL(SUM(compressed), 0) FROM session_items").fetchone()
+        return {"sessions": sessions, "items": items, "compressed": compressed, "pruned": self.pruned, "pool": pool}
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# Run sessions shared by every research run in this process
+session_manager = SessionManager(
+    path=os.path.join(CACHE_DIR, "sessions.sqlite3"),
+    pool_size=SESSION_POOL_SIZE,
+    ttl_seconds=SESSION_TTL_SECONDS,
+    max_items=SESSION_MAX_ITEMS,
+    compress=SESSION_COMPRESS,
+    compress_min_bytes=SESSION_COMPRESS_MIN_BYTES,
+)
@@ -1,4 +1,5 @@
 from agents.lifecycle import RunHooks
+from utils import current_run_journal
 
 class SystemMonitor(RunHooks):
     """System monitor for tracking agent activities and performance"""
@@ -33,11 +34,17 @@ class SystemMonitor(RunHooks):
     async def on_tool_end(self, context, agent, tool, result):
         """Called when a tool finishes being used"""
         print(f"✅🔨 SYSTEM: {agent.name} finished using {tool.name}")
+        journal = current_run_journal()
+        if journal is not None:
+            await journal.step({"event": "tool", "agent": agent.name, "tool": tool.name, "result": str(result)[:200]})
     
     async def on_handoff(self, context, from_agent, to_agent):
         """Called when there's a handoff between agents"""
         self.handoffs += 1
         print(f"🏃‍♂️➡️🏃‍♀️ HANDOFF #{self.handoffs}: {from_agent.name} → {to_agent.name}")
+        journal = current_run_journal()
+        if journal is not None:
+            await journal.step({"event": "handoff", "from": from_agent.name, "to": to_agent.name})
     
     async def on_agent_end(self, context, agent, output):
         """Called when an agent completes their work"""
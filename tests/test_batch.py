@@ -0,0 +1,72 @@
+import json
+import pytest
+import batch
+from services import research_service
+from services.report_store import ReportStore
+from services.research_service import scripted_answers
+from utils import model_factory
+
+REQUIREMENTS = "Vegan meal kits for students"
+
+
+def write_batch(path, *items):
+    path.write_text("\n".join(json.dumps(item) for item in items) + "\n\n", encoding="utf-8")
+    return path
+
+
+def test_load_batch_gives_every_item_a_unique_file_safe_id(tmp_path):
+    path = write_batch(
+        tmp_path / "ideas.jsonl",
+        {"id": "meal kits/v1", "idea": "Meal kits"},
+        {"idea": "Dog food"},
+        {"id": "meal kits/v1", "requirements": REQUIREMENTS},
+    )
+
+    assert [item["id"] for item in batch.load_batch(path)] == ["meal_kits_v1", "idea_2", "meal_kits_v1_3"]
+
+
+def test_load_batch_requires_an_idea_or_requirements(tmp_path):
+    path = write_batch(tmp_path / "ideas.jsonl", {"idea": "Meal kits"}, {"id": "empty", "answers": ["Parents"]})
+
+    with pytest.raises(ValueError, match="Line 2"):
+        batch.load_batch(path)
+
+
+def test_scripted_answers_fall_back_to_the_auto_answer():
+    answer = scripted_answers(["Busy parents", "Europe"], "Use your best judgement")
+
+    assert [answer(number, "?") for number in range(1, 4)] == ["Busy parents", "Europe", "Use your best judgement"]
+    assert scripted_answers(None, "")(1, "?") == ""
+
+
+async def test_run_batch_writes_a_summary_and_isolates_failures(tmp_path, monkeypatch):
+    store = ReportStore(tmp_path / "researches")
+    monkeypatch.setattr(research_service, "report_store", store)
+    # Keep the process-wide model clients open for the other tests
+    monkeypatch.setattr(model_factory, "_clients", {})
+    monkeypatch.setattr(model_factory, "_closed", False)
+    source = store.new_report_path()
+    await store.save(source, "# Vegan meal kits\nStudents want cheap kits.", {"requirements": REQUIREMENTS, "mode": "plan"})
+    output_dir = tmp_path / "batch"
+    # A folder where the report should go makes that item fail
+    (output_dir / "broken.md").mkdir(parents=True)
+    path = write_batch(
+        tmp_path / "ideas.jsonl",
+        {"id": "first", "requirements": REQUIREMENTS},
+        {"id": "broken", "requirements": REQUIREMENTS},
+        {"id": "second", "requirements": REQUIREMENTS, "user": "bob"},
+    )
+
+    totals = await batch.run_batch(path, concurrency=2, output_dir=output_dir, reuse=True)
+
+    assert totals["ideas"] == 3
+    assert totals["ok"] == 2
+    assert totals["reused"] == 2
+    summary = json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))
+    rows = {row["id"]: row for row in summary["ideas"]}
+    assert rows["first"]["reused_from"] == str(source)
+    assert rows["first"]["report"] == str(output_dir / "first.md")
+    assert rows["broken"]["status"] == "failed"
+    assert rows["broken"]["report"] is None
+    assert (output_dir / "second.md").read_text(encoding="utf-8").startswith("# Vegan meal kits")
+    assert summary["totals"] == totals
@@ -0,0 +1,63 @@
+import pytest
+from utils.cassette import Cassette, CassetteMissError
+
+
+async def record(path, calls):
+    cassette = Cassette(path, mode="record")
+    for key, response in calls:
+        async def fetch(response=response):
+            return response
+        assert await cassette.call("tavily.search", key, fetch) == response
+    return cassette
+
+
+async def not_called():
+    raise AssertionError("replay must not reach the provider")
+
+
+async def test_replay_serves_each_request_its_own_recording(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    recorder = await record(path, [("a", {"results": ["a"]}), ("b", {"results": ["b"]})])
+    assert recorder.stats()["recorded"] == 2
+
+    cassette = Cassette(path, mode="replay", replay_latency="zero")
+
+    assert await cassette.call("tavily.search", "b", not_called) == {"results": ["b"]}
+    assert await cassette.call("tavily.search", "a", not_called) == {"results": ["a"]}
+    assert cassette.stats()["replayed"] == 2
+
+
+async def test_replay_raises_on_a_key_miss(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    await record(path, [("a", {"results": ["a"]})])
+    cassette = Cassette(path, mode="replay", replay_latency="zero")
+
+    with pytest.raises(CassetteMissError):
+        await cassette.call("tavily.search", "other query", not_called)
+    # Each recording is replayed once
+    await cassette.call("tavily.search", "a", not_called)
+    with pytest.raises(CassetteMissError):
+        await cassette.call("tavily.search", "a", not_called)
+
+
+async def test_ordered_fallback_is_opt_in(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    await record(path, [("a", {"results": ["a"]})])
+    cassette = Cassette(path, mode="replay", replay_latency="zero", ordered_fallback=True)
+
+    assert await cassette.call("tavily.search", "changed query", not_called) == {"results": ["a"]}
+
+
+async def test_off_mode_passes_through(tmp_path):
+    cassette = Cassette(tmp_path / "cassette.jsonl")
+
+    async def fetch():
+        return {"results": []}
+
+    assert await cassette.call("tavily.search", "a", fetch) == {"results": []}
+    assert not (tmp_path / "cassette.jsonl").exists()
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(tmp_path / "cassette.jsonl", mode="rewind")
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+from agents.run import ModelInputData
+from services.context_compactor import ContextCompactor, extract_citations_and_facts
+
+
+class RecordingCompactor(ContextCompactor):
+    """Compactor whose summaries are made locally instead of by the summarizer agent"""
+
+    def __init__(self, **kwargs):
+        super().__init__(summarizer_agent=None, budgets={}, **kwargs)
+        self.summarized = []
+
+    async def _summarize(self, previous_summary, items, facts_tokens):
+        self.summarized.append(items)
+        return f"summary of {len(items)} items"
+
+
+def message(text, role="user"):
+    return {"role": role, "content": text}
+
+
+def call(call_id):
+    return {"type": "function_call", "call_id": call_id, "name": "search_web", "arguments": "{}"}
+
+
+def output(call_id, size=400):
+    return {"type": "function_call_output", "call_id": call_id, "output": "x" * size}
+
+
+def request(items, agent="analysis_agent"):
+    return SimpleNamespace(
+        model_data=ModelInputData(input=items, instructions="Analyze the market."),
+        agent=SimpleNamespace(name=agent),
+    )
+
+
+def calls_are_paired(items):
+    called = {item["call_id"] for item in items if item.get("type") == "function_call"}
+    return all(item["call_id"] in called for item in items if item.get("type") == "function_call_output")
+
+
+async def test_small_inputs_are_left_alone():
+    compactor = RecordingCompactor(default_budget=10_000)
+    items = [message("idea"), call("a"), output("a")]
+
+    assert (await compactor(request(items))).input == items
+    assert compactor.compactions == 0
+
+
+async def test_older_turns_are_summarized_and_the_request_kept():
+    compactor = RecordingCompactor(default_budget=400)
+    items = [message("idea")] + [item for index in range(6) for item in (call(str(index)), output(str(index)))]
+
+    compacted = (await compactor(request(items))).input
+
+    assert compacted[0] == message("idea")
+    assert compacted[1]["content"].startswith("summary of")
+    assert compacted[-1] == items[-1]
+    assert calls_are_paired(compacted[2:])
+    assert compactor.compactions == 1
+
+
+async def test_split_never_separates_a_tool_output_from_its_call():
+    compactor = RecordingCompactor(default_budget=400)
+    items = [message("idea"), message("plan"), call("a"), output("a", size=100), call("b"), output("b", size=100)]
+
+    # A tail of 60 tokens fits output("b") alone; the split moves back to include its call
+    split = compactor._split_point(items, 1, keep_tokens=60)
+
+    assert split == 4
+    assert calls_are_paired(items[split:])
+
+
+async def test_summaries_are_reused_by_later_turns():
+    compactor = RecordingCompactor(default_budget=400)
+    items = [message("idea")] + [item for index in range(6) for item in (call(str(index)), output(str(index)))]
+    await compactor(request(items))
+
+    compacted = (await compactor(request(items + [message("short follow-up")]))).input
+
+    assert compactor.compactions == 1
+    assert compacted[1]["content"].startswith("summary of")
+
+
+def test_citations_and_figures_are_kept_verbatim():
+    text = (
+        "See https://example.com/report for details. The market reached $2.1 billion in 2023. "
+        "Analysts were upbeat. Growth is 12% a year. See https://example.com/report again."
+    )
+
+    facts = extract_citations_and_facts(text, max_tokens=200).splitlines()
+
+    assert facts == [
+        "- https://example.com/report",
+        "- The market reached $2.1 billion in 2023.",
+        "- Growth is 12% a year.",
+    ]
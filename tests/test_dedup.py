@@ -0,0 +1,82 @@
+from tools.result_formatter import compact_search_response
+from utils.dedup import DedupRegistry, hamming_distance, normalize_url, simhash
+
+ARTICLE = (
+    "The plant-based meal kit market reached 2.1 billion dollars in 2023 and analysts expect it to "
+    "double by 2028 as subscription services add vegan menus, cheaper delivery and partnerships with grocers."
+)
+# The same article syndicated with a different intro and outro
+SYNDICATED = "Reposted from Food Weekly. " + ARTICLE + " Read the original story."
+UNRELATED = (
+    "Battery recycling startups in Europe raised record funding this year, with most capital going to "
+    "hydrometallurgical plants that recover lithium, nickel and cobalt from used electric vehicle packs."
+)
+
+
+def test_urls_match_regardless_of_scheme_www_tracking_and_fragment():
+    assert normalize_url("https://www.Example.com/report/?utm_source=x&id=7#top") == "example.com/report?id=7"
+    assert normalize_url("http://example.com/report?id=7&fbclid=abc") == "example.com/report?id=7"
+
+
+def test_near_duplicate_text_has_a_close_simhash():
+    assert hamming_distance(simhash(ARTICLE), simhash(SYNDICATED)) <= 6
+    assert hamming_distance(simhash(ARTICLE), simhash(UNRELATED)) > 6
+
+
+def test_registry_hands_out_stable_references():
+    registry = DedupRegistry()
+
+    assert registry.register("https://example.com/a", ARTICLE) == (1, False)
+    assert registry.register("https://example.com/b", UNRELATED) == (2, False)
+    assert registry.register("http://www.example.com/a/", "") == (1, True)
+    assert registry.register("https://mirror.example.org/copy", SYNDICATED) == (1, True)
+    assert registry.stats() == {"sources": 2, "duplicates": 2}
+
+
+def test_lookup_does_not_register():
+    registry = DedupRegistry()
+
+    assert registry.lookup("https://example.com/a", ARTICLE) is None
+    assert registry.next_ref == 1
+    assert registry.stats()["sources"] == 0
+
+
+def test_results_seen_earlier_in_the_run_become_stubs():
+    registry = DedupRegistry()
+    first = {"results": [{"url": "https://example.com/a", "title": "Meal kits", "content": ARTICLE}]}
+    second = {"results": [
+        {"url": "https://mirror.example.org/copy", "title": "Meal kits (repost)", "content": SYNDICATED},
+        {"url": "https://example.com/b", "title": "Battery recycling", "content": UNRELATED},
+    ]}
+
+    compact_search_response(first, dedup=registry)
+    output = compact_search_response(second, dedup=registry)
+
+    assert "already seen: [ref 1] Meal kits (repost): Reposted from Food Weekly." in output
+    assert "[2] Battery recycling" in output
+    assert "1 already seen" in output
+
+
+def test_only_rendered_results_are_registered():
+    registry = DedupRegistry()
+    response = {"results": [
+        {"url": "https://example.com/a", "title": "Meal kits", "content": ARTICLE * 20},
+        {"url": "https://example.com/b", "title": "Battery recycling", "content": UNRELATED * 20},
+    ]}
+
+    output = compact_search_response(response, per_result_tokens=200, total_tokens=250, dedup=registry)
+
+    assert "1 lower-ranked results dropped" in output
+    # The dropped result was never shown, so a later search may still return it in full
+    assert registry.lookup("https://example.com/b", UNRELATED * 20) is None
+    assert registry.stats()["sources"] == 1
+
+
+def test_sources_keep_their_original_urls():
+    registry = DedupRegistry()
+    registry.register("https://www.example.com/report?id=7&utm_source=x", ARTICLE)
+    registry.register("http://example.com/report?id=7", "")
+    registry.register("https://mirror.example.org/copy", SYNDICATED)
+    registry.register("https://example.com/b", UNRELATED)
+
+    assert registry.urls() == ["https://www.example.com/report?id=7&utm_source=x", "https://example.com/b"]
@@ -0,0 +1,46 @@
+import time
+from utils import DiskCache
+
+
+async def test_entries_keep_the_time_they_were_stored(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite3", ttl_seconds=60, max_entries=10)
+    before = time.time()
+    await cache.set("key", {"results": []})
+
+    value, stored_at = await cache.get_entry("key")
+
+    assert value == {"results": []}
+    assert before <= stored_at <= time.time()
+    assert await cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite3", ttl_seconds=60, max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+
+    assert await cache.get("a") == 1
+    assert await cache.get("b") is None
+    assert await cache.get("c") == 3
+
+
+async def test_expired_entries_are_misses(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite3", ttl_seconds=0.05, max_entries=10)
+    await cache.set("key", 1)
+    time.sleep(0.1)
+
+    assert await cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+async def test_disabled_cache_is_bypassed(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite3", ttl_seconds=60, max_entries=10, enabled=False)
+    await cache.set("key", 1)
+
+    assert await cache.get("key") is None
+    assert cache.stats()["bypassed"] == 1
+
@@ -0,0 +1,39 @@
+import asyncio
+from utils import UserLimiter, set_current_user
+
+
+async def test_each_user_is_capped_separately_and_waits_are_counted():
+    limiter = UserLimiter("LLM", 1)
+    release = asyncio.Event()
+
+    async def call(user):
+        set_current_user(user)
+        async with limiter.slot():
+            await release.wait()
+
+    tasks = [asyncio.create_task(call(user)) for user in ["alice", "alice", "bob"]]
+    await asyncio.sleep(0.01)
+
+    assert limiter.stats() == {"limit": 1, "waits": 1, "in_flight": {"alice": 1, "bob": 1}}
+    release.set()
+    await asyncio.gather(*tasks)
+    assert limiter.stats()["in_flight"] == {}
+
+
+async def test_calls_outside_a_run_are_not_limited():
+    limiter = UserLimiter("Tavily search", 1)
+
+    async with limiter.slot():
+        async with limiter.slot():
+            pass
+
+    assert limiter.stats() == {"limit": 1, "waits": 0, "in_flight": {}}
+
+
+def test_process_stats_report_the_user_limits():
+    from services.research_service import process_stats
+
+    user_limits = process_stats()["user_limits"]
+
+    assert set(user_limits) == {"llm", "search"}
+    assert {"limit", "waits", "in_flight"} <= set(user_limits["llm"])
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from utils.hedging import HedgedModel, LatencyTracker, start_hedge_budget
+
+
+class SlowThenFastModel:
+    """Fake model whose first call stalls and whose later calls answer quickly"""
+
+    def __init__(self, first_delay, delay=0.01):
+        self.first_delay = first_delay
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    async def get_response(self, label):
+        self.started += 1
+        delay = self.first_delay if self.started == 1 else self.delay
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"{label} #{self.started}"
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def warmed_tracker(seconds=0.02, samples=10):
+    tracker = LatencyTracker(window=50)
+    for _ in range(samples):
+        tracker.record("model", seconds)
+    return tracker
+
+
+async def test_slow_call_is_hedged_and_the_loser_cancelled():
+    model = SlowThenFastModel(first_delay=1.0)
+    hedged = HedgedModel(model, "model", warmed_tracker(), percentile=95, min_samples=5)
+    budget = start_hedge_budget(2)
+
+    response = await hedged.get_response("answer")
+
+    assert response == "answer #2"
+    # Let the cancelled primary request unwind
+    await asyncio.sleep(0)
+    assert model.cancelled == 1
+    assert hedged.stats()["hedges"] == 1
+    assert budget.stats() == {"hedges": 1, "wins": 1, "limit": 2}
+
+
+async def test_fast_call_is_not_hedged():
+    model = SlowThenFastModel(first_delay=0.001)
+    hedged = HedgedModel(model, "model", warmed_tracker(seconds=0.5), percentile=95, min_samples=5)
+    start_hedge_budget(2)
+
+    assert await hedged.get_response("answer") == "answer #1"
+    assert model.started == 1
+    assert hedged.stats()["hedges"] == 0
+
+
+async def test_no_hedging_without_enough_samples():
+    model = SlowThenFastModel(first_delay=0.1)
+    hedged = HedgedModel(model, "model", warmed_tracker(samples=2), percentile=95, min_samples=5)
+    start_hedge_budget(2)
+
+    assert await hedged.get_response("answer") == "answer #1"
+    assert model.started == 1
+
+
+async def test_exhausted_budget_waits_for_the_primary():
+    model = SlowThenFastModel(first_delay=0.1)
+    hedged = HedgedModel(model, "model", warmed_tracker(), percentile=95, min_samples=5)
+    budget = start_hedge_budget(0)
+
+    assert await hedged.get_response("answer") == "answer #1"
+    assert model.started == 1
+    assert budget.stats()["hedges"] == 0
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100)
+    for milliseconds in range(1, 101):
+        tracker.record("model", milliseconds / 1000)
+
+    assert tracker.percentile("model", 50, min_samples=10) == pytest.approx(0.051)
+    assert tracker.percentile("model", 95, min_samples=10) == pytest.approx(0.095)
+    assert tracker.percentile("other", 95, min_samples=10) is None
+
+
+def test_process_stats_report_hedged_calls_of_every_model():
+    from services.research_service import process_stats
+    from utils import hedging_stats
+
+    assert process_stats()["hedging"] == hedging_stats()
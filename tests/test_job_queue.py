@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from services.job_queue import JobQueue, QUEUED, RUNNING, DONE, FAILED
+
+
+@pytest.fixture
+def jobs_db(tmp_path):
+    return tmp_path / "jobs.sqlite3"
+
+
+async def test_concurrent_workers_never_claim_the_same_job(jobs_db):
+    # Separate queues stand in for worker processes sharing one database
+    queues = [JobQueue(jobs_db) for _ in range(4)]
+    submitted = {await queues[0].submit(idea=f"idea {index}") for index in range(10)}
+
+    claims = await asyncio.gather(*(
+        queues[index % len(queues)].claim(f"worker-{index}") for index in range(16)
+    ))
+    claimed = [job["id"] for job in claims if job is not None]
+
+    assert len(claimed) == len(set(claimed)) == 10
+    assert set(claimed) == submitted
+    assert (await queues[0].counts())[RUNNING] == 10
+
+
+async def test_expired_lease_is_claimed_again(jobs_db):
+    queue = JobQueue(jobs_db, lease_seconds=0.2)
+    job_id = await queue.submit(idea="meal kits for dogs")
+
+    first = await queue.claim("worker-a")
+    assert first["id"] == job_id
+    assert await queue.claim("worker-b") is None
+
+    await asyncio.sleep(0.3)
+    second = await queue.claim("worker-b")
+    assert second["id"] == job_id
+    assert second["worker"] == "worker-b"
+    assert second["attempts"] == 2
+
+    # The worker that lost the lease can no longer change the job
+    assert await queue.renew([job_id], "worker-a") == [job_id]
+    assert not await queue.complete(job_id, "worker-a", {"report_path": "a.md"})
+    assert await queue.complete(job_id, "worker-b", {"report_path": "b.md"})
+    job = await queue.get(job_id)
+    assert job["status"] == DONE
+    assert job["report_path"] == "b.md"
+
+
+async def test_renewed_lease_is_not_claimed(jobs_db):
+    queue = JobQueue(jobs_db, lease_seconds=0.3)
+    job_id = await queue.submit(idea="meal kits for dogs")
+    await queue.claim("worker-a")
+
+    for _ in range(3):
+        await asyncio.sleep(0.15)
+        assert await queue.renew([job_id], "worker-a") == []
+        assert await queue.claim("worker-b") is None
+
+
+async def test_job_fails_after_max_attempts(jobs_db):
+    queue = JobQueue(jobs_db, lease_seconds=0.1, max_attempts=2)
+    job_id = await queue.submit(idea="meal kits for dogs")
+
+    for worker in ("worker-a", "worker-b"):
+        assert (await queue.claim(worker))["id"] == job_id
+        await asyncio.sleep(0.2)
+
+    assert await queue.claim("worker-c") is None
+    job = await queue.get(job_id)
+    assert job["status"] == FAILED
+    assert "Lease expired 2 times" in job["error"]
+
+
+async def test_released_job_is_queued_again(jobs_db):
+    queue = JobQueue(jobs_db)
+    job_id = await queue.submit(idea="meal kits for dogs")
+    await queue.claim("worker-a")
+
+    assert await queue.release(job_id, "worker-a")
+    assert (await queue.get(job_id))["status"] == QUEUED
+    assert (await queue.claim("worker-b"))["id"] == job_id
+
+
+async def test_users_are_served_by_fair_share(jobs_db):
+    queue = JobQueue(jobs_db)
+    for index in range(6):
+        await queue.submit(idea=f"bulk idea {index}", user="alice")
+    for index in range(2):
+        await queue.submit(idea=f"idea {index}", user="bob")
+
+    order = [(await queue.claim("worker"))["user"] for _ in range(8)]
+
+    # Bob is not stuck behind alice's backlog
+    assert order[:4].count("bob") == 2
+    assert order[4:] == ["alice"] * 4
+
+
+async def test_weighted_users_get_a_larger_share(jobs_db):
+    queue = JobQueue(jobs_db, weights={"carol": 2})
+    for index in range(6):
+        await queue.submit(idea=f"idea {index}", user="alice")
+        await queue.submit(idea=f"idea {index}", user="carol")
+
+    order = [(await queue.claim("worker"))["user"] for _ in range(6)]
+
+    assert order.count("carol") == 4
+    assert order.count("alice") == 2
+
+
+async def test_interactive_jobs_are_claimed_before_batch_jobs(jobs_db):
+    queue = JobQueue(jobs_db)
+    batch_id = await queue.submit(idea="bulk idea", priority="batch")
+    interactive_id = await queue.submit(idea="urgent idea", priority="interactive")
+
+    # A reserved worker only takes interactive jobs
+    assert (await queue.claim("reserved", ["interactive"]))["id"] == interactive_id
+    assert await queue.claim("reserved", ["interactive"]) is None
+    assert (await queue.claim("worker"))["id"] == batch_id
+
+
+def test_user_weights_must_be_positive(jobs_db):
+    with pytest.raises(ValueError):
+        JobQueue(jobs_db, weights={"alice": 0})
+
+
+async def test_heartbeat_records_worker_throughput_and_process_stats(jobs_db):
+    queue = JobQueue(jobs_db)
+    stats = {"busy": 1, "completed": 3, "failed": 1, "busy_seconds": 12.0, "process_stats": {"search": {"cache": {"hits": 2}}}}
+    await queue.heartbeat("host-1", "host", 1, 2, stats)
+
+    (worker,) = await queue.workers()
+    assert worker["alive"]
+    assert worker["completed"] == 3
+    assert worker["process_stats"] == {"search": {"cache": {"hits": 2}}}
+
+    await queue.heartbeat("host-1", "host", 1, 2, stats, stopped=True)
+    assert not (await queue.workers())[0]["alive"]
@@ -0,0 +1,59 @@
+from tools.local_corpus import LocalCorpus
+
+
+def response(*results):
+    return {"results": [
+        {"url": url, "title": title, "content": content} for url, title, content in results
+    ]}
+
+
+async def test_ingested_results_are_found_ranked_by_bm25(tmp_path):
+    corpus = LocalCorpus(tmp_path / "corpus.sqlite3")
+    await corpus.ingest("meal kits", response(
+        ("https://example.com/kits", "Meal kit market", "Vegan meal kit subscriptions grew 30% as meal kit prices fell."),
+        ("https://example.com/batteries", "Battery recycling", "Lithium recovery plants expand across Europe."),
+        ("https://example.com/grocery", "Grocery delivery", "Grocers now bundle a meal plan with delivery."),
+    ))
+
+    results = await corpus.search("vegan meal kit")
+
+    assert [result["url"] for result in results] == ["https://example.com/kits", "https://example.com/grocery"]
+    assert results[0]["score"] > results[1]["score"]
+    assert corpus.size() == 3
+
+
+async def test_refetched_pages_replace_their_earlier_copy(tmp_path):
+    corpus = LocalCorpus(tmp_path / "corpus.sqlite3")
+    await corpus.ingest("kits", response(("https://example.com/kits", "Old", "Meal kits were a niche.")))
+    await corpus.ingest("kits", response(("https://www.example.com/kits/?utm_source=x", "New", "Meal kits went mainstream.")))
+
+    results = await corpus.search("meal kits")
+
+    assert corpus.size() == 1
+    assert results[0]["title"] == "New"
+    assert await corpus.search("niche") == []
+
+
+async def test_query_syntax_is_not_interpreted(tmp_path):
+    corpus = LocalCorpus(tmp_path / "corpus.sqlite3")
+    await corpus.ingest("kits", response(("https://example.com/kits", "Kits", "Meal kits near me")))
+
+    assert len(await corpus.search('kits" OR title:* NEAR(')) == 1
+    assert await corpus.search("!!!") == []
+
+
+async def test_results_without_url_or_content_are_skipped(tmp_path):
+    corpus = LocalCorpus(tmp_path / "corpus.sqlite3")
+    await corpus.ingest("kits", response(("", "No url", "Meal kits"), ("https://example.com/empty", "Empty", "")))
+    await corpus.ingest("kits", "not a response")
+
+    assert corpus.size() == 0
+
+
+async def test_documents_keep_the_time_their_response_was_fetched(tmp_path):
+    corpus = LocalCorpus(tmp_path / "corpus.sqlite3")
+    cached = response(("https://example.com/kits", "Kits", "Meal kits near me"))
+    cached["fetched_at"] = 1000.0
+    await corpus.ingest("kits", cached)
+
+    assert (await corpus.search("kits"))[0]["fetched_at"] == 1000.0
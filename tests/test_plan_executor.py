@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from agents import Agent, RunConfig, Usage
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from models import ResearchPlan, ResearchTask
+from services.plan_executor import PlanExecutor, failed_tasks, validate_plan
+
+
+class ScriptedModel(Model):
+    """Model that answers each task after a delay, or fails it, and logs when tasks start and end"""
+
+    def __init__(self, log, delays=None, failing=()):
+        self.log = log
+        self.delays = delays or {}
+        self.failing = set(failing)
+
+    async def get_response(self, system_instructions, input, *args, **kwargs):
+        text = input if isinstance(input, str) else " ".join(str(item.get("content")) for item in input)
+        task_id = text.split("Your task:\n", 1)[1].split("\n", 1)[0]
+        self.log.append(("start", task_id))
+        await asyncio.sleep(self.delays.get(task_id, 0.01))
+        self.log.append(("end", task_id))
+        if task_id in self.failing:
+            raise RuntimeError(f"{task_id} exploded")
+        text = f"result of {task_id}"
+        message = ResponseOutputMessage(
+            id="msg", type="message", role="assistant", status="completed",
+            content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+        )
+        return ModelResponse(output=[message], usage=Usage(), response_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def executor(model, max_concurrency=4):
+    agents = {name: Agent(name=name, model=model) for name in ("search_agent", "analysis_agent", "reports_agent")}
+    return PlanExecutor(agents, max_concurrency=max_concurrency, run_config=RunConfig(tracing_disabled=True))
+
+
+def plan(*tasks):
+    return ResearchPlan(tasks=[
+        ResearchTask(id=task_id, agent=agent, description=task_id, depends_on=list(depends_on))
+        for task_id, agent, depends_on in tasks
+    ])
+
+
+DIAMOND = plan(
+    ("market", "search_agent", []),
+    ("competitors", "search_agent", []),
+    ("analysis", "analysis_agent", ["market", "competitors"]),
+    ("report", "reports_agent", ["analysis"]),
+)
+
+
+async def test_tasks_start_once_their_dependencies_finish():
+    log = []
+    model = ScriptedModel(log, delays={"market": 0.05, "competitors": 0.05})
+
+    outputs = await executor(model).run(DIAMOND, "meal kits", context=None)
+
+    assert outputs["report"] == "result of report"
+    # Independent tasks run concurrently
+    assert log[:2] == [("start", "market"), ("start", "competitors")]
+    for task_id, after in (("analysis", "market"), ("analysis", "competitors"), ("report", "analysis")):
+        assert log.index(("end", after)) < log.index(("start", task_id))
+    assert PlanExecutor.final_output(DIAMOND, outputs) == "result of report"
+
+
+async def test_concurrency_is_bounded():
+    log = []
+    wide = plan(*((f"search_{index}", "search_agent", []) for index in range(4)))
+
+    await executor(ScriptedModel(log), max_concurrency=2).run(wide, "meal kits", context=None)
+
+    running = peak = 0
+    for event, _ in log:
+        running += 1 if event == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+
+
+async def test_failed_tasks_are_recorded_and_dependents_still_run():
+    log = []
+    runner = executor(ScriptedModel(log, failing={"competitors"}))
+
+    outputs = await runner.run(DIAMOND, "meal kits", context=None)
+
+    assert outputs["competitors"] == "Task failed: competitors exploded"
+    assert outputs["report"] == "result of report"
+    assert failed_tasks(outputs) == ["competitors"]
+
+
+async def test_finished_tasks_are_not_run_again():
+    log = []
+    kept = {"market": "cached market", "competitors": "cached competitors"}
+
+    outputs = await executor(ScriptedModel(log)).run(DIAMOND, "meal kits", context=None, outputs=kept)
+
+    assert [task_id for event, task_id in log if event == "start"] == ["analysis", "report"]
+    assert outputs["market"] == "cached market"
+
+
+def test_plans_with_cycles_or_unknown_references_are_rejected():
+    agents = {"search_agent": None, "analysis_agent": None, "reports_agent": None}
+    with pytest.raises(ValueError, match="cycle"):
+        validate_plan(plan(("a", "search_agent", ["b"]), ("b", "search_agent", ["a"])), agents)
+    with pytest.raises(ValueError, match="unknown tasks"):
+        validate_plan(plan(("a", "search_agent", ["missing"])), agents)
+    with pytest.raises(ValueError, match="duplicate"):
+        validate_plan(plan(("a", "search_agent", []), ("a", "analysis_agent", [])), agents)
+    with pytest.raises(ValueError, match="no tasks"):
+        validate_plan(ResearchPlan(tasks=[]), agents)
+
+
+def test_final_output_joins_every_sink():
+    parallel = plan(("market", "search_agent", []), ("competitors", "search_agent", []))
+
+    output = PlanExecutor.final_output(parallel, {"market": "m", "competitors": "c"})
+
+    assert output == "## market\n\nm\n\n## competitors\n\nc"
@@ -0,0 +1,132 @@
+import time
+import pytest
+from models.user_models import ResearchPlan, ResearchTask, UserPreference
+from services.report_provenance import (
+    WHOLE_REPORT_SECTION,
+    build_provenance,
+    load_provenance,
+    provenance_path,
+    refresh_stale_searches,
+    save_provenance,
+    sections_to_rerun,
+)
+from utils import SearchLog, results_fingerprint
+
+RESPONSE = {"results": [
+    {"url": "https://example.com/a", "title": "A", "content": "Vegan meal kits grew 12% in 2024.", "score": 0.9},
+    {"url": "https://example.com/b", "title": "B", "content": "Students cook at home.", "score": 0.4},
+]}
+DAY = 24 * 60 * 60
+
+
+def search_log(fetched_at, response=RESPONSE, query="vegan meal kits"):
+    log = SearchLog()
+    params = {"query": query, "search_depth": "basic", "max_results": 2}
+    log.record("key", params, {**response, "fetched_at": fetched_at})
+    return log
+
+
+def plan(*tasks):
+    return ResearchPlan(tasks=[
+        ResearchTask(id=task_id, description=task_id, agent="search_agent", depends_on=list(depends_on))
+        for task_id, depends_on in tasks
+    ])
+
+
+def test_search_log_keeps_the_original_fetch_time():
+    log = SearchLog()
+    log.record("key", {"query": "meal kits"}, {"results": [], "fetched_at": 1000.0})
+    log.record("other", {"query": "dog food"}, {"results": []})
+
+    assert log.searches[0]["fetched_at"] == 1000.0
+    assert log.searches[1]["fetched_at"] > 1000.0
+
+
+def test_results_fingerprint_ignores_ranking_but_not_content():
+    reranked = {"results": [
+        {**RESPONSE["results"][1], "score": 0.8},
+        {**RESPONSE["results"][0], "url": "http://www.example.com/a/", "score": 0.1},
+    ]}
+    edited = {"results": [{**RESPONSE["results"][0], "content": "Vegan meal kits grew 15% in 2024."}, RESPONSE["results"][1]]}
+
+    assert results_fingerprint(reranked) == results_fingerprint(RESPONSE)
+    assert results_fingerprint(edited) != results_fingerprint(RESPONSE)
+    assert results_fingerprint(None) == results_fingerprint({"results": []})
+
+
+async def test_provenance_round_trips_through_its_sidecar(tmp_path):
+    report_path = tmp_path / "research_1.md"
+    provenance = build_provenance(
+        "plan", "Vegan meal kits", UserPreference(name="alice"), None,
+        {WHOLE_REPORT_SECTION: "# Report"}, {WHOLE_REPORT_SECTION: search_log(1000.0)}, {WHOLE_REPORT_SECTION: 1010.0},
+    )
+
+    await save_provenance(report_path, provenance)
+
+    assert provenance_path(report_path) == tmp_path / "research_1.provenance.json"
+    loaded = load_provenance(report_path)
+    section = loaded["sections"][WHOLE_REPORT_SECTION]
+    assert loaded["preferences"]["name"] == "alice"
+    assert section["completed_at"] == 1010.0
+    assert section["searches"][0]["fetched_at"] == 1000.0
+    with pytest.raises(FileNotFoundError):
+        load_provenance(tmp_path / "research_2.md")
+
+
+def test_sections_depending_on_a_changed_section_are_rerun():
+    now = time.time()
+    provenance = build_provenance(
+        "dag", "Vegan meal kits", UserPreference(), plan(("market", []), ("pricing", []), ("analysis", ["market"]), ("report", ["analysis", "pricing"])),
+        {"market": "m", "pricing": "p", "analysis": "a", "report": "r"},
+        {"market": search_log(now), "pricing": search_log(now)},
+        {"market": now, "pricing": now, "analysis": now - 30 * DAY, "report": now},
+    )
+
+    assert sections_to_rerun(provenance, set(), max_age_seconds=DAY) == set()
+    assert sections_to_rerun(provenance, {"market"}, max_age_seconds=DAY) == {"market", "analysis", "report"}
+
+
+def test_old_sections_without_searches_are_rerun():
+    now = time.time()
+    provenance = build_provenance(
+        "plan", "Vegan meal kits", UserPreference(), None,
+        {WHOLE_REPORT_SECTION: "# Report"}, {}, {WHOLE_REPORT_SECTION: now - 2 * DAY},
+    )
+
+    assert sections_to_rerun(provenance, set(), max_age_seconds=3 * DAY) == set()
+    assert sections_to_rerun(provenance, set(), max_age_seconds=DAY) == {WHOLE_REPORT_SECTION}
+
+
+async def test_only_stale_searches_are_rerun_and_changes_detected(monkeypatch):
+    from tools import search_tools
+
+    now = time.time()
+    calls = []
+
+    async def fake_search(query, search_depth, max_results, include_domains=None, use_cache=True):
+        calls.append((query, use_cache))
+        if query == "failing":
+            raise RuntimeError("Tavily is down")
+        if query == "changed":
+            return {"results": [{"url": "https://example.com/new", "title": "New", "content": "Fresh figures."}]}
+        return RESPONSE
+
+    monkeypatch.setattr(search_tools, "cached_search", fake_search)
+    provenance = build_provenance(
+        "dag", "Vegan meal kits", UserPreference(), plan(("same", []), ("changed", []), ("failing", []), ("fresh", [])),
+        {"same": "s", "changed": "c", "failing": "f", "fresh": "r"},
+        {
+            "same": search_log(now - 2 * DAY, query="same"),
+            "changed": search_log(now - 2 * DAY, query="changed"),
+            "failing": search_log(now - 2 * DAY, query="failing"),
+            "fresh": search_log(now, query="fresh"),
+        },
+        {"same": now, "changed": now, "failing": now, "fresh": now},
+    )
+
+    changed, refreshed = await refresh_stale_searches(provenance, max_age_seconds=DAY)
+
+    assert changed == {"changed", "failing"}
+    assert refreshed == 3
+    assert sorted(calls) == [("changed", False), ("failing", False), ("same", False)]
+    assert provenance["sections"]["same"]["searches"][0]["fetched_at"] > now - 1
@@ -0,0 +1,134 @@
+from services.report_store import ReportStore, requirements_hash
+from utils.dedup import minhash, minhash_similarity
+
+
+def metadata(requirements="Vegan meal kits for students", **extra):
+    return {"requirements": requirements, "user": "alice", "mode": "plan", "seconds": 12.5, **extra}
+
+
+async def test_saved_reports_are_written_and_indexed(tmp_path):
+    store = ReportStore(tmp_path)
+    path = store.new_report_path()
+
+    report_id = await store.save(path, "# Report\nThe vegan meal kit market is growing.", metadata(sources=["https://example.com/a"]))
+
+    assert path.read_text(encoding="utf-8").startswith("# Report")
+    assert not path.with_name(path.name + ".partial").exists()
+    report = await store.get(report_id)
+    assert report["path"] == str(path)
+    assert report["user"] == "alice"
+    assert report["sources"] == ["https://example.com/a"]
+
+
+async def test_report_paths_never_collide(tmp_path):
+    store = ReportStore(tmp_path)
+
+    assert len({store.new_report_path() for _ in range(100)}) == 100
+
+
+async def test_reindexing_a_path_keeps_its_id(tmp_path):
+    store = ReportStore(tmp_path)
+    path = store.new_report_path()
+    first = await store.save(path, "first", metadata())
+
+    second = await store.save(path, "second", metadata(mode="refresh"))
+
+    assert first == second
+    assert (await store.get(first))["mode"] == "refresh"
+    assert len(await store.list()) == 1
+
+
+async def test_list_and_full_text_search(tmp_path):
+    store = ReportStore(tmp_path)
+    await store.save(store.new_report_path(), "Lithium recycling plants in Europe.", metadata("Battery recycling", user="bob"))
+    await store.save(store.new_report_path(), "Students want cheap vegan meal kits.", metadata())
+
+    assert [report["user"] for report in await store.list(user="bob")] == ["bob"]
+    assert len(await store.list(limit=1)) == 1
+    assert [report["requirements"] for report in await store.search("vegan kits")] == ["Vegan meal kits for students"]
+    assert await store.search("***") == []
+
+
+async def test_requirements_match_after_normalizing_case_and_whitespace(tmp_path):
+    store = ReportStore(tmp_path)
+    await store.save(store.new_report_path(), "report", metadata("Vegan meal kits\nfor students"))
+
+    matches = await store.find_by_requirements("  vegan MEAL kits for students ")
+
+    assert len(matches) == 1
+    assert requirements_hash("Vegan  meal kits") == requirements_hash("vegan meal kits")
+
+
+async def test_identical_requirements_are_reused(tmp_path):
+    store = ReportStore(tmp_path)
+    path = store.new_report_path()
+    await store.save(path, "report", metadata("Vegan meal kits for students"))
+
+    match = await store.find_similar("vegan   meal kits FOR students", threshold=0.8, max_age_days=7)
+
+    assert match["path"] == str(path)
+    assert match["similarity"] == 1.0
+
+
+async def test_near_identical_requirements_are_reused_above_the_threshold(tmp_path):
+    store = ReportStore(tmp_path)
+    requirements = "Market size, competitors and pricing of vegan meal kit delivery services for university students in Germany"
+    await store.save(store.new_report_path(), "report", metadata(requirements))
+
+    near = await store.find_similar(requirements + " in 2025", threshold=0.6, max_age_days=7)
+    unrelated = await store.find_similar("Lithium battery recycling plants in Europe", threshold=0.6, max_age_days=7)
+
+    assert 0.6 <= near["similarity"] < 1.0
+    assert unrelated is None
+
+
+async def test_reports_older_than_the_max_age_are_not_reused(tmp_path):
+    store = ReportStore(tmp_path)
+    report_id = await store.save(store.new_report_path(), "report", metadata())
+    with store._lock:
+        with store._connect() as conn:
+            conn.execute("UPDATE reports SET created_at = created_at - 3 * 24 * 60 * 60 WHERE id = ?", (report_id,))
+
+    assert await store.find_similar("Vegan meal kits for students", threshold=0.8, max_age_days=2) is None
+    assert await store.find_similar("Vegan meal kits for students", threshold=0.8, max_age_days=4) is not None
+
+
+async def test_reused_incomplete_and_deleted_reports_are_not_reused(tmp_path):
+    store = ReportStore(tmp_path)
+    await store.save(store.new_report_path(), "copy", metadata(mode="reused"))
+    await store.save(store.new_report_path(), "partial", metadata(incomplete=True))
+    deleted = store.new_report_path()
+    await store.save(deleted, "deleted", metadata())
+    deleted.unlink()
+
+    assert await store.find_similar("Vegan meal kits for students", threshold=0.8, max_age_days=7) is None
+
+
+def test_minhash_estimates_jaccard_similarity():
+    text = "vegan meal kit delivery services for university students in germany"
+
+    assert minhash_similarity(minhash(text), minhash(text)) == 1.0
+    assert minhash(text) == minhash(text)
+    assert 0.5 < minhash_similarity(minhash(text), minhash(text + " and austria")) < 1.0
+    assert minhash_similarity(minhash(text), minhash("lithium battery recycling plants in europe")) < 0.2
+    assert minhash_similarity(minhash(text), minhash(text, num_perm=32)) == 0.0
+
+
+async def test_research_service_serves_a_recent_report_instead_of_running(tmp_path, monkeypatch):
+    from models.user_models import UserPreference
+    from services import research_service
+
+    store = ReportStore(tmp_path)
+    monkeypatch.setattr(research_service, "report_store", store)
+    source = store.new_report_path()
+    await store.save(source, "# Vegan meal kits\nStudents want cheap kits.", metadata())
+    service = research_service.ResearchService()
+    target = store.new_report_path()
+
+    body = await service.run_research("Vegan meal kits for students", UserPreference(name="bob", max_urls=3), report_path=target)
+
+    assert body == "Students want cheap kits."
+    assert service.reused_from == str(source)
+    content = target.read_text(encoding="utf-8")
+    assert content.startswith("# Vegan meal kits\n\n> ♻️ **Reused from** report")
+    assert (await store.find_by_requirements("Vegan meal kits for students"))[0]["mode"] == "reused"
@@ -0,0 +1,138 @@
+import time
+import httpx
+import pytest
+from tavily.errors import BadRequestError, InvalidAPIKeyError, TimeoutError as TavilyTimeoutError, UsageLimitExceededError
+from tools.search_tools import is_retryable_search_error
+from utils import AdmissionController, CircuitBreaker, CircuitOpenError, TokenBucket
+
+
+class TransientError(Exception):
+    pass
+
+
+def controller(max_retries=2, failure_threshold=3, reset_seconds=60):
+    return AdmissionController(
+        name="test",
+        rate=0,
+        burst=1,
+        max_retries=max_retries,
+        base_delay=0,
+        max_delay=0,
+        failure_threshold=failure_threshold,
+        reset_seconds=reset_seconds,
+        is_retryable=lambda error: isinstance(error, TransientError),
+    )
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.rejected == 1
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    # One trial call goes through and the circuit holds open for everyone else
+    breaker.check()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_call_opens_the_circuit_again():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.check()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+
+
+async def test_transient_errors_are_retried():
+    admission = controller()
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise TransientError()
+        return "ok"
+
+    assert await admission.call(flaky) == "ok"
+    assert admission.stats() == {"calls": 3, "retries": 2, "rejected": 0, "circuit": "closed"}
+
+
+async def test_non_retryable_errors_fail_at_once_without_tripping_the_breaker():
+    admission = controller(failure_threshold=1)
+
+    async def bad_request():
+        raise ValueError("bad query")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await admission.call(bad_request)
+    assert admission.stats()["calls"] == 3
+    assert admission.stats()["circuit"] == "closed"
+
+
+async def test_open_circuit_rejects_calls_without_reaching_the_backend():
+    admission = controller(max_retries=5, failure_threshold=2)
+    attempts = 0
+
+    async def down():
+        nonlocal attempts
+        attempts += 1
+        raise TransientError()
+
+    with pytest.raises(TransientError):
+        await admission.call(down)
+    # Retrying stopped as soon as the circuit opened
+    assert attempts == 2
+    with pytest.raises(CircuitOpenError):
+        await admission.call(down)
+    assert attempts == 2
+    assert admission.stats()["rejected"] == 1
+
+
+async def test_token_bucket_spaces_calls_beyond_the_burst():
+    bucket = TokenBucket(rate=50, capacity=2)
+    started = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+
+    # Two calls fit the burst, the other two wait 1/50s each
+    assert time.monotonic() - started >= 0.035
+
+
+def http_status_error(status_code):
+    request = httpx.Request("POST", "https://api.tavily.com/search")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status_code, request=request))
+
+
+@pytest.mark.parametrize("error", [
+    UsageLimitExceededError("rate limited"),
+    TavilyTimeoutError(30),
+    httpx.ConnectError("connection refused"),
+    http_status_error(503),
+])
+def test_transient_tavily_errors_are_retryable(error):
+    assert is_retryable_search_error(error)
+
+
+@pytest.mark.parametrize("error", [
+    InvalidAPIKeyError("bad key"),
+    BadRequestError("bad query"),
+    http_status_error(400),
+    ValueError("bug"),
+])
+def test_client_side_tavily_errors_are_not_retryable(error):
+    assert not is_retryable_search_error(error)
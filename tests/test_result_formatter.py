@@ -0,0 +1,65 @@
+from tools.result_formatter import clean_snippet, compact_search_response, is_boilerplate, render_result
+from utils import estimate_tokens, truncate_to_tokens
+
+
+def result(index, words=800):
+    return {
+        "url": f"https://example.com/{index}",
+        "title": f"Report {index}",
+        "content": "The meal kit market grew quickly. " * (words // 6),
+        "score": 0.9 - index / 100,
+    }
+
+
+def test_output_stays_within_the_call_budget():
+    response = {"results": [result(index) for index in range(8)]}
+
+    output = compact_search_response(response, per_result_tokens=100, total_tokens=300)
+
+    body, summary = output.rsplit("\n\n", 1)
+    assert estimate_tokens(body) <= 300
+    assert summary.startswith("[Compacted ")
+    assert "lower-ranked results dropped" in summary
+    # Higher-ranked results are kept first
+    assert "[1] Report 0" in body
+    assert "Report 7" not in body
+
+
+def test_top_result_is_kept_even_with_a_tiny_budget():
+    output = compact_search_response({"results": [result(0)]}, per_result_tokens=250, total_tokens=40)
+
+    assert "[1] Report 0" in output
+    assert estimate_tokens(output.rsplit("\n\n", 1)[0]) <= 60
+
+
+def test_each_snippet_is_truncated_to_its_budget():
+    block = render_result(1, result(0), max_tokens=20)
+
+    snippet = block.splitlines()[-1]
+    assert snippet.endswith("…")
+    assert estimate_tokens(snippet) <= 21
+    assert "Score: 0.90" in block
+
+
+def test_empty_and_unexpected_responses():
+    assert compact_search_response({"results": []}) == "No results found."
+    assert compact_search_response("x" * 1000, total_tokens=10) == truncate_to_tokens("x" * 1000, 10)
+
+
+def test_only_whole_chrome_sentences_are_dropped():
+    content = (
+        "Over 2 million customers subscribe to HelloFresh each quarter. Subscribe to our newsletter. "
+        "Sign up. © 2024 Acme Inc. All rights reserved. Skip to content\n"
+        "We use cookies to improve your experience. Copyright law matters."
+    )
+
+    cleaned = clean_snippet(content)
+
+    assert cleaned == "Over 2 million customers subscribe to HelloFresh each quarter. Copyright law matters."
+    assert not is_boilerplate("Sites that enable JavaScript tracking on every page lose customers who value privacy policy clarity.")
+
+
+def test_markdown_noise_is_stripped():
+    content = "![logo](https://example.com/logo.png) Read the [full report](https://example.com/r) ## on ** kits"
+
+    assert clean_snippet(content) == "Read the full report on kits"
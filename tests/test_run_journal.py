@@ -0,0 +1,43 @@
+import os
+import time
+from utils import RunJournal, prune_run_journals
+
+
+async def test_completed_calls_are_replayed(tmp_path):
+    path = tmp_path / "run.jsonl"
+    journal = RunJournal(path)
+    calls = 0
+
+    async def search():
+        nonlocal calls
+        calls += 1
+        return {"results": []}
+
+    await journal.start({"mode": "plan"})
+    await journal.call("search", "key", search)
+
+    resumed = RunJournal(path)
+    assert resumed.meta == {"mode": "plan"}
+    assert await resumed.call("search", "key", search) == {"results": []}
+    assert calls == 1
+    assert resumed.stats()["replayed"] == 1
+
+
+def test_only_expired_journals_are_pruned(tmp_path):
+    old = tmp_path / "old.jsonl"
+    recent = tmp_path / "recent.jsonl"
+    other = tmp_path / "notes.txt"
+    for path in (old, recent, other):
+        path.write_text("{}\n")
+    week_ago = time.time() - 7 * 24 * 60 * 60
+    os.utime(old, (week_ago, week_ago))
+    os.utime(other, (week_ago, week_ago))
+
+    assert prune_run_journals(tmp_path, ttl_seconds=24 * 60 * 60) == 1
+    assert not old.exists()
+    assert recent.exists()
+    assert other.exists()
+
+
+def test_missing_runs_dir_prunes_nothing(tmp_path):
+    assert prune_run_journals(tmp_path / "missing", ttl_seconds=60) == 0
@@ -0,0 +1,91 @@
+import time
+import pytest
+from services.session_manager import SessionManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = SessionManager(tmp_path / "sessions.sqlite3", pool_size=2, ttl_seconds=3600, max_items=4, compress_min_bytes=64)
+    yield manager
+    manager.close()
+
+
+def message(text):
+    return {"role": "user", "content": text}
+
+
+def call(call_id):
+    return {"type": "function_call", "call_id": call_id, "name": "search_web", "arguments": "{}"}
+
+
+def output(call_id):
+    return {"type": "function_call_output", "call_id": call_id, "output": "results"}
+
+
+async def test_sessions_are_isolated(manager):
+    first = manager.new_session("planner")
+    second = manager.new_session("planner")
+    await first.add_items([message("first")])
+    await second.add_items([message("second")])
+
+    assert first.session_id != second.session_id
+    assert await first.get_items() == [message("first")]
+    assert await second.get_items() == [message("second")]
+
+
+async def test_only_the_latest_items_are_kept(manager):
+    session = manager.new_session("planner")
+    await session.add_items([message(str(index)) for index in range(6)])
+
+    assert await session.get_items() == [message(str(index)) for index in range(2, 6)]
+    assert await session.get_items(limit=2) == [message("4"), message("5")]
+
+
+async def test_trimming_never_keeps_a_tool_output_without_its_call(manager):
+    session = manager.new_session("planner")
+    await session.add_items([message("question"), call("a"), output("a"), message("more"), call("b"), output("b")])
+
+    items = await session.get_items()
+
+    # Keeping the latest four would start at output("a"), whose call was dropped
+    assert items == [message("more"), call("b"), output("b")]
+
+
+async def test_large_items_round_trip_compressed(manager):
+    session = manager.new_session("planner")
+    item = message("market size " * 100)
+    await session.add_items([item])
+
+    assert await session.get_items() == [item]
+    assert await session.pop_item() == item
+    assert await session.get_items() == []
+
+
+async def test_idle_sessions_are_pruned(manager):
+    idle = manager.new_session("planner")
+    active = manager.new_session("planner")
+    await idle.add_items([message("old")])
+    await active.add_items([message("new")])
+    manager.ttl_seconds = 0.05
+    time.sleep(0.1)
+    await active.add_items([message("newer")])
+
+    assert manager.prune() == 1
+    assert await idle.get_items() == []
+    assert await active.get_items() == [message("new"), message("newer")]
+
+
+async def test_stats_report_compression_and_pool_usage(manager):
+    session = manager.new_session("planner")
+    await session.add_items([message("small"), message("market size " * 100)])
+
+    with manager._connection():
+        stats = manager.stats()
+
+    assert stats == {
+        "sessions": 1,
+        "items": 2,
+        "compressed": 1,
+        "pruned": 0,
+        "pool": {"size": 2, "open": 1, "in_use": 1},
+    }
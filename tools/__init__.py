@@ -3,7 +3,9 @@ from .search_tools import (
     search_academic_papers,
     search_market_reports,
     search_competitors,
-    search_financial_data
+    search_financial_data,
+    search_batch,
+    search_local_corpus
 )
 from .utility_tools import get_today_date
 
@@ -13,5 +15,7 @@ __all__ = [
     'search_market_reports', 
     'search_competitors',
     'search_financial_data',
+    'search_batch',
+    'search_local_corpus',
     'get_today_date'
 ]
@@ -0,0 +1,112 @@
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from utils.dedup import normalize_url
+
+
+class LocalCorpus:
+    """SQLite FTS5 index of every search result fetched across research runs, ranked with BM25"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                    url_key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    title, content, content='documents', content_rowid='rowid'
+                )"""
+            )
+            # Keep the full-text index in step with the documents table
+            self._conn.executescript(
+                """
+                CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                    INSERT INTO documents_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                    INSERT INTO documents_fts(documents_fts, rowid, title, content)
+                    VALUES ('delete', old.rowid, old.title, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+                    INSERT INTO documents_fts(documents_fts, rowid, title, content)
+                    VALUES ('delete', old.rowid, old.title, old.content);
+                    INSERT INTO documents_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content);
+                END;
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _ingest_sync(self, query, results, fetched_at):
+        with self._lock:
+            conn = self._connect()
+            for result in results:
+                url = result.get("url") or ""
+                content = result.get("content") or ""
+                if not url or not content:
+                    continue
+                conn.execute(
+                    """INSERT INTO documents (url_key, url, title, content, query, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url_key) DO UPDATE SET
+                        title = excluded.title, content = excluded.content,
+                        query = excluded.query, fetched_at = excluded.fetched_at""",
+                    (normalize_url(url), url, result.get("title") or "", content, query, fetched_at),
+                )
+            conn.commit()
+
+    def _search_sync(self, query, limit):
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        # Quote every term so user text cannot inject FTS5 query syntax
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            rows = self._connect().execute(
+                """SELECT d.url, d.title, d.content, d.fetched_at, bm25(documents_fts) AS rank
+                FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+                ORDER BY rank LIMIT ?""",
+                (match, limit),
+            ).fetchall()
+        return [
+            {"url": url, "title": title, "content": content, "fetched_at": fetched_at, "score": -rank}
+            for url, title, content, fetched_at, rank in rows
+        ]
+
+    def _size_sync(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    async def ingest(self, query, response):
+        """Add the results of a Tavily response to the corpus, stamped with the time they were fetched"""
+        results = response.get("results") if isinstance(response, dict) else None
+        if results:
+            fetched_at = response.get("fetched_at") or time.time()
+            await asyncio.to_thread(self._ingest_sync, query, results, fetched_at)
+
+    async def search(self, query, limit=5):
+        """Return the best BM25 matches for query, each with its fetch time"""
+        return await asyncio.to_thread(self._search_sync, query, limit)
+
+    def size(self):
+        """Return the number of indexed documents"""
+        return self._size_sync()
@@ -0,0 +1,116 @@
+import re
+from config import SEARCH_RESULT_MAX_TOKENS, SEARCH_CALL_MAX_TOKENS
+from utils.text import estimate_tokens, truncate_to_tokens, normalize_whitespace
+
+# Whole sentences that are page chrome rather than content; facts that merely mention
+# cookies, subscriptions or sign-ups are kept
+BOILERPLATE_PATTERN = re.compile(
+    r"^\W*(?:"
+    r"(?:accept|allow|manage) (?:all )?cookies|(?:we|this (?:web)?site) uses? cookies\b.*|cookie (?:settings|preferences)|"
+    r"privacy policy|terms of (?:use|service)|©.*|all rights reserved|"
+    r"subscribe(?: now| today| to (?:our|the) newsletter)?|sign (?:in|up)(?: now| for (?:our|the) newsletter)?|"
+    r"log ?(?:in|out)|newsletter|skip to (?:main )?content|(?:please )?enable javascript\b.*|"
+    r"advertisement|share this(?: article| post| page)?|read more|continue reading"
+    r")\W*$",
+    re.IGNORECASE,
+)
+# Chrome sentences are short; longer sentences are always kept
+BOILERPLATE_MAX_WORDS = 15
+# Snippet budget of a result returned earlier in the run, enough to recall what the page said
+SEEN_STUB_TOKENS = 40
+MARKDOWN_NOISE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)|\[([^\]]*)\]\([^)]*\)|[#*_`>|]{2,}")
+
+
+def is_boilerplate(sentence):
+    """Return True for a short sentence that is page chrome as a whole, such as "Sign up" """
+    return len(sentence.split()) <= BOILERPLATE_MAX_WORDS and BOILERPLATE_PATTERN.match(sentence.strip()) is not None
+
+
+def clean_snippet(content):
+    """Strip markdown noise and boilerplate sentences from a result snippet"""
+    content = MARKDOWN_NOISE_PATTERN.sub(lambda match: match.group(1) or " ", content or "")
+    sentences = re.split(r"(?<=[.!?])\s+|\n+", content)
+    kept = [sentence for sentence in sentences if sentence.strip() and not is_boilerplate(sentence)]
+    return normalize_whitespace(" ".join(kept))
+
+
+def render_result(index, result, max_tokens):
+    """Render one Tavily result as title, url, score and a budgeted snippet"""
+    title = normalize_whitespace(result.get("title")) or "Untitled"
+    lines = [f"[{index}] {title}", f"URL: {result.get('url', '')}"]
+    if result.get("score") is not None:
+        lines.append(f"Score: {result['score']:.2f}")
+    snippet = truncate_to_tokens(clean_snippet(result.get("content")), max_tokens)
+    if snippet:
+        lines.append(snippet)
+    return "\n".join(lines)
+
+
+def render_seen_stub(ref, result):
+    """Render a result returned earlier in the run as its reference, title and opening line
+
+    The registry is shared by every agent conversation of a run, so the conversation
+    seeing the stub may never have received the page; the opening line keeps it useful.
+    """
+    title = normalize_whitespace(result.get("title")) or "Untitled"
+    opening = re.split(r"(?<=[.!?])\s+", clean_snippet(result.get("content")), maxsplit=1)[0]
+    stub = f"already seen: [ref {ref}] {title}"
+    opening = truncate_to_tokens(opening, SEEN_STUB_TOKENS)
+    return f"{stub}: {opening}" if opening else stub
+
+
+def compact_search_response(
+    response,
+    per_result_tokens=SEARCH_RESULT_MAX_TOKENS,
+    total_tokens=SEARCH_CALL_MAX_TOKENS,
+    dedup=None,
+):
+    """Render a Tavily response within a token budget and report how much was trimmed
+
+    When a DedupRegistry is given, results are numbered by their run-wide reference and
+    pages already returned earlier in the run are replaced by a stub with their title and
+    opening line.
+    """
+    if not isinstance(response, dict):
+        return truncate_to_tokens(str(response), total_tokens)
+
+    results = response.get("results") or []
+    if not results:
+        return "No results found."
+
+    original_tokens = estimate_tokens(str(response))
+    # The top result is always kept, so it must fit the call's budget on its own
+    per_result_tokens = min(per_result_tokens, total_tokens)
+    rendered = []
+    used_tokens = 0
+    dropped = 0
+    repeated = 0
+    for index, result in enumerate(results, start=1):
+        if dedup is not None:
+            ref = dedup.lookup(result.get("url"), result.get("content"))
+            if ref is not None:
+                dedup.register(result.get("url"), result.get("content"))
+                repeated += 1
+                stub = render_seen_stub(ref, result)
+                rendered.append(stub)
+                used_tokens += estimate_tokens(stub)
+                continue
+            index = dedup.next_ref
+        block = render_result(index, result, per_result_tokens)
+        block_tokens = estimate_tokens(block)
+        if rendered and used_tokens + block_tokens > total_tokens:
+            dropped += 1
+            continue
+        if dedup is not None:
+            # Only results the model actually receives count as seen
+            dedup.register(result.get("url"), result.get("content"))
+        rendered.append(block)
+        used_tokens += block_tokens
+
+    summary = f"[Compacted {original_tokens} -> {used_tokens} tokens"
+    if dropped:
+        summary += f", {dropped} lower-ranked results dropped"
+    if repeated:
+        summary += f", {repeated} already seen"
+    summary += "]"
+    return "\n\n".join(rendered + [summary])
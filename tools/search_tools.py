@@ -1,121 +1,369 @@
+import asyncio
+import functools
+import os
+import re
+import time
+import httpx
 from agents import function_tool, RunContextWrapper
-from tavily import AsyncTavilyClient
-from config import TAVILY_API_KEY, DEFAULT_SEARCH_DEPTH
-from models import UserPreference
+from config import (
+    TAVILY_API_KEY,
+    DEFAULT_SEARCH_DEPTH,
+    CACHE_DIR,
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CACHE_TTL_SECONDS,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_BATCH_CONCURRENCY,
+    SEARCH_BATCH_MAX_QUERIES,
+    SEARCH_CALL_MAX_TOKENS,
+    TAVILY_RATE_LIMIT_RPS,
+    TAVILY_RATE_LIMIT_BURST,
+    TAVILY_MAX_RETRIES,
+    TAVILY_RETRY_BASE_DELAY,
+    TAVILY_RETRY_MAX_DELAY,
+    TAVILY_BREAKER_FAILURE_THRESHOLD,
+    TAVILY_BREAKER_RESET_SECONDS,
+    USER_MAX_SEARCH_CALLS,
+    CASSETTE_MODE,
+    LOCAL_CORPUS_ENABLED,
+    LOCAL_CORPUS_MAX_RESULTS,
+    LOCAL_CORPUS_FRESH_DAYS,
+)
+from models import ResearchContext, SearchQuery
+from utils import DiskCache, SingleFlight, AdmissionController, UserLimiter, current_run_journal, current_search_log
+from utils.cassette import get_cassette, RecordingTavilyClient
+from .result_formatter import compact_search_response
+from .local_corpus import LocalCorpus
 
-# Initialize Tavily client
-tavily_client = AsyncTavilyClient(api_key=TAVILY_API_KEY)
+@functools.cache
+def get_tavily_client():
+    """Build the Tavily client on first search, recorded or replayed when a cassette is active"""
+    from tavily import AsyncTavilyClient
 
-@function_tool
-async def search_web(
-    wrapper: RunContextWrapper[UserPreference] = None, 
-    query: str = None, 
-    search_depth: str = DEFAULT_SEARCH_DEPTH
-) -> str:
-    """
-    Search the web for current information about a topic.
-    
-    Args:
-        query: The search query
-        search_depth: "basic" or "advanced"
-        wrapper: The wrapper object containing user preferences
+    client = AsyncTavilyClient(api_key=TAVILY_API_KEY or ("replay" if CASSETTE_MODE == "replay" else None))
+    if CASSETTE_MODE != "off":
+        client = RecordingTavilyClient(client, get_cassette())
+    return client
+
+# Persistent cache of Tavily responses shared across research runs
+search_cache = DiskCache(
+    path=os.path.join(CACHE_DIR, "search_cache.sqlite3"),
+    ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+    enabled=SEARCH_CACHE_ENABLED,
+)
+
+# Every remote result is kept in a local full-text corpus for later runs
+local_corpus = LocalCorpus(os.path.join(CACHE_DIR, "corpus.sqlite3")) if LOCAL_CORPUS_ENABLED else None
+
+# Identical searches issued concurrently share one Tavily request
+search_flights = SingleFlight()
+
+def is_retryable_search_error(error):
+    """Return True for rate limiting, timeouts and server-side Tavily failures"""
+    from tavily.errors import UsageLimitExceededError, TimeoutError as TavilyTimeoutError
+
+    if isinstance(error, (UsageLimitExceededError, TavilyTimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return False
+
+# Shared rate limiting, retries and circuit breaking for every Tavily request
+tavily_admission = AdmissionController(
+    name="Tavily search",
+    rate=TAVILY_RATE_LIMIT_RPS,
+    burst=TAVILY_RATE_LIMIT_BURST,
+    max_retries=TAVILY_MAX_RETRIES,
+    base_delay=TAVILY_RETRY_BASE_DELAY,
+    max_delay=TAVILY_RETRY_MAX_DELAY,
+    failure_threshold=TAVILY_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=TAVILY_BREAKER_RESET_SECONDS,
+    is_retryable=is_retryable_search_error,
+)
+
+# Tavily requests each user may have in flight, so one user's fan-out cannot take the whole rate limit
+tavily_user_limits = UserLimiter("Tavily search", USER_MAX_SEARCH_CALLS)
+
+def normalize_query(query):
+    """Normalize a search query so trivially different spellings share a cache entry"""
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+def search_cache_key(query, search_depth, max_results, include_domains=None):
+    """Build the cache key for a Tavily search"""
+    return DiskCache.make_key(
+        normalize_query(query),
+        search_depth,
+        sorted(include_domains or []),
+        max_results,
+    )
+
+async def cached_search(query, search_depth, max_results, include_domains=None, use_cache=True):
+    """Run a Tavily search, serving repeated lookups from the search cache"""
+    key = search_cache_key(query, search_depth, max_results, include_domains)
+    search_kwargs = {
+        "query": query,
+        "search_depth": search_depth,
+        "max_results": max_results,
+    }
+    if include_domains:
+        search_kwargs["include_domains"] = include_domains
+
+    journal = current_run_journal()
+    if journal is not None:
+        # A resumed run gets back exactly what the interrupted run saw
+        response = await journal.call("tavily.search", key, lambda: _cached_search(key, search_kwargs, use_cache))
+    else:
+        response = await _cached_search(key, search_kwargs, use_cache)
+
+    # Provenance of the report section this search feeds
+    search_log = current_search_log()
+    if search_log is not None:
+        search_log.record(key, search_kwargs, response)
+    return response
+
+async def _cached_search(key, search_kwargs, use_cache):
+    query = search_kwargs["query"]
+    if use_cache:
+        entry = await search_cache.get_entry(key)
+        if entry is not None:
+            cached, stored_at = entry
+            print(f"Search cache hit for: {query}")
+            # Entries cached before responses carried their fetch time were fetched when stored
+            cached.setdefault("fetched_at", stored_at)
+            return cached
+
+    async def fetch():
+        async with tavily_user_limits.slot():
+            response = await tavily_admission.call(lambda: get_tavily_client().search(**search_kwargs))
+        # Travels with the response through the cache and the run journal, for provenance
+        response["fetched_at"] = time.time()
+        await search_cache.set(key, response)
+        if local_corpus is not None:
+            try:
+                await local_corpus.ingest(query, response)
+            except Exception as e:
+                print(f"Local corpus ingest failed: {e}")
+        return response
+
+    return await search_flights.do(key, fetch)
+
+def search_stats():
+    """Return the process-wide counters of the Tavily searches
+
+    cache holds search cache hits and misses, coalesced the searches that shared an
+    identical one in flight, and tavily the calls, retries and circuit breaker state.
     """
+    return {
+        "cache": search_cache.stats(),
+        "coalesced": search_flights.stats(),
+        "tavily": tavily_admission.stats(),
+    }
+
+async def _search_web(context, query, search_depth=DEFAULT_SEARCH_DEPTH, max_tokens=SEARCH_CALL_MAX_TOKENS):
     try:
         print(f"Searching the web for: {query}")
-        response = await tavily_client.search(
+        response = await cached_search(
             query=query,
             search_depth=search_depth,
             include_domains=["*.edu", "*.gov", "*.org", "*.com"],
-            max_results=wrapper.context.max_urls
+            max_results=context.preferences.max_urls
         )
-        return f"Search results for '{query}':\n{response}"
+        return f"Search results for '{query}':\n{compact_search_response(response, total_tokens=max_tokens, dedup=context.dedup)}"
     except Exception as e:
         return f"Search failed: {str(e)}"
 
-@function_tool
-async def search_academic_papers(
-    wrapper: RunContextWrapper[UserPreference] = None, 
-    topic: str = None
-) -> str:
-    """
-    Search for academic papers and research about a topic.
-    """
+async def _search_academic_papers(context, topic, max_tokens=SEARCH_CALL_MAX_TOKENS):
     try:
         print(f"Searching for academic papers about: {topic}")
-        response = await tavily_client.search(
+        response = await cached_search(
             query=f"academic research papers {topic}",
             search_depth="advanced",
             include_domains=["*.edu", "arxiv.org", "researchgate.net", "scholar.google.com"],
-            max_results=wrapper.context.max_urls
+            max_results=context.preferences.max_urls
         )
-        return f"Academic research results for '{topic}':\n{response}"
+        return f"Academic research results for '{topic}':\n{compact_search_response(response, total_tokens=max_tokens, dedup=context.dedup)}"
     except Exception as e:
         return f"Academic search failed: {str(e)}"
 
-@function_tool
-async def search_market_reports(
-    wrapper: RunContextWrapper[UserPreference] = None, 
-    industry: str = None
-) -> str:
-    """
-    Search for market reports and industry analysis.
-    """
+async def _search_market_reports(context, industry, max_tokens=SEARCH_CALL_MAX_TOKENS):
     try:
         print(f"Searching for market reports about: {industry}")
-        response = await tavily_client.search(
+        response = await cached_search(
             query=f"market report industry analysis {industry} 2024 2025",
             search_depth="advanced",
             include_domains=["*.com", "*.org", "statista.com", "ibisworld.com", "mckinsey.com"],
-            max_results=wrapper.context.max_urls
+            max_results=context.preferences.max_urls
         )
-        return f"Market report results for '{industry}':\n{response}"
+        return f"Market report results for '{industry}':\n{compact_search_response(response, total_tokens=max_tokens, dedup=context.dedup)}"
     except Exception as e:
         return f"Market report search failed: {str(e)}"
 
-@function_tool
-async def search_competitors(
-    wrapper: RunContextWrapper[UserPreference] = None, 
-    product_name: str = None, 
-    industry: str = None
-) -> str:
-    """
-    Search for competitors and similar products in the market.
-    """
+async def _search_competitors(context, product_name, industry, max_tokens=SEARCH_CALL_MAX_TOKENS):
     try:
         print(f"Searching for competitors about: {product_name}")
-        response = await tavily_client.search(
+        response = await cached_search(
             query=f"competitors similar products {product_name} {industry}",
             search_depth=DEFAULT_SEARCH_DEPTH,
-            max_results=wrapper.context.max_urls
+            max_results=context.preferences.max_urls
         )
-        return f"Competitor analysis results for '{product_name}':\n{response}"
+        return f"Competitor analysis results for '{product_name}':\n{compact_search_response(response, total_tokens=max_tokens, dedup=context.dedup)}"
     except Exception as e:
         return f"Competitor search failed: {str(e)}"
 
-@function_tool
-async def search_financial_data(
-    wrapper: RunContextWrapper[UserPreference] = None, 
-    company_name: str = None, 
-    industry: str = None
-) -> str:
-    """
-    Search for financial data, funding information, and investment trends.
-    """
+async def _search_financial_data(context, company_name, industry, max_tokens=SEARCH_CALL_MAX_TOKENS):
     query = ""
     if company_name:
         query += f"{company_name} "
     if industry:
         query += f"{industry} "
     query += "funding investment financial data revenue"
-    
+
     try:
         print(f"Searching for financial data about: {company_name} {industry}")
-        response = await tavily_client.search(
+        response = await cached_search(
             query=query,
             search_depth=DEFAULT_SEARCH_DEPTH,
             include_domains=["*.com", "crunchbase.com", "pitchbook.com", "*.gov"],
-            max_results=wrapper.context.max_urls
+            max_results=context.preferences.max_urls
         )
-        return f"Financial data results: {response}"
+        return f"Financial data results:\n{compact_search_response(response, total_tokens=max_tokens, dedup=context.dedup)}"
     except Exception as e:
         return f"Financial search failed: {str(e)}"
+
+@function_tool
+async def search_web(
+    wrapper: RunContextWrapper[ResearchContext] = None, 
+    query: str = None, 
+    search_depth: str = DEFAULT_SEARCH_DEPTH
+) -> str:
+    """
+    Search the web for current information about a topic.
+    
+    Args:
+        query: The search query
+        search_depth: "basic" or "advanced"
+        wrapper: The wrapper object containing the research run context
+    """
+    return await _search_web(wrapper.context, query, search_depth)
+
+@function_tool
+async def search_academic_papers(
+    wrapper: RunContextWrapper[ResearchContext] = None, 
+    topic: str = None
+) -> str:
+    """
+    Search for academic papers and research about a topic.
+    """
+    return await _search_academic_papers(wrapper.context, topic)
+
+@function_tool
+async def search_market_reports(
+    wrapper: RunContextWrapper[ResearchContext] = None, 
+    industry: str = None
+) -> str:
+    """
+    Search for market reports and industry analysis.
+    """
+    return await _search_market_reports(wrapper.context, industry)
+
+@function_tool
+async def search_competitors(
+    wrapper: RunContextWrapper[ResearchContext] = None, 
+    product_name: str = None, 
+    industry: str = None
+) -> str:
+    """
+    Search for competitors and similar products in the market.
+    """
+    return await _search_competitors(wrapper.context, product_name, industry)
+
+@function_tool
+async def search_financial_data(
+    wrapper: RunContextWrapper[ResearchContext] = None, 
+    company_name: str = None, 
+    industry: str = None
+) -> str:
+    """
+    Search for financial data, funding information, and investment trends.
+    """
+    return await _search_financial_data(wrapper.context, company_name, industry)
+
+def _format_age(seconds):
+    days = int(seconds // 86400)
+    if days:
+        return f"{days} days ago"
+    return f"{int(seconds // 3600)} hours ago"
+
+@function_tool
+async def search_local_corpus(
+    wrapper: RunContextWrapper[ResearchContext] = None,
+    query: str = None
+) -> str:
+    """
+    Search the local corpus of results gathered by earlier research runs. It answers instantly,
+    so try it before the remote search tools and only search remotely when results are missing or stale.
+
+    Args:
+        query: The search query
+    """
+    if local_corpus is None:
+        return "Local corpus is disabled; use the remote search tools."
+    try:
+        print(f"Searching the local corpus for: {query}")
+        results = await local_corpus.search(query, limit=LOCAL_CORPUS_MAX_RESULTS)
+    except Exception as e:
+        return f"Local corpus search failed: {str(e)}"
+    if not results:
+        return f"No local corpus results for '{query}'. Use the remote search tools."
+
+    ages = [time.time() - result["fetched_at"] for result in results]
+    freshness = f"newest fetched {_format_age(min(ages))}, oldest {_format_age(max(ages))}"
+    if min(ages) > LOCAL_CORPUS_FRESH_DAYS * 86400:
+        freshness += f"; all results are older than {LOCAL_CORPUS_FRESH_DAYS} days, search remotely for current data"
+    compacted = compact_search_response({"results": results}, dedup=wrapper.context.dedup)
+    return f"Local corpus results for '{query}' ({freshness}):\n{compacted}"
+
+async def _run_search_query(context, search_query, max_tokens):
+    """Dispatch one typed sub-query of a batch to the matching search"""
+    if search_query.kind == "web":
+        return await _search_web(context, search_query.query, max_tokens=max_tokens)
+    if search_query.kind == "academic":
+        return await _search_academic_papers(context, search_query.query, max_tokens=max_tokens)
+    if search_query.kind == "market":
+        return await _search_market_reports(context, search_query.query, max_tokens=max_tokens)
+    if search_query.kind == "competitor":
+        return await _search_competitors(context, search_query.query, search_query.industry, max_tokens=max_tokens)
+    return await _search_financial_data(context, search_query.query, search_query.industry, max_tokens=max_tokens)
+
+@function_tool
+async def search_batch(
+    wrapper: RunContextWrapper[ResearchContext] = None,
+    queries: list[SearchQuery] = None
+) -> str:
+    """
+    Run several web, academic, market, competitor and financial searches concurrently in one call.
+    Prefer this over calling the single search tools one at a time.
+
+    Args:
+        queries: The sub-queries to run, each with its kind, query text and optional industry
+    """
+    queries = (queries or [])[:SEARCH_BATCH_MAX_QUERIES]
+    if not queries:
+        return "Batch search failed: no queries given"
+
+    print(f"Running batch search with {len(queries)} queries")
+    semaphore = asyncio.Semaphore(SEARCH_BATCH_CONCURRENCY)
+
+    # The whole batch shares one call's budget, split evenly across its sub-queries
+    max_tokens = SEARCH_CALL_MAX_TOKENS // len(queries)
+
+    async def run(search_query):
+        async with semaphore:
+            return await _run_search_query(wrapper.context, search_query, max_tokens)
+
+    results = await asyncio.gather(*(run(search_query) for search_query in queries))
+    sections = [
+        f"## [{index}] {search_query.kind}: {search_query.query}\n{result}"
+        for index, (search_query, result) in enumerate(zip(queries, results), start=1)
+    ]
+    return "\n\n".join(sections)
@@ -1,6 +1,41 @@
-from .model_factory import get_model, get_model_lite
+from .model_factory import get_model, get_model_lite, get_openai_client, close_clients, llm_cache_stats, hedging_stats, llm_user_limit_stats
+from .hedging import start_hedge_budget
+from .run_journal import RunJournal, start_run_journal, current_run_journal, new_run_id, prune_run_journals, maybe_prune_run_journals
+from .provenance import SearchLog, start_search_log, current_search_log, results_fingerprint
+from .disk_cache import DiskCache
+from .concurrency import SingleFlight
+from .text import estimate_tokens, truncate_to_tokens
+from .resilience import AdmissionController, CircuitBreaker, CircuitOpenError, TokenBucket
+from .fair_share import UserLimiter, set_current_user, current_user
 
 __all__ = [
     'get_model',
-    'get_model_lite'
+    'get_model_lite',
+    'get_openai_client',
+    'close_clients',
+    'llm_cache_stats',
+    'hedging_stats',
+    'llm_user_limit_stats',
+    'start_hedge_budget',
+    'RunJournal',
+    'start_run_journal',
+    'current_run_journal',
+    'new_run_id',
+    'prune_run_journals',
+    'maybe_prune_run_journals',
+    'SearchLog',
+    'start_search_log',
+    'current_search_log',
+    'results_fingerprint',
+    'DiskCache',
+    'SingleFlight',
+    'AdmissionController',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'TokenBucket',
+    'UserLimiter',
+    'set_current_user',
+    'current_user',
+    'estimate_tokens',
+    'truncate_to_tokens'
 ]
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from agents.models.interface import Model
+from config import CASSETTE_MODE, CASSETTE_PATH, CASSETTE_REPLAY_LATENCY, CASSETTE_ORDERED_FALLBACK
+from .disk_cache import DiskCache
+from .model_requests import fingerprint_model_request, dump_model_response, load_model_response
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when the cassette has no recording for a request"""
+
+
+class Cassette:
+    """Append-only JSONL recording of request/response pairs that can be replayed offline
+
+    Replay serves each request only its own recording and raises CassetteMissError when
+    there is none. With ordered_fallback, a request without one gets the next unused
+    recording of its kind instead, which tolerates prompts that changed since recording.
+    """
+
+    def __init__(self, path, mode="off", replay_latency="original", ordered_fallback=False):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {CASSETTE_MODES}")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.ordered_fallback = ordered_fallback
+        self.recorded = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._by_key = defaultdict(deque)
+        self._by_kind = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                entry["used"] = False
+                self._by_key[(entry["kind"], entry["key"])].append(entry)
+                self._by_kind[entry["kind"]].append(entry)
+
+    def _append(self, entry):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+                f.flush()
+
+    def _next_recording(self, kind, key):
+        """Take the recording for key, or with ordered_fallback the next unused one of the same kind"""
+        queues = [self._by_key[(kind, key)]]
+        if self.ordered_fallback:
+            queues.append(self._by_kind[kind])
+        for queue in queues:
+            while queue:
+                entry = queue.popleft()
+                if not entry["used"]:
+                    entry["used"] = True
+                    if entry["key"] != key:
+                        print(f"⚠️ Cassette: no exact recording for {kind}, replaying the next one in order")
+                    return entry
+        raise CassetteMissError(f"No recording left for {kind} ({key[:12]})")
+
+    async def call(self, kind, key, fn, encode=None, decode=None):
+        """Record, replay or pass through one call depending on the cassette mode"""
+        if self.mode == "replay":
+            entry = self._next_recording(kind, key)
+            if self.replay_latency == "original":
+                await asyncio.sleep(entry.get("latency", 0))
+            self.replayed += 1
+            return decode(entry["response"]) if decode else entry["response"]
+
+        if self.mode == "off":
+            return await fn()
+
+        started = time.perf_counter()
+        result = await fn()
+        entry = {
+            "kind": kind,
+            "key": key,
+            "latency": time.perf_counter() - started,
+            "response": encode(result) if encode else result,
+        }
+        await asyncio.to_thread(self._append, entry)
+        self.recorded += 1
+        return result
+
+    def stats(self):
+        """Return the number of recorded and replayed calls"""
+        return {"mode": self.mode, "recorded": self.recorded, "replayed": self.replayed}
+
+
+_cassette = None
+
+
+def get_cassette():
+    """Return the process-wide cassette configured in settings"""
+    global _cassette
+    if _cassette is None:
+        _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_REPLAY_LATENCY, CASSETTE_ORDERED_FALLBACK)
+    return _cassette
+
+
+class RecordingTavilyClient:
+    """Tavily client wrapper that records or replays search calls through a cassette"""
+
+    def __init__(self, client, cassette):
+        self._client = client
+        self.cassette = cassette
+
+    async def search(self, **kwargs):
+        key = DiskCache.make_key(kwargs)
+        return await self.cassette.call("tavily.search", key, lambda: self._client.search(**kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class RecordingModel(Model):
+    """Model wrapper that records or replays get_response() calls through a cassette
+
+    Streamed responses are passed through to the wrapped model and are not recorded.
+    """
+
+    def __init__(self, model, cassette, model_name):
+        self._model = model
+        self.cassette = cassette
+        self.model_name = model_name
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *args,
+        **kwargs,
+    ):
+        key = fingerprint_model_request(
+            self.model_name, system_instructions, input, model_settings, tools, output_schema, handoffs
+        )
+        return await self.cassette.call(
+            f"llm:{self.model_name}",
+            key,
+            lambda: self._model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                *args, **kwargs,
+            ),
+            encode=dump_model_response,
+            decode=load_model_response,
+        )
+
+    def stream_response(self, *args, **kwargs):
+        return self._model.stream_response(*args, **kwargs)
@@ -0,0 +1,133 @@
+import hashlib
+import random
+import re
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAM_PREFIXES = ("utm_", "mc_")
+TRACKING_PARAMS = {"ref", "fbclid", "gclid", "msclkid"}
+
+
+def normalize_url(url):
+    """Normalize a URL so scheme, www, tracking parameters and fragments do not matter"""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.lower().startswith(TRACKING_PARAM_PREFIXES) and key.lower() not in TRACKING_PARAMS
+    ))
+    path = parts.path.rstrip("/")
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+def shingles(text, size=3):
+    """Return the set of word n-grams of text"""
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text):
+    """64-bit SimHash fingerprint of text built from word shingles"""
+    weights = [0] * 64
+    for shingle in shingles(text):
+        value = _hash64(shingle)
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed universal hash functions, so signatures stay comparable across processes
+_MINHASH_PERMUTATIONS = [
+    (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+    for rng in [random.Random(1998)] for _ in range(128)
+]
+
+
+def minhash(text, num_perm=64, shingle_size=2):
+    """MinHash signature of the word shingles of text, for estimating Jaccard similarity"""
+    hashes = [_hash64(shingle) for shingle in shingles(text, shingle_size)]
+    if not hashes:
+        return [_MERSENNE_PRIME] * num_perm
+    return [min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in _MINHASH_PERMUTATIONS[:num_perm]]
+
+
+def minhash_similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two MinHash signatures"""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class DedupRegistry:
+    """Per-run registry of seen URLs and content fingerprints, handing out stable reference numbers"""
+
+    def __init__(self, max_distance=6, min_words=20):
+        self.max_distance = max_distance
+        self.min_words = min_words
+        # Normalized URLs are only for matching; the first URL seen for each reference is kept as the link
+        self._refs_by_url = {}
+        self._urls_by_ref = {}
+        self._fingerprints = []
+        self._next_ref = 1
+        self.duplicates = 0
+
+    def lookup(self, url, content):
+        """Return the reference of an earlier result for the same page, or None, without registering it"""
+        key = normalize_url(url)
+        if key and key in self._refs_by_url:
+            return self._refs_by_url[key]
+        if len(re.findall(r"\w+", content or "")) >= self.min_words:
+            fingerprint = simhash(content)
+            for ref, other in self._fingerprints:
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    # Syndicated copy of a page we already returned
+                    return ref
+        return None
+
+    @property
+    def next_ref(self):
+        """Reference the next new result will get"""
+        return self._next_ref
+
+    def register(self, url, content):
+        """Return (ref, seen_before) for a search result, recording it as seen"""
+        key = normalize_url(url)
+        ref = self.lookup(url, content)
+        if ref is not None:
+            if key:
+                self._refs_by_url[key] = ref
+            self.duplicates += 1
+            return ref, True
+
+        ref = self._next_ref
+        self._next_ref += 1
+        if key:
+            self._refs_by_url[key] = ref
+            self._urls_by_ref[ref] = url.strip()
+        if len(re.findall(r"\w+", content or "")) >= self.min_words:
+            self._fingerprints.append((ref, simhash(content)))
+        return ref, False
+
+    def stats(self):
+        """Return the number of unique sources and suppressed duplicates"""
+        return {
+            "sources": self._next_ref - 1,
+            "duplicates": self.duplicates,
+        }
+
+    def urls(self):
+        """Return the URL of every source, as first returned by a search, in reference order"""
+        return [self._urls_by_ref[ref] for ref in sorted(self._urls_by_ref)]
@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
+from agents.models.interface import Model
+
+_current_user = contextvars.ContextVar("current_user", default=None)
+
+
+def set_current_user(name):
+    """Attribute the model and search calls of the current run, and the tasks it starts, to a user"""
+    _current_user.set(name)
+
+
+def current_user():
+    return _current_user.get()
+
+
+class UserLimiter:
+    """Caps the calls of one kind that each user may have in flight in this process
+
+    Calls made outside a run attributed with set_current_user() are not limited, and
+    a limit of 0 or less turns the cap off.
+    """
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+        self.waits = 0
+        self._semaphores = {}
+
+    @asynccontextmanager
+    async def slot(self):
+        user = _current_user.get()
+        if user is None or self.limit <= 0:
+            yield
+            return
+        semaphore = self._semaphores.get(user)
+        if semaphore is None:
+            semaphore = self._semaphores[user] = asyncio.Semaphore(self.limit)
+        if semaphore.locked():
+            self.waits += 1
+        async with semaphore:
+            yield
+
+    def stats(self):
+        """Return the cap, how often a call had to wait for it and the calls in flight per user"""
+        return {
+            "limit": self.limit,
+            "waits": self.waits,
+            "in_flight": {
+                user: self.limit - semaphore._value
+                for user, semaphore in self._semaphores.items()
+                if semaphore._value < self.limit
+            },
+        }
+
+
+class UserLimitedModel(Model):
+    """Model wrapper holding a per-user slot of a UserLimiter for the duration of each call"""
+
+    def __init__(self, model, limiter):
+        self._model = model
+        self.limiter = limiter
+
+    async def get_response(self, *args, **kwargs):
+        async with self.limiter.slot():
+            return await self._model.get_response(*args, **kwargs)
+
+    async def stream_response(self, *args, **kwargs):
+        async with self.limiter.slot():
+            async for event in self._model.stream_response(*args, **kwargs):
+                yield event
@@ -0,0 +1,124 @@
+import asyncio
+import contextvars
+import time
+from collections import defaultdict, deque
+from agents.models.interface import Model
+
+
+class LatencyTracker:
+    """Rolling window of observed call latencies per model"""
+
+    def __init__(self, window):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, model_name, seconds):
+        self._samples[model_name].append(seconds)
+
+    def percentile(self, model_name, percentile, min_samples):
+        """Return the latency percentile for model_name, or None until min_samples are observed"""
+        samples = self._samples[model_name]
+        if len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """Number of hedged requests one research run may still fire, plus what they achieved"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.fired = 0
+        self.wins = 0
+
+    def take(self):
+        if self.fired >= self.limit:
+            return False
+        self.fired += 1
+        return True
+
+    def stats(self):
+        return {"hedges": self.fired, "wins": self.wins, "limit": self.limit}
+
+
+_run_budget = contextvars.ContextVar("hedge_budget", default=None)
+
+
+def start_hedge_budget(limit):
+    """Open a hedge budget for the current run; tasks started afterwards share it"""
+    budget = HedgeBudget(limit)
+    _run_budget.set(budget)
+    return budget
+
+
+class HedgedModel(Model):
+    """Model wrapper that fires a duplicate request when a call runs past a latency percentile
+
+    The first response wins and the other request is cancelled. Hedging only happens inside
+    a run that opened a budget with start_hedge_budget(). Streamed responses are not hedged.
+    """
+
+    def __init__(self, model, model_name, tracker, percentile, min_samples):
+        self._model = model
+        self.model_name = model_name
+        self.tracker = tracker
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+
+    async def _timed(self, call):
+        started = time.perf_counter()
+        response = await call()
+        self.tracker.record(self.model_name, time.perf_counter() - started)
+        return response
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        call = lambda: self._model.get_response(*args, **kwargs)
+        budget = _run_budget.get()
+        delay = self.tracker.percentile(self.model_name, self.percentile, self.min_samples)
+        if budget is None or delay is None:
+            return await self._timed(call)
+
+        primary = asyncio.ensure_future(self._timed(call))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not budget.take():
+                return await primary
+
+            self.hedges += 1
+            print(f"⏱️ {self.model_name} call exceeded p{self.percentile} ({delay:.1f}s), sending a hedged request")
+            hedge = asyncio.ensure_future(self._timed(call))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.wins += 1
+                            budget.wins += 1
+                        return task.result()
+            # Both requests failed: surface the primary's error
+            return primary.result()
+        finally:
+            # Cancel the losing request, or both if the caller itself was cancelled
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stream_response(self, *args, **kwargs):
+        return self._model.stream_response(*args, **kwargs)
+
+    def stats(self):
+        """Return call, hedge and hedge win counters"""
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+        }
@@ -1,27 +1,197 @@
+import importlib.util
+import os
+import httpx
 from agents import AsyncOpenAI, OpenAIChatCompletionsModel
-from config import GEMINI_KEY, MODEL, MODEL_LITE
-
-def get_model():
-    """Create and return the main model instance"""
-    provider = AsyncOpenAI(
-        api_key=GEMINI_KEY,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    )
-
-    model = OpenAIChatCompletionsModel(
-        model=MODEL,
-        openai_client=provider,
-    )
-    return model
+from agents.models.interface import Model
+from openai import DefaultAsyncHttpxClient
+from config import (
+    GEMINI_KEY,
+    GEMINI_BASE_URL,
+    MODEL,
+    MODEL_LITE,
+    CASSETTE_MODE,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_HTTP2,
+    LLM_TIMEOUT_SECONDS,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    CACHE_DIR,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_HEDGING_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_WINDOW,
+    USER_MAX_LLM_CALLS,
+)
+from .cassette import get_cassette, RecordingModel
+from .disk_cache import DiskCache
+from .hedging import LatencyTracker, HedgedModel
+from .run_journal import JournaledModel
+from .fair_share import UserLimiter, UserLimitedModel
+from .model_requests import fingerprint_model_request, dump_model_response, load_model_response
+
+# Process-wide registries: one pooled client per base_url, one model per model name
+_clients = {}
+_models = {}
+# Set by close_clients(); the process is shutting down and must not call a model again
+_closed = False
+
+# Rolling per-model latencies that decide when a slow call gets hedged
+latency_tracker = LatencyTracker(window=LLM_HEDGE_WINDOW)
+
+# Model calls each user may have in flight, shared by every model
+llm_user_limits = UserLimiter("LLM", USER_MAX_LLM_CALLS)
+
+# Responses of agents that opt into caching, keyed by a hash of the full request
+llm_cache = DiskCache(
+    path=os.path.join(CACHE_DIR, "llm_cache.sqlite3"),
+    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    enabled=LLM_CACHE_ENABLED,
+)
+
+def _provider_api_key():
+    # Replayed runs never reach the provider, so they work without a key
+    if CASSETTE_MODE == "replay":
+        return GEMINI_KEY or "replay"
+    return GEMINI_KEY
+
+def _http2_enabled():
+    if LLM_HTTP2 and importlib.util.find_spec("h2") is None:
+        print("⚠️ LLM_HTTP2 is set but the 'h2' package is not installed, falling back to HTTP/1.1")
+        return False
+    return LLM_HTTP2
+
+def get_openai_client(base_url=GEMINI_BASE_URL):
+    """Return the shared AsyncOpenAI client for base_url, backed by one tuned connection pool"""
+    if _closed:
+        raise RuntimeError("The model clients were closed by close_clients() at shutdown")
+    client = _clients.get(base_url)
+    if client is None:
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+            http2=_http2_enabled(),
+        )
+        client = AsyncOpenAI(
+            api_key=_provider_api_key(),
+            base_url=base_url,
+            http_client=http_client,
+        )
+        _clients[base_url] = client
+    return client
+
+async def close_clients():
+    """Close every pooled client when the process shuts down
+
+    Shutdown only: agents keep the models, and so the clients, they were built with, so
+    nothing may call a model afterwards. Only the entry points (main.py, batch.py,
+    server.py and worker.py) call this, once their last run has finished.
+    """
+    global _closed
+    _closed = True
+    for client in _clients.values():
+        await client.close()
+
+class CachedModel(Model):
+    """Model wrapper serving repeated identical requests from the LLM response cache
 
-def get_model_lite():
-    """Create and return the lite model instance for faster processing"""
-    provider = AsyncOpenAI(
-        api_key=GEMINI_KEY,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-    )
-    model = OpenAIChatCompletionsModel(
-        model=MODEL_LITE,
-        openai_client=provider,
-    )
+    Only get_response() is cached; streamed responses always reach the wrapped model.
+    """
+
+    def __init__(self, model, model_name, cache):
+        self._model = model
+        self.model_name = model_name
+        self.cache = cache
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *args,
+        **kwargs,
+    ):
+        key = fingerprint_model_request(
+            self.model_name, system_instructions, input, model_settings, tools, output_schema, handoffs
+        )
+        cached = await self.cache.get(key)
+        if cached is not None:
+            # A cache hit costs no tokens, so report none
+            return load_model_response(cached, usage=False)
+        response = await self._model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            *args, **kwargs,
+        )
+        await self.cache.set(key, dump_model_response(response))
+        return response
+
+    def stream_response(self, *args, **kwargs):
+        return self._model.stream_response(*args, **kwargs)
+
+def _wrap_model(model, model_name):
+    """Route the model through the record/replay cassette when one is active"""
+    cassette = get_cassette()
+    if cassette.mode == "off":
+        return model
+    return RecordingModel(model, cassette, model_name)
+
+def _get_cached_model(model_name, cache):
+    model = _models.get((model_name, cache))
+    if model is None:
+        model = OpenAIChatCompletionsModel(
+            model=model_name,
+            openai_client=get_openai_client(),
+        )
+        if LLM_HEDGING_ENABLED:
+            model = HedgedModel(model, model_name, latency_tracker, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES)
+        # Inside the cache, so cache hits never wait for a slot
+        model = UserLimitedModel(model, llm_user_limits)
+        if cache:
+            model = CachedModel(model, model_name, llm_cache)
+        model = _wrap_model(model, model_name)
+        # Outermost, so a resumed run replays journaled responses before anything else
+        model = JournaledModel(model, model_name)
+        _models[(model_name, cache)] = model
     return model
+
+def get_model(cache=False):
+    """Return the shared main model instance
+
+    Pass cache=True for agents whose answers are deterministic enough to reuse, such as
+    low-temperature validators; creative agents should not opt in.
+    """
+    return _get_cached_model(MODEL, cache)
+
+def get_model_lite(cache=False):
+    """Return the shared lite model instance for faster processing"""
+    return _get_cached_model(MODEL_LITE, cache)
+
+def hedging_stats():
+    """Return hedge counters for every model built so far"""
+    stats = {}
+    for model in _models.values():
+        while model is not None and not isinstance(model, HedgedModel):
+            model = getattr(model, "_model", None)
+        if model is not None:
+            stats[model.model_name] = model.stats()
+    return stats
+
+def llm_cache_stats():
+    """Return hit/miss statistics of the LLM response cache"""
+    return llm_cache.stats()
+
+def llm_user_limit_stats():
+    """Return the per-user cap of LLM calls in flight, its waits and the calls in flight per user"""
+    return llm_user_limits.stats()
@@ -0,0 +1,72 @@
+import hashlib
+import json
+from pydantic import TypeAdapter
+from agents import ModelResponse, Usage
+from agents.items import TResponseOutputItem
+
+_output_item_adapter = TypeAdapter(TResponseOutputItem)
+
+
+def _jsonable(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def _tool_signature(tool):
+    return {
+        "name": getattr(tool, "name", type(tool).__name__),
+        "parameters": getattr(tool, "params_json_schema", None),
+    }
+
+
+def model_request_payload(model_name, system_instructions, input, model_settings, tools, output_schema, handoffs):
+    """Collect the parts of a model request that determine its response"""
+    return {
+        "model": model_name,
+        "system": system_instructions,
+        "input": _jsonable(input),
+        "settings": model_settings.to_json_dict() if model_settings is not None else None,
+        "tools": [_tool_signature(tool) for tool in tools or []],
+        "output_schema": output_schema.json_schema() if output_schema and not output_schema.is_plain_text() else None,
+        "handoffs": [getattr(handoff, "tool_name", None) for handoff in handoffs or []],
+    }
+
+
+def fingerprint_model_request(model_name, system_instructions, input, model_settings, tools, output_schema, handoffs):
+    """Content hash of a model request, stable across processes"""
+    payload = model_request_payload(
+        model_name, system_instructions, input, model_settings, tools, output_schema, handoffs
+    )
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def dump_model_response(response):
+    """Serialize a ModelResponse to a JSON-compatible dict"""
+    return {
+        "output": [item.model_dump(mode="json", exclude_none=True) for item in response.output],
+        "usage": {
+            "requests": response.usage.requests,
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+            "total_tokens": response.usage.total_tokens,
+        },
+        "response_id": response.response_id,
+    }
+
+
+def load_model_response(data, usage=True):
+    """Rebuild a ModelResponse from dump_model_response() output
+
+    With usage=False the response reports no token usage, since serving it cost nothing.
+    """
+    return ModelResponse(
+        output=[_output_item_adapter.validate_python(item) for item in data["output"]],
+        usage=Usage(**data["usage"]) if usage else Usage(),
+        response_id=data.get("response_id"),
+    )
@@ -0,0 +1,44 @@
+import contextvars
+import hashlib
+import json
+import time
+from .dedup import normalize_url
+
+
+def results_fingerprint(response):
+    """Hash the results of a search response, ignoring ranking scores that drift between calls"""
+    results = sorted(
+        (normalize_url(result.get("url", "")), result.get("title", ""), result.get("content", ""))
+        for result in (response or {}).get("results", [])
+    )
+    return hashlib.sha256(json.dumps(results).encode("utf-8")).hexdigest()
+
+
+class SearchLog:
+    """Searches one report section was built from"""
+
+    def __init__(self):
+        self.searches = []
+
+    def record(self, key, search_kwargs, response):
+        """Record a search with the time its results were fetched from Tavily, even when served from a cache"""
+        self.searches.append({
+            "key": key,
+            "params": search_kwargs,
+            "fetched_at": (response or {}).get("fetched_at") or time.time(),
+            "results": results_fingerprint(response),
+        })
+
+
+_search_log = contextvars.ContextVar("search_log", default=None)
+
+
+def start_search_log():
+    """Collect the searches of the current task and the tasks it starts"""
+    log = SearchLog()
+    _search_log.set(log)
+    return log
+
+
+def current_search_log():
+    return _search_log.get()
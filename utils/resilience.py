@@ -0,0 +1,143 @@
+import asyncio
+import random
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open"""
+
+    def __init__(self, name, retry_in):
+        self.retry_in = retry_in
+        super().__init__(
+            f"{name} is temporarily unavailable (retry in {retry_in:.0f}s). "
+            "Continue with the information you already have instead of retrying."
+        )
+
+
+class TokenBucket:
+    """Async token bucket limiting calls to `rate` per second with bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures, allowing a trial call once `reset_seconds` have passed"""
+
+    def __init__(self, name, failure_threshold, reset_seconds):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def check(self):
+        """Raise CircuitOpenError while the circuit is open"""
+        if self.state == "open":
+            self.rejected += 1
+            retry_in = self.reset_seconds - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(self.name, retry_in)
+        if self.state == "half_open":
+            # Let one trial call through and hold the circuit open for everyone else
+            self.opened_at = time.monotonic()
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Exponential backoff with full jitter for the given retry attempt"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class AdmissionController:
+    """Rate limiting, retry with jittered backoff and circuit breaking around a shared client"""
+
+    def __init__(
+        self,
+        name,
+        rate,
+        burst,
+        max_retries,
+        base_delay,
+        max_delay,
+        failure_threshold,
+        reset_seconds,
+        is_retryable,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_seconds)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.is_retryable = is_retryable
+        self.calls = 0
+        self.retries = 0
+
+    async def call(self, fn):
+        """Await fn() under admission control, retrying transient failures"""
+        attempt = 0
+        while True:
+            self.breaker.check()
+            await self.bucket.acquire()
+            self.calls += 1
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self.is_retryable(e):
+                    # The backend answered, so the failure says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or self.breaker.state != "closed":
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                attempt += 1
+                self.retries += 1
+                print(f"Retrying {self.breaker.name} call in {delay:.1f}s after error: {e}")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self):
+        """Return call, retry and circuit breaker counters"""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rejected": self.breaker.rejected,
+            "circuit": self.breaker.state,
+        }
@@ -0,0 +1,196 @@
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from agents.models.interface import Model
+from .model_requests import fingerprint_model_request, dump_model_response, load_model_response
+
+
+class RunJournal:
+    """Durable JSONL journal of the completed steps of one research run
+
+    Model responses and searches are appended as they complete, keyed like the cassette.
+    When a run is resumed the journal is loaded again and completed calls are served
+    from it, so only the steps that never finished are paid for again.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.run_id = self.path.stem
+        self.replayed = 0
+        self.recorded = 0
+        self.meta = None
+        self.outcome = None
+        self.steps = []
+        self._journaled_steps = Counter()
+        self._lock = threading.Lock()
+        self._by_key = defaultdict(deque)
+        if self.path.exists():
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The process died mid-write: everything before this line is intact
+                    break
+                if entry["kind"] == "run":
+                    self.meta = entry["response"]
+                elif entry["kind"] == "done":
+                    self.outcome = entry["response"]
+                elif entry["kind"] == "step":
+                    self.steps.append(entry["response"])
+                    self._journaled_steps[json.dumps(entry["response"], sort_keys=True)] += 1
+                else:
+                    self._by_key[(entry["kind"], entry["key"])].append(entry)
+
+    def _append(self, entry):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def write(self, kind, key, response):
+        await asyncio.to_thread(self._append, {"kind": kind, "key": key, "response": response})
+
+    async def start(self, meta):
+        """Record what the run is, so it can be resumed from the journal alone"""
+        if self.meta is None:
+            self.meta = meta
+            await self.write("run", self.run_id, meta)
+
+    async def step(self, description):
+        """Record a completed tool call, sub-agent result or handoff, once across resumes"""
+        step_key = json.dumps(description, sort_keys=True, default=str)
+        if self._journaled_steps[step_key]:
+            # Replayed by a resumed run: already in the journal
+            self._journaled_steps[step_key] -= 1
+            return
+        self.steps.append(description)
+        await self.write("step", "", description)
+
+    async def finish(self, outcome):
+        self.outcome = outcome
+        await self.write("done", self.run_id, outcome)
+
+    async def call(self, kind, key, fn, encode=None, decode=None):
+        """Serve a completed call from the journal, or run it and journal the result"""
+        entries = self._by_key.get((kind, key))
+        if entries:
+            self.replayed += 1
+            response = entries.popleft()["response"]
+            return decode(response) if decode else response
+
+        result = await fn()
+        await self.write(kind, key, encode(result) if encode else result)
+        self.recorded += 1
+        return result
+
+    def stats(self):
+        """Return the number of journaled and replayed calls"""
+        return {"run_id": self.run_id, "recorded": self.recorded, "replayed": self.replayed, "steps": len(self.steps)}
+
+
+_run_journal = contextvars.ContextVar("run_journal", default=None)
+
+# Expired run journals are pruned at most this often
+PRUNE_INTERVAL_SECONDS = 300
+_last_prune = 0.0
+
+
+def new_run_id():
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def start_run_journal(path):
+    """Open the journal at path for the current run; tasks started afterwards share it"""
+    journal = RunJournal(path)
+    _run_journal.set(journal)
+    return journal
+
+
+def current_run_journal():
+    return _run_journal.get()
+
+
+def prune_run_journals(runs_dir, ttl_seconds):
+    """Delete run journals not written to for longer than ttl_seconds and return how many were removed"""
+    cutoff = time.time() - ttl_seconds
+    pruned = 0
+    for path in Path(runs_dir).glob("*.jsonl"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                pruned += 1
+        except FileNotFoundError:
+            # Pruned concurrently by another process
+            pass
+    if pruned:
+        print(f"🧹 Pruned {pruned} expired run journals")
+    return pruned
+
+
+def maybe_prune_run_journals(runs_dir, ttl_seconds):
+    """Prune expired run journals unless that was done in the last PRUNE_INTERVAL_SECONDS"""
+    global _last_prune
+    if ttl_seconds and time.time() - _last_prune >= PRUNE_INTERVAL_SECONDS:
+        _last_prune = time.time()
+        return prune_run_journals(runs_dir, ttl_seconds)
+    return 0
+
+
+class JournaledModel(Model):
+    """Model wrapper that journals get_response() calls of runs that opened a run journal
+
+    Streamed responses are passed through and are not journaled.
+    """
+
+    def __init__(self, model, model_name):
+        self._model = model
+        self.model_name = model_name
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *args,
+        **kwargs,
+    ):
+        call = lambda: self._model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            *args, **kwargs,
+        )
+        journal = _run_journal.get()
+        if journal is None:
+            return await call()
+        key = fingerprint_model_request(
+            self.model_name, system_instructions, input, model_settings, tools, output_schema, handoffs
+        )
+        return await journal.call(
+            f"llm:{self.model_name}",
+            key,
+            call,
+            encode=dump_model_response,
+            # A replayed response was already paid for in the interrupted run
+            decode=lambda data: load_model_response(data, usage=False),
+        )
+
+    def stream_response(self, *args, **kwargs):
+        return self._model.stream_response(*args, **kwargs)
@@ -0,0 +1,24 @@
+import re
+
+# Rough characters-per-token ratio for English prose
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Estimate the number of LLM tokens in text"""
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to roughly max_tokens at a word boundary, marking the cut with an ellipsis"""
+    text = text or ""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0] if " " in text[:max_chars] else text[:max_chars]
+    return cut.rstrip(" ,;:") + "…"
+
+
+def normalize_whitespace(text):
+    """Collapse runs of whitespace into single spaces"""
+    return re.sub(r"\s+", " ", text or "").strip()
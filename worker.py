@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Deep Research AI System - Research Worker Process
+
+Takes research jobs from the shared job queue until it is stopped. The server
+starts these with --processes, and more can be started by hand, on this machine
+or on others that share the job database and the researches folder:
+
+    python worker.py --workers 4 --jobs-db /shared/jobs.sqlite3
+"""
+
+import argparse
+import asyncio
+import signal
+from services import WorkerPool, open_job_queue
+from config import SERVER_WORKERS, JOBS_DB, JOB_POLL_SECONDS, JOB_HEARTBEAT_SECONDS, INTERACTIVE_RESERVED_SLOTS
+from utils import close_clients
+
+async def run_worker(workers=SERVER_WORKERS, jobs_db=JOBS_DB):
+    """Research queued jobs until SIGINT or SIGTERM, then hand running jobs back to the queue"""
+    pool = WorkerPool(
+        open_job_queue(jobs_db), workers,
+        poll_seconds=JOB_POLL_SECONDS, heartbeat_seconds=JOB_HEARTBEAT_SECONDS, reserved_slots=INTERACTIVE_RESERVED_SLOTS,
+    )
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopping.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C still raises KeyboardInterrupt
+            pass
+
+    await pool.start()
+    try:
+        await stopping.wait()
+    finally:
+        print(f"👋 Worker {pool.name} stopping: {pool.stats()}")
+        await pool.stop()
+        await close_clients()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deep Research AI System - research worker process")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Research jobs this process runs at the same time")
+    parser.add_argument("--jobs-db", default=JOBS_DB, help="SQLite database holding the job queue")
+    args = parser.parse_args()
+
+    asyncio.run(run_worker(workers=args.workers, jobs_db=args.jobs_db))